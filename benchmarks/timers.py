@@ -0,0 +1,116 @@
+# Copyright DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares the timing wheel of cassandra.connection.TimerManager with the heap
+it replaced, for request timeouts: timers are added with a long timeout and
+almost all of them are canceled before expiring, while the event loop
+services timeouts in between. Does not need a running cluster.
+"""
+
+from heapq import heappush, heappop
+from optparse import OptionParser
+import os.path
+import sys
+import time
+
+dirname = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(dirname, '..'))
+
+from cassandra.connection import Timer, TimerManager
+
+
+class HeapTimerManager(object):
+    """
+    The previous TimerManager: a heap of (end, timer) where canceled timers
+    stay until they reach the top.
+    """
+
+    def __init__(self):
+        self._queue = []
+        self._new_timers = []
+
+    def add_timer(self, timer):
+        self._new_timers.append((timer.end, timer))
+
+    def service_timeouts(self):
+        queue = self._queue
+        if self._new_timers:
+            new_timers = self._new_timers
+            while new_timers:
+                heappush(queue, new_timers.pop())
+
+        if queue:
+            now = time.time()
+            while queue:
+                timer = queue[0][1]
+                if timer.finish(now):
+                    heappop(queue)
+                else:
+                    return timer.end
+
+
+def noop():
+    pass
+
+
+def run(manager_class, outstanding, timeout, batch):
+    manager = manager_class()
+    timers = []
+
+    # fill up to the number of outstanding timers
+    for _ in range(outstanding):
+        timer = Timer(timeout, noop)
+        manager.add_timer(timer)
+        timers.append(timer)
+    manager.service_timeouts()
+
+    # then cycle through them: cancel the oldest, add a new one
+    start = time.time()
+    for i in range(outstanding):
+        timers[i].cancel()
+        timer = Timer(timeout, noop)
+        manager.add_timer(timer)
+        timers.append(timer)
+        if i % batch == 0:
+            manager.service_timeouts()
+    manager.service_timeouts()
+    return time.time() - start
+
+
+def parse_options():
+    parser = OptionParser()
+    parser.add_option('--outstanding', default='10000,100000,1000000',
+                      help='comma separated numbers of outstanding timers [default: %default]')
+    parser.add_option('--timeout', type='float', default=10.0,
+                      help='timer timeout in seconds [default: %default]')
+    parser.add_option('--batch', type='int', default=100,
+                      help='timers added between calls to service_timeouts [default: %default]')
+    return parser.parse_args()
+
+
+def main():
+    options, args = parse_options()
+    # microseconds per timer added and canceled, including servicing
+    print("%12s %12s %12s" % ('outstanding', 'heap (us)', 'wheel (us)'))
+    for outstanding in [int(n) for n in options.outstanding.split(',')]:
+        results = []
+        for manager_class in (HeapTimerManager, TimerManager):
+            elapsed = run(manager_class, outstanding, options.timeout, options.batch)
+            results.append(elapsed / outstanding * 1e6)
+        print("%12d %12.3f %12.3f" % (outstanding, results[0], results[1]))
+
+
+if __name__ == "__main__":
+    main()
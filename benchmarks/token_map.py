@@ -0,0 +1,81 @@
+# Copyright DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Times building replica maps for synthetic rings of increasing size. Unlike
+the other benchmarks, this one does not need a running cluster.
+"""
+
+from optparse import OptionParser
+import os.path
+import random
+import sys
+import timeit
+
+dirname = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(dirname, '..'))
+
+from cassandra.metadata import Murmur3Token, NetworkTopologyStrategy, SimpleStrategy
+from cassandra.policies import SimpleConvictionPolicy
+from cassandra.pool import Host
+
+
+def make_ring(num_dcs, nodes_per_dc, vnodes, racks_per_dc):
+    rand = random.Random(0)
+    token_to_host_owner = {}
+    for dc in range(num_dcs):
+        for node in range(nodes_per_dc):
+            host = Host('10.%d.%d.%d' % (dc, node // 256, node % 256), SimpleConvictionPolicy)
+            host.set_location_info('dc%d' % dc, 'rack%d' % (node % racks_per_dc))
+            for _ in range(vnodes):
+                token_to_host_owner[Murmur3Token(rand.randint(-2 ** 63, 2 ** 63 - 1))] = host
+    return token_to_host_owner, sorted(token_to_host_owner)
+
+
+def parse_options():
+    parser = OptionParser()
+    parser.add_option('--dcs', type='int', default=3,
+                      help='number of datacenters [default: %default]')
+    parser.add_option('--nodes', default='10,50,100',
+                      help='comma separated numbers of nodes per datacenter to time [default: %default]')
+    parser.add_option('--vnodes', type='int', default=256,
+                      help='tokens per node [default: %default]')
+    parser.add_option('--racks', type='int', default=3,
+                      help='racks per datacenter [default: %default]')
+    parser.add_option('--rf', type='int', default=3,
+                      help='replication factor, per datacenter for NetworkTopologyStrategy [default: %default]')
+    parser.add_option('-n', '--number', type='int', default=1,
+                      help='number of builds to average over [default: %default]')
+    return parser.parse_args()
+
+
+def main():
+    options, args = parse_options()
+    strategies = [
+        ('SimpleStrategy', SimpleStrategy({'replication_factor': options.rf})),
+        ('NetworkTopologyStrategy', NetworkTopologyStrategy(
+            dict(('dc%d' % dc, options.rf) for dc in range(options.dcs))))
+    ]
+
+    print("%-25s %8s %8s %12s" % ('strategy', 'nodes', 'tokens', 'seconds'))
+    for nodes in [int(n) for n in options.nodes.split(',')]:
+        token_to_host_owner, ring = make_ring(options.dcs, nodes, options.vnodes, options.racks)
+        for name, strategy in strategies:
+            elapsed = timeit.timeit(lambda: strategy.make_token_replica_map(token_to_host_owner, ring),
+                                    number=options.number)
+            print("%-25s %8d %8d %12.3f" % (name, nodes * options.dcs, len(ring), elapsed / options.number))
+
+
+if __name__ == "__main__":
+    main()
@@ -684,6 +684,14 @@ class OperationTimedOut(DriverException):
         Exception.__init__(self, message)
 
 
+class RequestThrottled(DriverException):
+    """
+    The request was rejected by the :attr:`.Session.request_throttler`
+    without being sent, because too many requests were already queued.
+    """
+    pass
+
+
 class UnsupportedOperation(DriverException):
     """
     An attempt was made to use a feature that is not supported by the
@@ -0,0 +1,157 @@
+# Copyright DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Support for consuming results from :mod:`asyncio` coroutines.
+
+Results are handed from the driver's IO thread to the awaiting event loop with
+a single ``call_soon_threadsafe``; no executor threads are involved. This works
+with any connection class, not only
+:class:`~cassandra.io.asyncioreactor.AsyncioConnection`.
+"""
+
+import asyncio
+
+from cassandra.cluster import ResultSet
+
+
+try:
+    asyncio.AbstractEventLoop.create_future
+except AttributeError:
+    raise ImportError(
+        'Cannot use cassandra.aio without access to '
+        'AbstractEventLoop.create_future (added in 3.5.2)'
+    )
+
+
+def _set_future_result(future, result):
+    if not future.done():
+        future.set_result(result)
+
+
+def _set_future_exception(future, exc):
+    if not future.done():
+        future.set_exception(exc)
+
+
+class _FutureAdapter(object):
+    """
+    Delivers the next result of a :class:`.ResponseFuture` to an
+    :class:`asyncio.Future`, once.
+    """
+
+    __slots__ = ('response_future', 'future', 'loop', 'delivered')
+
+    def __init__(self, response_future, future, loop):
+        self.response_future = response_future
+        self.future = future
+        self.loop = loop
+        self.delivered = False
+
+    def on_result(self, rows):
+        # callbacks stay registered for later pages of the same
+        # ResponseFuture, so only the first result is ours
+        if self.delivered:
+            return
+        self.delivered = True
+        # the ResultSet must be built now, while the ResponseFuture still
+        # describes this page
+        self.loop.call_soon_threadsafe(_set_future_result, self.future, ResultSet(self.response_future, rows))
+
+    def on_error(self, exc):
+        if self.delivered:
+            return
+        self.delivered = True
+        self.loop.call_soon_threadsafe(_set_future_exception, self.future, exc)
+
+
+def wrap_future(response_future, loop=None):
+    """
+    Returns an :class:`asyncio.Future` attached to `loop` (the current event
+    loop by default) that resolves to the :class:`.ResultSet` of
+    `response_future`, or to the exception the request failed with.
+
+    Awaiting a :class:`.ResponseFuture` directly is equivalent::
+
+        >>> rows = await session.execute_async("SELECT * FROM users")
+    """
+    loop = loop or asyncio.get_event_loop()
+    future = loop.create_future()
+    adapter = _FutureAdapter(response_future, future, loop)
+    response_future.add_callbacks(adapter.on_result, adapter.on_error)
+    return future
+
+
+class AsyncResultSetIterator(object):
+    """
+    An asynchronous iterator over all rows of a :class:`.ResultSet`, as
+    returned by ``ResultSet.__aiter__``::
+
+        >>> results = await session.execute_async(statement)
+        >>> async for row in results:
+        ...     process(row)
+
+    The next page is requested as soon as the current one is handed out, so
+    it is usually available by the time the current page is consumed. At
+    most one page is held in addition to the current one.
+    """
+
+    def __init__(self, result_set, loop=None):
+        self._loop = loop or asyncio.get_event_loop()
+        self._response_future = result_set.response_future
+        self._page_iter = iter(result_set.current_rows)
+        self._pending = None
+        self._registered = False
+        self._fetch_next_page()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            try:
+                return next(self._page_iter)
+            except StopIteration:
+                pass
+
+            if self._pending is None:
+                raise StopAsyncIteration
+
+            result_set = await self._pending
+            self._page_iter = iter(result_set.current_rows)
+            self._fetch_next_page()
+
+    def _fetch_next_page(self):
+        response_future = self._response_future
+        if not response_future.has_more_pages:
+            self._pending = None
+            return
+
+        self._pending = self._loop.create_future()
+        response_future.start_fetching_next_page()
+        if not self._registered:
+            # registered once for all remaining pages; runs immediately if
+            # the page already arrived
+            self._registered = True
+            response_future.add_callbacks(self._on_page, self._on_error)
+
+    def _on_page(self, rows):
+        pending = self._pending
+        if pending is not None:
+            self._loop.call_soon_threadsafe(_set_future_result, pending, ResultSet(self._response_future, rows))
+
+    def _on_error(self, exc):
+        pending = self._pending
+        if pending is not None:
+            self._loop.call_soon_threadsafe(_set_future_exception, pending, exc)
@@ -19,20 +19,22 @@ This module houses the main classes you will interact with,
 from __future__ import absolute_import
 
 import atexit
-from collections import defaultdict, Mapping
+from collections import defaultdict, deque, Mapping
 from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait as wait_futures
 from copy import copy
 from functools import partial, wraps
-from itertools import groupby, count
+from heapq import heappush, heappop
+from itertools import count
 import logging
+import os
 from warnings import warn
 from random import random
 import six
-from six.moves import filter, range, queue as Queue
+from six.moves import filter, range
 import socket
 import sys
 import time
-from threading import Lock, RLock, Thread, Event
+from threading import Lock, RLock, Thread, Event, Condition
 
 import weakref
 from weakref import WeakValueDictionary
@@ -44,7 +46,7 @@ except ImportError:
 from cassandra import (ConsistencyLevel, AuthenticationFailed,
                        OperationTimedOut, UnsupportedOperation,
                        SchemaTargetType, DriverException, ProtocolVersion,
-                       UnresolvableContactPoints)
+                       UnresolvableContactPoints, RequestThrottled)
 from cassandra.connection import (ConnectionException, ConnectionShutdown,
                                   ConnectionHeartbeat, ProtocolVersionUnsupported)
 from cassandra.cqltypes import UserType
@@ -64,14 +66,16 @@ from cassandra.metadata import Metadata, protect_name, murmur3
 from cassandra.policies import (TokenAwarePolicy, DCAwareRoundRobinPolicy, SimpleConvictionPolicy,
                                 ExponentialReconnectionPolicy, HostDistance,
                                 RetryPolicy, IdentityTranslator, NoSpeculativeExecutionPlan,
-                                NoSpeculativeExecutionPolicy)
+                                NoSpeculativeExecutionPolicy, LatencyTracker)
 from cassandra.pool import (Host, _ReconnectionHandler, _HostReconnectionHandler,
                             HostConnectionPool, HostConnection,
                             NoConnectionsAvailable)
 from cassandra.query import (SimpleStatement, PreparedStatement, BoundStatement,
                              BatchStatement, bind_params, QueryTrace, TraceUnavailable,
                              named_tuple_factory, dict_factory, tuple_factory, FETCH_SIZE_UNSET)
+from cassandra.snapshot import read_snapshot, write_snapshot
 from cassandra.timestamps import MonotonicTimestampGenerator
+from cassandra.util import OrderedDict
 
 
 def _is_eventlet_monkey_patched():
@@ -119,6 +123,16 @@ DEFAULT_MAX_CONNECTIONS_PER_LOCAL_HOST = 8
 DEFAULT_MIN_CONNECTIONS_PER_REMOTE_HOST = 1
 DEFAULT_MAX_CONNECTIONS_PER_REMOTE_HOST = 2
 
+# protocol v3+ connections carry up to 32768 concurrent requests, so pools
+# start with a single connection per host and only grow when configured to
+DEFAULT_MIN_REQUESTS_V3 = 128
+DEFAULT_MAX_REQUESTS_V3 = 1024
+
+DEFAULT_CONNECTIONS_PER_HOST_V3 = 1
+
+# seconds without any response before repreparing statements on a node gives up
+_REPREPARE_TIMEOUT = 5.0
+
 
 _NOT_SET = object()
 
@@ -326,6 +340,8 @@ class ProfileManager(object):
     def populate(self, cluster, hosts):
         for p in self.profiles.values():
             p.load_balancing_policy.populate(cluster, hosts)
+            if isinstance(p.speculative_execution_policy, LatencyTracker):
+                cluster.register_latency_tracker(p.speculative_execution_policy)
 
     def check_supported(self):
         for p in self.profiles.values():
@@ -749,6 +765,30 @@ class Cluster(object):
     an extra roundtrip for one or more client requests.
     """
 
+    reprepare_window = 100
+    """
+    The maximum number of statements being prepared at once on a node when repreparing statements as it comes up
+    (see :attr:`.reprepare_on_up`). Statements are prepared most recently bound first.
+
+    .. versionadded:: 3.17.0
+    """
+
+    metadata_snapshot_path = None
+    """
+    Path of a file holding a snapshot of the hosts, tokens and schema metadata, or :const:`None` (the default)
+    to disable snapshots.
+
+    When set, :meth:`.connect` loads the snapshot if the file exists, so that requests are routed with the
+    token map and schema it holds right away. The control connection then skips its initial refresh, and
+    refreshes hosts, tokens and schema from the system tables in the background instead. The snapshot is
+    written once metadata is refreshed after connecting, and when the Cluster is shut down.
+
+    Snapshots are pickles, and must only be read from locations writable by trusted users. Snapshots written
+    by other driver versions are ignored.
+
+    .. versionadded:: 3.17.0
+    """
+
     connect_timeout = 5
     """
     Timeout, in seconds, for creating new connections.
@@ -799,6 +839,42 @@ class Cluster(object):
     def token_metadata_enabled(self, enabled):
         self.control_connection._token_meta_enabled = bool(enabled)
 
+    @property
+    def schema_metadata_lazy(self):
+        """
+        Flag indicating whether the contents of keyspaces are loaded on first access.
+
+        When enabled, schema refreshes only query keyspaces and their replication settings. The tables, indexes,
+        user-defined types, functions, aggregates and views of a keyspace are queried from the control connection
+        the first time one of them is accessed on its :class:`~.KeyspaceMetadata`, and schema change events only
+        refresh keyspaces whose contents are loaded. This speeds initial connection to clusters with large schemas,
+        while keeping token aware request routing. Contents should not be accessed for the first time from
+        response callbacks, which would block the event loop.
+
+        Takes effect on the next full schema refresh, such as the one on connect.
+
+        .. versionadded:: 3.17.0
+        """
+        return self.metadata._lazy_schema
+
+    @schema_metadata_lazy.setter
+    def schema_metadata_lazy(self, lazy):
+        self.metadata._lazy_schema = bool(lazy)
+
+    @property
+    def schema_metadata_eager_keyspaces(self):
+        """
+        Names of the keyspaces whose contents are loaded with every schema refresh when
+        :attr:`~.Cluster.schema_metadata_lazy` is enabled.
+
+        .. versionadded:: 3.17.0
+        """
+        return self.metadata._eager_keyspaces
+
+    @schema_metadata_eager_keyspaces.setter
+    def schema_metadata_eager_keyspaces(self, keyspaces):
+        self.metadata._eager_keyspaces = frozenset(keyspaces or ())
+
     profile_manager = None
     _config_mode = _ConfigMode.UNCOMMITTED
 
@@ -821,6 +897,7 @@ class Cluster(object):
 
     _listeners = None
     _listener_lock = None
+    _latency_trackers = ()
 
     def __init__(self,
                  contact_points=_NOT_SET,
@@ -855,7 +932,10 @@ class Cluster(object):
                  timestamp_generator=None,
                  idle_heartbeat_timeout=30,
                  no_compact=False,
-                 ssl_context=None):
+                 ssl_context=None,
+                 schema_metadata_lazy=False,
+                 schema_metadata_eager_keyspaces=None,
+                 metadata_snapshot_path=None):
         """
         ``executor_threads`` defines the number of threads in a pool for handling asynchronous tasks such as
         extablishing connection pools or refreshing metadata.
@@ -997,6 +1077,7 @@ class Cluster(object):
         self.connect_timeout = connect_timeout
         self.prepare_on_all_hosts = prepare_on_all_hosts
         self.reprepare_on_up = reprepare_on_up
+        self.metadata_snapshot_path = metadata_snapshot_path
 
         self._listeners = set()
         self._listener_lock = Lock()
@@ -1031,6 +1112,26 @@ class Cluster(object):
             HostDistance.REMOTE: DEFAULT_MAX_CONNECTIONS_PER_REMOTE_HOST
         }
 
+        self._min_requests_per_connection_v3 = {
+            HostDistance.LOCAL: DEFAULT_MIN_REQUESTS_V3,
+            HostDistance.REMOTE: DEFAULT_MIN_REQUESTS_V3
+        }
+
+        self._max_requests_per_connection_v3 = {
+            HostDistance.LOCAL: DEFAULT_MAX_REQUESTS_V3,
+            HostDistance.REMOTE: DEFAULT_MAX_REQUESTS_V3
+        }
+
+        self._core_connections_per_host_v3 = {
+            HostDistance.LOCAL: DEFAULT_CONNECTIONS_PER_HOST_V3,
+            HostDistance.REMOTE: DEFAULT_CONNECTIONS_PER_HOST_V3
+        }
+
+        self._max_connections_per_host_v3 = {
+            HostDistance.LOCAL: DEFAULT_CONNECTIONS_PER_HOST_V3,
+            HostDistance.REMOTE: DEFAULT_CONNECTIONS_PER_HOST_V3
+        }
+
         self.executor = ThreadPoolExecutor(max_workers=executor_threads)
         self.scheduler = _Scheduler(self.executor)
 
@@ -1046,6 +1147,10 @@ class Cluster(object):
             self.status_event_refresh_window,
             schema_metadata_enabled, token_metadata_enabled)
 
+        self.metadata._keyspace_loader = self.control_connection._load_keyspace_metadata
+        self.schema_metadata_lazy = schema_metadata_lazy
+        self.schema_metadata_eager_keyspaces = schema_metadata_eager_keyspaces
+
     def register_user_type(self, keyspace, user_type, klass):
         """
         Registers a class to use to represent a particular user-defined type.
@@ -1141,6 +1246,8 @@ class Cluster(object):
 
         self.profile_manager.profiles[name] = profile
         profile.load_balancing_policy.populate(self, self.metadata.all_hosts())
+        if isinstance(profile.speculative_execution_policy, LatencyTracker):
+            self.register_latency_tracker(profile.speculative_execution_policy)
         # on_up after populate allows things like DCA LBP to choose default local dc
         for host in filter(lambda h: h.is_up, self.metadata.all_hosts()):
             profile.load_balancing_policy.on_up(host)
@@ -1152,6 +1259,8 @@ class Cluster(object):
             raise OperationTimedOut("Failed to create all new connection pools in the %ss timeout.")
 
     def get_min_requests_per_connection(self, host_distance):
+        if self.protocol_version >= 3:
+            return self._min_requests_per_connection_v3[host_distance]
         return self._min_requests_per_connection[host_distance]
 
     def set_min_requests_per_connection(self, host_distance, min_requests):
@@ -1160,19 +1269,22 @@ class Cluster(object):
         connections will be considered for disposal (down to core connections;
         see :meth:`~Cluster.set_core_connections_per_host`).
 
-        Pertains to connection pool management in protocol versions {1,2}.
+        The default is 5 for protocol versions {1,2} and 128 for protocol
+        version 3 and higher.
         """
         if self.protocol_version >= 3:
-            raise UnsupportedOperation(
-                "Cluster.set_min_requests_per_connection() only has an effect "
-                "when using protocol_version 1 or 2.")
-        if min_requests < 0 or min_requests > 126 or \
-           min_requests >= self._max_requests_per_connection[host_distance]:
-            raise ValueError("min_requests must be 0-126 and less than the max_requests for this host_distance (%d)" %
-                             (self._min_requests_per_connection[host_distance],))
-        self._min_requests_per_connection[host_distance] = min_requests
+            max_allowed, settings = (2 ** 15) - 1, self._min_requests_per_connection_v3
+        else:
+            max_allowed, settings = 126, self._min_requests_per_connection
+        if min_requests < 0 or min_requests > max_allowed or \
+           min_requests >= self.get_max_requests_per_connection(host_distance):
+            raise ValueError("min_requests must be 0-%d and less than the max_requests for this host_distance (%d)" %
+                             (max_allowed, self.get_min_requests_per_connection(host_distance)))
+        settings[host_distance] = min_requests
 
     def get_max_requests_per_connection(self, host_distance):
+        if self.protocol_version >= 3:
+            return self._max_requests_per_connection_v3[host_distance]
         return self._max_requests_per_connection[host_distance]
 
     def set_max_requests_per_connection(self, host_distance, max_requests):
@@ -1181,28 +1293,29 @@ class Cluster(object):
         connections will be created to a host (up to max connections;
         see :meth:`~Cluster.set_max_connections_per_host`).
 
-        Pertains to connection pool management in protocol versions {1,2}.
+        The default is 100 for protocol versions {1,2} and 1024 for protocol
+        version 3 and higher.
         """
         if self.protocol_version >= 3:
-            raise UnsupportedOperation(
-                "Cluster.set_max_requests_per_connection() only has an effect "
-                "when using protocol_version 1 or 2.")
-        if max_requests < 1 or max_requests > 127 or \
-           max_requests <= self._min_requests_per_connection[host_distance]:
-            raise ValueError("max_requests must be 1-127 and greater than the min_requests for this host_distance (%d)" %
-                             (self._min_requests_per_connection[host_distance],))
-        self._max_requests_per_connection[host_distance] = max_requests
+            max_allowed, settings = 2 ** 15, self._max_requests_per_connection_v3
+        else:
+            max_allowed, settings = 127, self._max_requests_per_connection
+        if max_requests < 1 or max_requests > max_allowed or \
+           max_requests <= self.get_min_requests_per_connection(host_distance):
+            raise ValueError("max_requests must be 1-%d and greater than the min_requests for this host_distance (%d)" %
+                             (max_allowed, self.get_min_requests_per_connection(host_distance)))
+        settings[host_distance] = max_requests
 
     def get_core_connections_per_host(self, host_distance):
         """
         Gets the minimum number of connections per Session that will be opened
         for each host with :class:`~.HostDistance` equal to `host_distance`.
         The default is 2 for :attr:`~HostDistance.LOCAL` and 1 for
-        :attr:`~HostDistance.REMOTE`.
-
-        This property is ignored if :attr:`~.Cluster.protocol_version` is
-        3 or higher.
+        :attr:`~HostDistance.REMOTE` with protocol versions {1,2}, and 1
+        for both with protocol version 3 and higher.
         """
+        if self.protocol_version >= 3:
+            return self._core_connections_per_host_v3[host_distance]
         return self._core_connections_per_host[host_distance]
 
     def set_core_connections_per_host(self, host_distance, core_connections):
@@ -1210,23 +1323,27 @@ class Cluster(object):
         Sets the minimum number of connections per Session that will be opened
         for each host with :class:`~.HostDistance` equal to `host_distance`.
         The default is 2 for :attr:`~HostDistance.LOCAL` and 1 for
-        :attr:`~HostDistance.REMOTE`.
+        :attr:`~HostDistance.REMOTE` with protocol versions {1,2}, and 1
+        for both with protocol version 3 and higher.
 
         Protocol version 1 and 2 are limited in the number of concurrent
         requests they can send per connection. The driver implements connection
         pooling to support higher levels of concurrency.
 
-        If :attr:`~.Cluster.protocol_version` is set to 3 or higher, this
-        is not supported (there is always one connection per host, unless
-        the host is remote and :attr:`connect_to_remote_hosts` is :const:`False`)
-        and using this will result in an :exc:`~.UnsupporteOperation`.
+        With protocol version 3 and higher a single connection can carry many
+        more requests, but spreading them over several connections avoids
+        serializing all traffic to a node through one socket. At least one
+        connection is always opened to each host that is not ignored (unless
+        the host is remote and :attr:`connect_to_remote_hosts` is :const:`False`).
         """
         if self.protocol_version >= 3:
-            raise UnsupportedOperation(
-                "Cluster.set_core_connections_per_host() only has an effect "
-                "when using protocol_version 1 or 2.")
-        old = self._core_connections_per_host[host_distance]
-        self._core_connections_per_host[host_distance] = core_connections
+            if core_connections < 1:
+                raise ValueError("core_connections must be at least 1 with protocol_version 3 or higher")
+            settings = self._core_connections_per_host_v3
+        else:
+            settings = self._core_connections_per_host
+        old = settings[host_distance]
+        settings[host_distance] = core_connections
         if old < core_connections:
             self._ensure_core_connections()
 
@@ -1235,30 +1352,31 @@ class Cluster(object):
         Gets the maximum number of connections per Session that will be opened
         for each host with :class:`~.HostDistance` equal to `host_distance`.
         The default is 8 for :attr:`~HostDistance.LOCAL` and 2 for
-        :attr:`~HostDistance.REMOTE`.
-
-        This property is ignored if :attr:`~.Cluster.protocol_version` is
-        3 or higher.
+        :attr:`~HostDistance.REMOTE` with protocol versions {1,2}, and 1
+        for both with protocol version 3 and higher.
         """
+        if self.protocol_version >= 3:
+            return self._max_connections_per_host_v3[host_distance]
         return self._max_connections_per_host[host_distance]
 
     def set_max_connections_per_host(self, host_distance, max_connections):
         """
         Sets the maximum number of connections per Session that will be opened
         for each host with :class:`~.HostDistance` equal to `host_distance`.
-        The default is 2 for :attr:`~HostDistance.LOCAL` and 1 for
-        :attr:`~HostDistance.REMOTE`.
+        The default is 8 for :attr:`~HostDistance.LOCAL` and 2 for
+        :attr:`~HostDistance.REMOTE` with protocol versions {1,2}, and 1
+        for both with protocol version 3 and higher.
 
-        If :attr:`~.Cluster.protocol_version` is set to 3 or higher, this
-        is not supported (there is always one connection per host, unless
-        the host is remote and :attr:`connect_to_remote_hosts` is :const:`False`)
-        and using this will result in an :exc:`~.UnsupporteOperation`.
+        Additional connections are opened while the least busy connection to
+        a host has at least :meth:`~Cluster.get_max_requests_per_connection`
+        requests in flight.
         """
         if self.protocol_version >= 3:
-            raise UnsupportedOperation(
-                "Cluster.set_max_connections_per_host() only has an effect "
-                "when using protocol_version 1 or 2.")
-        self._max_connections_per_host[host_distance] = max_connections
+            if max_connections < 1:
+                raise ValueError("max_connections must be at least 1 with protocol_version 3 or higher")
+            self._max_connections_per_host_v3[host_distance] = max_connections
+        else:
+            self._max_connections_per_host[host_distance] = max_connections
 
     def connection_factory(self, address, *args, **kwargs):
         """
@@ -1318,6 +1436,7 @@ class Cluster(object):
                           self.contact_points, self.protocol_version)
                 self.connection_class.initialize_reactor()
                 _register_cluster_shutdown(self)
+                from_snapshot = self.metadata_snapshot_path and self._load_metadata_snapshot()
                 for address in self.contact_points_resolved:
                     host, new = self.add_host(address, signal=False)
                     if new:
@@ -1347,6 +1466,9 @@ class Cluster(object):
                     self.shutdown()
                     raise
 
+                if self.metadata_snapshot_path:
+                    self.executor.submit(self._refresh_metadata_snapshot, from_snapshot)
+
                 self.profile_manager.check_supported()  # todo: rename this method
 
                 if self.idle_heartbeat_interval:
@@ -1383,6 +1505,9 @@ class Cluster(object):
             else:
                 self.is_shutdown = True
 
+        if self.metadata_snapshot_path and self._is_setup:
+            self._save_metadata_snapshot()
+
         if self._idle_heartbeat:
             self._idle_heartbeat.stop()
 
@@ -1397,6 +1522,60 @@ class Cluster(object):
 
         _discard_cluster_shutdown(self)
 
+    def _load_metadata_snapshot(self):
+        """
+        Populates hosts, token map and schema from the snapshot at
+        :attr:`~.Cluster.metadata_snapshot_path`. Returns whether a snapshot
+        was loaded.
+        """
+        path = self.metadata_snapshot_path
+        if not os.path.exists(path):
+            log.debug("No metadata snapshot found at %s", path)
+            return False
+        try:
+            snapshot = read_snapshot(path)
+        except Exception:
+            log.warning("Ignoring metadata snapshot %s that could not be read", path, exc_info=True)
+            return False
+
+        log.debug("Loading metadata of cluster %s from snapshot %s", snapshot['cluster_name'], path)
+        self.metadata.cluster_name = snapshot['cluster_name']
+        keyspaces = snapshot['keyspaces']
+        for name in snapshot['lazy_keyspaces']:
+            keyspaces[name]._loader = self.metadata._keyspace_loader
+        self.metadata.keyspaces = keyspaces
+
+        token_map = {}
+        for host_snapshot in snapshot['hosts']:
+            host, _ = self.add_host(host_snapshot['address'], host_snapshot['datacenter'], host_snapshot['rack'],
+                                    signal=False)
+            for name, value in six.iteritems(host_snapshot['attributes']):
+                setattr(host, name, value)
+            if host_snapshot['tokens']:
+                token_map[host] = host_snapshot['tokens']
+        if snapshot['partitioner'] and token_map:
+            self.metadata.rebuild_token_map(snapshot['partitioner'], token_map)
+
+        self.control_connection._metadata_from_snapshot = True
+        return True
+
+    def _refresh_metadata_snapshot(self, from_snapshot):
+        # metadata loaded from a snapshot is refreshed in full before it is saved again
+        if from_snapshot:
+            log.debug("Refreshing metadata loaded from snapshot")
+            if not self.control_connection.refresh_node_list_and_token_map(force_token_rebuild=True):
+                return
+            if not self.control_connection.refresh_schema() and self.schema_metadata_enabled:
+                return
+        self._save_metadata_snapshot()
+
+    def _save_metadata_snapshot(self):
+        try:
+            write_snapshot(self.metadata, self.metadata_snapshot_path)
+            log.debug("Saved metadata snapshot to %s", self.metadata_snapshot_path)
+        except Exception:
+            log.warning("Failed saving metadata snapshot to %s", self.metadata_snapshot_path, exc_info=True)
+
     def __enter__(self):
         return self
 
@@ -1676,6 +1855,8 @@ class Cluster(object):
         for listener in self.listeners:
             listener.on_remove(host)
         self.control_connection.on_remove(host)
+        if self.metrics_enabled:
+            self.metrics.on_host_removed(host)
 
     def signal_connection_failure(self, host, connection_exc, is_host_addition, expect_host_to_be_down=False):
         is_down = host.signal_connection_failure(connection_exc)
@@ -1726,6 +1907,37 @@ class Cluster(object):
         with self._listener_lock:
             return self._listeners.copy()
 
+    def get_in_flight_requests(self, host):
+        """
+        Returns the number of requests sent to `host` by all sessions of this
+        cluster that have not been answered yet.
+
+        .. versionadded:: 3.17.0
+        """
+        in_flight = 0
+        for session in tuple(self.sessions):
+            pool = session._pools.get(host)
+            if pool is not None:
+                in_flight += pool.in_flight
+        return in_flight
+
+    def register_latency_tracker(self, tracker):
+        """
+        Adds a :class:`cassandra.policies.LatencyTracker` to be notified of
+        the latency of every request completed by sessions of this cluster.
+        Registering the same tracker again has no effect.
+
+        .. versionadded:: 3.17.0
+        """
+        with self._listener_lock:
+            if tracker not in self._latency_trackers:
+                self._latency_trackers = self._latency_trackers + (tracker,)
+
+    def unregister_latency_tracker(self, tracker):
+        """ Removes a registered latency tracker. """
+        with self._listener_lock:
+            self._latency_trackers = tuple(t for t in self._latency_trackers if t is not tracker)
+
     def _ensure_core_connections(self):
         """
         If any host has fewer than the configured number of core connections
@@ -1875,47 +2087,46 @@ class Cluster(object):
         self.schema_metadata_enabled = enabled
         self.token_metadata_enabled = enabled
 
-    @classmethod
-    def _send_chunks(cls, connection, host, chunks, set_keyspace=False):
-        for ks_chunk in chunks:
-            messages = [PrepareMessage(query=s.query_string,
-                                       keyspace=s.keyspace if set_keyspace else None)
-                        for s in ks_chunk]
-            # TODO: make this timeout configurable somehow?
-            responses = connection.wait_for_responses(*messages, timeout=5.0, fail_on_error=False)
-            for success, response in responses:
-                if not success:
-                    log.debug("Got unexpected response when preparing "
-                              "statement on host %s: %r", host, response)
+    def _prepare_statements(self, connection, host, statements, set_keyspace=False):
+        messages = [PrepareMessage(query=s.query_string, keyspace=s.keyspace if set_keyspace else None)
+                    for s in statements]
+        responses = connection.wait_for_pipelined_responses(messages, self.reprepare_window,
+                                                            timeout=_REPREPARE_TIMEOUT)
+        for success, response in responses:
+            if not success:
+                log.debug("Got unexpected response when preparing "
+                          "statement on host %s: %r", host, response)
 
     def _prepare_all_queries(self, host):
         if not self._prepared_statements or not self.reprepare_on_up:
             return
 
+        with self._prepared_statement_lock:
+            statements = list(self._prepared_statements.values())
+        # the most recently bound statements are needed first
+        statements.sort(key=lambda s: s._last_bound, reverse=True)
+
         log.debug("Preparing all known prepared statements against host %s", host)
+        start = time.time()
         connection = None
         try:
             connection = self.connection_factory(host.address)
-            statements = self._prepared_statements.values()
             if ProtocolVersion.uses_keyspace_flag(self.protocol_version):
                 # V5 protocol and higher, no need to set the keyspace
-                chunks = []
-                for i in range(0, len(statements), 10):
-                    chunks.append(statements[i:i + 10])
-                    self._send_chunks(connection, host, chunks, True)
+                self._prepare_statements(connection, host, statements, True)
             else:
-                for keyspace, ks_statements in groupby(statements, lambda s: s.keyspace):
+                ks_statements = OrderedDict()
+                for statement in statements:
+                    ks_statements.setdefault(statement.keyspace, []).append(statement)
+                for keyspace, statements in six.iteritems(ks_statements):
                     if keyspace is not None:
                         connection.set_keyspace_blocking(keyspace)
+                    self._prepare_statements(connection, host, statements)
 
-                    # prepare 10 statements at a time
-                    ks_statements = list(ks_statements)
-                    chunks = []
-                    for i in range(0, len(ks_statements), 10):
-                        chunks.append(ks_statements[i:i + 10])
-                    self._send_chunks(connection, host, chunks)
-
-            log.debug("Done preparing all known prepared statements against host %s", host)
+            prepare_time = time.time() - start
+            log.debug("Done preparing all known prepared statements against host %s in %.3fs", host, prepare_time)
+            if self.metrics_enabled:
+                self.metrics.on_host_reprepared(host, prepare_time)
         except OperationTimedOut as timeout:
             log.warning("Timed out trying to prepare all statements on host %s: %s", host, timeout)
         except (ConnectionException, socket.error) as exc:
@@ -2070,6 +2281,16 @@ class Session(object):
     .. versionadded:: 2.0.0
     """
 
+    default_fetch_ahead = 0
+    """
+    The number of pages that iterating over a :class:`.ResultSet` requests
+    ahead of the page being consumed. With the default of ``0``, the next page
+    is only requested when the current one runs out. See
+    :attr:`.ResultSet.fetch_ahead`.
+
+    .. versionadded:: 3.17.0
+    """
+
     use_client_timestamp = True
     """
     When using protocol version 3 or higher, write timestamps may be supplied
@@ -2137,6 +2358,18 @@ class Session(object):
     When compiled with Cython, there are also built-in faster alternatives. See :ref:`faster_deser`
     """
 
+    request_throttler = None
+    """
+    An optional :class:`~.RequestThrottler` bounding the requests this session
+    has in flight, such as :class:`~.ConcurrencyLimitingRequestThrottler` or
+    :class:`~.RateLimitingRequestThrottler`. Requests which cannot be sent yet
+    are queued; when the queue is full, :meth:`.execute_async` and
+    :meth:`.execute` raise :exc:`~.RequestThrottled`.
+
+    Only the initial request is throttled; retries and the fetching of further
+    pages are not. Defaults to :const:`None` (no throttling).
+    """
+
     _lock = None
     _pools = None
     _profile_manager = None
@@ -2248,9 +2481,89 @@ class Session(object):
         future = self._create_response_future(query, parameters, trace, custom_payload, timeout, execution_profile, paging_state)
         future._protocol_handler = self.client_protocol_handler
         self._on_request(future)
-        future.send_request()
+        throttler = self.request_throttler
+        if throttler is None:
+            future.send_request()
+        else:
+            future._throttler = throttler
+            try:
+                throttler.submit(future)
+            except RequestThrottled:
+                future._throttler = None
+                future._cancel_timer()
+                if self._metrics is not None:
+                    self._metrics.on_throttled()
+                raise
         return future
 
+    def bulk_load(self, prepared_statement, parameters, max_in_flight_per_host=32, batch_size=None,
+                  timeout=_NOT_SET, raise_on_first_error=True):
+        """
+        Writes every sequence of parameters in `parameters` with
+        `prepared_statement` (usually an ``INSERT``) and returns a
+        :class:`~.BulkLoadResult` with the number of rows written, the
+        throughput and any failures.
+
+        `parameters` is consumed as it is iterated, so it may be a generator
+        over an input much larger than memory. Each row is attributed to the
+        replica the load balancing policy will send it to first (with
+        :class:`~.TokenAwarePolicy`), and at most `max_in_flight_per_host`
+        requests are outstanding per host. When a host is saturated, reading
+        the input pauses until one of its requests completes.
+
+        If `batch_size` is set, consecutive rows for the same partition are
+        grouped into ``UNLOGGED`` batches of up to `batch_size` rows; sort
+        the input by partition to benefit from this. `timeout` applies to
+        each request, as in :meth:`.execute_async`.
+
+        If `raise_on_first_error` is left as :const:`True`, the load stops
+        at the first failure and raises it. Otherwise, failures are counted
+        in the result and the load continues.
+
+        Example usage::
+
+            >>> insert = session.prepare("INSERT INTO users (id, name) VALUES (?, ?)")
+            >>> result = session.bulk_load(insert, ((i, 'user%d' % i) for i in range(1000000)),
+            ...                            raise_on_first_error=False)
+            >>> print(result.rows_per_second, result.failed_rows)
+
+        .. versionadded:: 3.17.0
+        """
+        from cassandra.concurrent import bulk_load
+        return bulk_load(self, prepared_statement, parameters, max_in_flight_per_host, batch_size,
+                         timeout, raise_on_first_error)
+
+    def scan_table(self, keyspace, table, columns=None, splits_per_host=1, max_in_flight_per_host=2,
+                   fetch_size=None, timeout=_NOT_SET):
+        """
+        Returns a generator over all rows of `table` in `keyspace`, selecting
+        `columns` (a list of column names, or all columns by default).
+
+        The table is read by token range: each range of the token ring is
+        split into enough sub-ranges to make about `splits_per_host` per
+        host, and each sub-range is queried with
+        ``token(<partition key>) > ? AND token(<partition key>) <= ?``, routed
+        to its replicas through :attr:`.Statement.routing_token` (with
+        :class:`~.TokenAwarePolicy`). Up to `max_in_flight_per_host` ranges
+        are paged through concurrently per host, and a range only requests
+        its next page once the current one is taken, so memory stays bounded
+        by the number of ranges in flight times `fetch_size` rows
+        (:attr:`.default_fetch_size` by default).
+
+        Rows of different ranges are interleaved, in no particular order.
+        If a query fails, its exception is raised from the generator.
+
+        Example usage::
+
+            >>> for row in session.scan_table('mykeyspace', 'users', ['id', 'name'], splits_per_host=16):
+            ...     export(row)
+
+        .. versionadded:: 3.17.0
+        """
+        from cassandra.concurrent import scan_table
+        return scan_table(self, keyspace, table, columns, splits_per_host, max_in_flight_per_host,
+                          fetch_size, timeout)
+
     def _create_response_future(self, query, parameters, trace, custom_payload, timeout, execution_profile=EXEC_PROFILE_DEFAULT, paging_state=None):
         """ Returns the ResponseFuture before calling send_request() on it """
 
@@ -2336,10 +2649,13 @@ class Session(object):
         message.paging_state = paging_state
 
         spec_exec_plan = spec_exec_policy.new_plan(query.keyspace or self.keyspace, query) if query.is_idempotent and spec_exec_policy else None
-        return ResponseFuture(
+        future = ResponseFuture(
             self, message, query, timeout, metrics=self._metrics,
             prepared_statement=prepared_statement, retry_policy=retry_policy, row_factory=row_factory,
             load_balancer=load_balancing_policy, start_time=start_time, speculative_execution_plan=spec_exec_plan)
+        future.fetch_ahead = self.default_fetch_ahead
+        future._latency_trackers = self.cluster._latency_trackers
+        return future
 
     def _get_execution_profile(self, ep):
         profiles = self.cluster.profile_manager.profiles
@@ -2797,6 +3113,7 @@ class ControlConnection(object):
     _is_shutdown = False
     _timeout = None
     _protocol_version = None
+    _metadata_from_snapshot = False
 
     _schema_event_refresh_window = None
     _topology_event_refresh_window = None
@@ -2840,6 +3157,8 @@ class ControlConnection(object):
 
         self._protocol_version = self._cluster.protocol_version
         self._set_new_connection(self._reconnect_internal())
+        # later connections refresh metadata as usual
+        self._metadata_from_snapshot = False
 
     def _set_new_connection(self, conn):
         """
@@ -2917,6 +3236,11 @@ class ControlConnection(object):
                 "SCHEMA_CHANGE": partial(_watch_callback, self_weakref, '_handle_schema_change')
             }, register_timeout=self._timeout)
 
+            if self._metadata_from_snapshot:
+                # refreshed by the cluster once connected
+                log.debug("[control connection] Using metadata loaded from snapshot")
+                return connection
+
             sel_peers = self._SELECT_PEERS if self._token_meta_enabled else self._SELECT_PEERS_NO_TOKENS
             sel_local = self._SELECT_LOCAL if self._token_meta_enabled else self._SELECT_LOCAL_NO_TOKENS
             peers_query = QueryMessage(query=sel_peers, consistency_level=ConsistencyLevel.ONE)
@@ -3031,6 +3355,12 @@ class ControlConnection(object):
 
         return True
 
+    def _load_keyspace_metadata(self, keyspace):
+        connection = self._connection
+        if not connection:
+            raise DriverException("Cannot load metadata of keyspace '%s' without a control connection" % (keyspace,))
+        return self._cluster.metadata._get_full_keyspace(connection, self._timeout, keyspace)
+
     def refresh_node_list_and_token_map(self, force_token_rebuild=False):
         try:
             if self._connection:
@@ -3373,6 +3703,24 @@ def _stop_scheduler(scheduler, thread):
     thread.join()
 
 
+class _ScheduledTask(object):
+    """
+    A handle to a task scheduled with :class:`_Scheduler`, which can be
+    canceled until it starts running.
+    """
+
+    __slots__ = ('scheduler', 'run_at', 'task', 'canceled')
+
+    def __init__(self, scheduler, run_at, task):
+        self.scheduler = scheduler
+        self.run_at = run_at
+        self.task = task
+        self.canceled = False
+
+    def cancel(self):
+        self.scheduler._cancel(self)
+
+
 class _Scheduler(Thread):
 
     _queue = None
@@ -3381,10 +3729,14 @@ class _Scheduler(Thread):
     is_shutdown = False
 
     def __init__(self, executor):
-        self._queue = Queue.PriorityQueue()
-        self._scheduled_tasks = set()
+        # heap of (run_at, count, _ScheduledTask); canceled tasks stay in the
+        # heap until they reach the top
+        self._queue = []
+        # task -> _ScheduledTask, for schedule_unique
+        self._scheduled_tasks = {}
         self._count = count()
         self._executor = executor
+        self._condition = Condition()
 
         Thread.__init__(self, name="Task Scheduler")
         self.daemon = True
@@ -3396,53 +3748,84 @@ class _Scheduler(Thread):
         except AttributeError:
             # this can happen on interpreter shutdown
             pass
-        self.is_shutdown = True
-        self._queue.put_nowait((0, 0, None))
+        with self._condition:
+            self.is_shutdown = True
+            self._condition.notify()
         self.join()
 
     def schedule(self, delay, fn, *args, **kwargs):
-        self._insert_task(delay, (fn, args, tuple(kwargs.items())))
+        """
+        Runs `fn` with the given arguments on the executor after `delay`
+        seconds. Returns a handle with a ``cancel()`` method, or :const:`None`
+        after shutdown.
+        """
+        return self._insert_task(delay, (fn, args, tuple(kwargs.items())))
 
     def schedule_unique(self, delay, fn, *args, **kwargs):
         task = (fn, args, tuple(kwargs.items()))
-        if task not in self._scheduled_tasks:
-            self._insert_task(delay, task)
+        with self._condition:
+            scheduled = self._scheduled_tasks.get(task)
+        if scheduled is None:
+            return self._insert_task(delay, task)
         else:
             log.debug("Ignoring schedule_unique for already-scheduled task: %r", task)
+            return scheduled
 
     def _insert_task(self, delay, task):
-        if not self.is_shutdown:
-            run_at = time.time() + delay
-            self._scheduled_tasks.add(task)
-            self._queue.put_nowait((run_at, next(self._count), task))
-        else:
-            log.debug("Ignoring scheduled task after shutdown: %r", task)
+        with self._condition:
+            if self.is_shutdown:
+                log.debug("Ignoring scheduled task after shutdown: %r", task)
+                return None
+            scheduled = _ScheduledTask(self, time.time() + delay, task)
+            self._scheduled_tasks[task] = scheduled
+            heappush(self._queue, (scheduled.run_at, next(self._count), scheduled))
+            if self._queue[0][2] is scheduled:
+                # the new task is due first, wake up to wait for it instead
+                self._condition.notify()
+            return scheduled
+
+    def _cancel(self, scheduled):
+        with self._condition:
+            scheduled.canceled = True
+            if self._scheduled_tasks.get(scheduled.task) is scheduled:
+                del self._scheduled_tasks[scheduled.task]
 
     def run(self):
         while True:
-            if self.is_shutdown:
+            scheduled = self._next_due_task()
+            if scheduled is None:
                 return
+            fn, args, kwargs = scheduled.task
+            kwargs = dict(kwargs)
+            future = self._executor.submit(fn, *args, **kwargs)
+            future.add_done_callback(self._log_if_failed)
+
+    def _next_due_task(self):
+        # sleeps until the first task is due, or returns None on shutdown
+        queue = self._queue
+        with self._condition:
+            while True:
+                if self.is_shutdown:
+                    if queue:
+                        log.debug("Not executing scheduled tasks due to Scheduler shutdown")
+                    return None
+
+                while queue and queue[0][2].canceled:
+                    heappop(queue)
+
+                if not queue:
+                    self._condition.wait()
+                    continue
 
-            try:
-                while True:
-                    run_at, i, task = self._queue.get(block=True, timeout=None)
-                    if self.is_shutdown:
-                        if task:
-                            log.debug("Not executing scheduled task due to Scheduler shutdown")
-                        return
-                    if run_at <= time.time():
-                        self._scheduled_tasks.discard(task)
-                        fn, args, kwargs = task
-                        kwargs = dict(kwargs)
-                        future = self._executor.submit(fn, *args, **kwargs)
-                        future.add_done_callback(self._log_if_failed)
-                    else:
-                        self._queue.put_nowait((run_at, i, task))
-                        break
-            except Queue.Empty:
-                pass
+                delay = queue[0][0] - time.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
 
-            time.sleep(0.1)
+                scheduled = heappop(queue)[2]
+                if self._scheduled_tasks.get(scheduled.task) is scheduled:
+                    del self._scheduled_tasks[scheduled.task]
+                return scheduled
 
     def _log_if_failed(self, future):
         exc = future.exception()
@@ -3509,6 +3892,12 @@ class ResponseFuture(object):
     message = None
     default_timeout = None
 
+    fetch_ahead = 0
+    """
+    The :attr:`.ResultSet.fetch_ahead` of results returned by :meth:`result()`.
+    Defaults to :attr:`.Session.default_fetch_ahead`.
+    """
+
     _retry_policy = None
     _profile_manager = None
 
@@ -3529,8 +3918,12 @@ class ResponseFuture(object):
     _custom_payload = None
     _warnings = None
     _timer = None
+    _spec_execution_pending = False
     _protocol_handler = ProtocolHandler
     _spec_execution_plan = NoSpeculativeExecutionPlan()
+    _throttler = None
+    _latency_trackers = ()
+    _speculated_executions = None
 
     _warned_timeout = False
 
@@ -3568,14 +3961,19 @@ class ResponseFuture(object):
             spec_delay = self._spec_execution_plan.next_execution(self._current_host)
             if spec_delay >= 0:
                 if self._time_remaining is None or self._time_remaining > spec_delay:
+                    self._spec_execution_pending = True
                     self._timer = self.session.cluster.connection_class.create_timer(spec_delay, self._on_speculative_execute)
                     return
+                self._spec_execution_plan.cancel()
             if self._time_remaining is not None:
                 self._timer = self.session.cluster.connection_class.create_timer(self._time_remaining, self._on_timeout)
 
     def _cancel_timer(self):
         if self._timer:
             self._timer.cancel()
+        if self._spec_execution_pending:
+            self._spec_execution_pending = False
+            self._spec_execution_plan.cancel()
 
     def _on_timeout(self, _attempts=0):
         """
@@ -3640,6 +4038,12 @@ class ResponseFuture(object):
                 if self._time_remaining <= 0:
                     self._on_timeout()
                     return
+            # remember the execution in flight, to stop waiting for it once
+            # any of them completes
+            if self._speculated_executions is None:
+                self._speculated_executions = []
+            self._speculated_executions.append((self._connection, self._req_id, self._current_host))
+            self._spec_execution_pending = False
             self.send_request(error_no_hosts=False)
             self._start_timer()
 
@@ -3776,6 +4180,7 @@ class ResponseFuture(object):
         self._event.clear()
         self._final_result = _NOT_SET
         self._final_exception = None
+        self._start_time = time.time()
         self._start_timer()
         self.send_request()
 
@@ -4003,8 +4408,10 @@ class ResponseFuture(object):
 
     def _set_final_result(self, response):
         self._cancel_timer()
-        if self._metrics is not None:
-            self._metrics.request_timer.addValue(time.time() - self._start_time)
+        if self._speculated_executions:
+            self._cancel_speculated_executions()
+        self._on_request_complete(None)
+        self._release_throttler()
 
         with self._callback_lock:
             self._final_result = response
@@ -4025,8 +4432,10 @@ class ResponseFuture(object):
 
     def _set_final_exception(self, response):
         self._cancel_timer()
-        if self._metrics is not None:
-            self._metrics.request_timer.addValue(time.time() - self._start_time)
+        if self._speculated_executions:
+            self._cancel_speculated_executions()
+        self._on_request_complete(response)
+        self._release_throttler()
 
         with self._callback_lock:
             self._final_exception = response
@@ -4044,6 +4453,48 @@ class ResponseFuture(object):
         for callback_partial in to_call:
             callback_partial()
 
+    def _cancel_speculated_executions(self):
+        executions, self._speculated_executions = self._speculated_executions, None
+        executions.append((self._connection, self._req_id, self._current_host))
+        for connection, req_id, host in executions:
+            if connection is None:
+                continue
+            # the execution that completed has already been removed from its
+            # connection, and the stream id may have been reused since
+            request = connection._requests.get(req_id)
+            if request is None or getattr(request[0], 'func', None) != self._set_result:
+                continue
+            try:
+                connection._requests.pop(req_id)
+            except KeyError:
+                continue
+
+            # free the stream id and the connection for other requests, the
+            # response will be ignored
+            pool = self.session._pools.get(host)
+            if pool and not pool.is_shutdown:
+                with connection.lock:
+                    connection.request_ids.append(req_id)
+                pool.return_connection(connection)
+
+    def _on_request_complete(self, exc):
+        if self._metrics is None and not self._latency_trackers:
+            return
+        latency = time.time() - self._start_time
+        if self._metrics is not None:
+            self._metrics.on_request_complete(latency, self._current_host, self.prepared_statement, exc)
+        for tracker in self._latency_trackers:
+            try:
+                tracker.update(self._current_host, self.query, latency, exc)
+            except Exception:
+                log.exception("Error updating latency tracker %s", tracker)
+
+    def _release_throttler(self):
+        # only the first result (or page) of a request releases it
+        throttler, self._throttler = self._throttler, None
+        if throttler is not None:
+            throttler.on_request_done(self)
+
     def _retry(self, reuse_connection, consistency_level, host):
         if self._final_exception:
             # the connection probably broke while we were waiting
@@ -4097,7 +4548,7 @@ class ResponseFuture(object):
         """
         self._event.wait()
         if self._final_result is not _NOT_SET:
-            return ResultSet(self, self._final_result)
+            return ResultSet(self, self._final_result, self.fetch_ahead)
         else:
             raise self._final_exception
 
@@ -4244,6 +4695,23 @@ class ResponseFuture(object):
             self._callbacks = []
             self._errbacks = []
 
+    def __await__(self):
+        """
+        Allows the future to be awaited from a coroutine running in an
+        :mod:`asyncio` event loop. The :class:`.ResultSet` is delivered on the
+        awaiting loop; see :func:`cassandra.aio.wrap_future`.
+
+        Example usage::
+
+            >>> rows = await session.execute_async("SELECT * FROM users")
+            >>> async for row in rows:
+            ...     process_user(row)
+
+        Requires Python 3.5.2 or later.
+        """
+        from cassandra.aio import wrap_future
+        return wrap_future(self).__await__()
+
     def __str__(self):
         result = "(no result yet)" if self._final_result is _NOT_SET else self._final_result
         return "<ResponseFuture: query='%s' request_id=%s result=%s exception=%s coordinator_host=%s>" \
@@ -4281,12 +4749,39 @@ class ResultSet(object):
     be fetched transparently.  However, note that it *is* possible for
     an :class:`Exception` to be raised while fetching the next page, just
     like you might see on a normal call to ``session.execute()``.
+
+    Setting :attr:`fetch_ahead` requests pages before the current one runs
+    out, so iteration does not wait a full round trip at each page boundary::
+
+        >>> results = session.execute(statement)
+        >>> results.fetch_ahead = 2
+        >>> for row in results:
+        ...     process(row)
+    """
+
+    fetch_ahead = 0
+    """
+    The number of pages requested ahead of the page being iterated over.
+    When greater than zero, the next page is requested as soon as the current
+    one is handed out, and at most this many pages are held in addition to the
+    current one. Must be set before iteration starts. Defaults to
+    :attr:`.Session.default_fetch_ahead`.
+
+    While pages are fetched ahead, :attr:`.ResponseFuture.has_more_pages` and
+    the paging state of :attr:`response_future` describe the last page received
+    rather than the current one; use :attr:`has_more_pages` and
+    :attr:`paging_state` of the :class:`.ResultSet` instead.
+
+    .. versionadded:: 3.17.0
     """
 
-    def __init__(self, response_future, initial_response):
+    _prefetcher = None
+
+    def __init__(self, response_future, initial_response, fetch_ahead=0):
         self.response_future = response_future
         self.column_names = response_future._col_names
         self.column_types = response_future._col_types
+        self.fetch_ahead = fetch_ahead
         self._set_current_rows(initial_response)
         self._page_iter = None
         self._list_mode = False
@@ -4296,6 +4791,8 @@ class ResultSet(object):
         """
         True if the last response indicated more pages; False otherwise
         """
+        if self._prefetcher is not None:
+            return self._prefetcher.paging_state is not None
         return self.response_future.has_more_pages
 
     @property
@@ -4326,13 +4823,45 @@ class ResultSet(object):
         if self._list_mode:
             return iter(self._current_rows)
         self._page_iter = iter(self._current_rows)
+        self._start_prefetching()
         return self
 
+    def __aiter__(self):
+        """
+        Asynchronously iterates over all rows from an :mod:`asyncio` coroutine,
+        prefetching the next page while the current one is consumed.
+        See :class:`cassandra.aio.AsyncResultSetIterator`.
+        """
+        from cassandra.aio import AsyncResultSetIterator
+        return AsyncResultSetIterator(self)
+
+    def to_columnar(self):
+        """
+        Consumes all remaining pages and returns them as a
+        :class:`cassandra.columnar.ColumnarResult` of one NumPy column per
+        selected column, without materializing rows or concatenating pages.
+        Should be called before iterating over the results.
+
+        Requires NumPy. Works with any row factory; with
+        :attr:`~cassandra.protocol.NumpyProtocolHandler`, numeric columns
+        are copied from each page without converting values.
+
+        Example usage::
+
+            >>> columns = session.execute("SELECT id, ts, name FROM events").to_columnar()
+            >>> df = pandas.DataFrame({'id': columns['id'], 'ts': columns['ts'],
+            ...                        'name': columns['name'].to_list()})
+
+        .. versionadded:: 3.17.0
+        """
+        from cassandra.columnar import to_columnar
+        return to_columnar(self)
+
     def next(self):
         try:
             return next(self._page_iter)
         except StopIteration:
-            if not self.response_future.has_more_pages:
+            if not self.has_more_pages:
                 if not self._list_mode:
                     self._current_rows = []
                 raise
@@ -4350,7 +4879,9 @@ class ResultSet(object):
         and inspecting :meth:`~.current_page`. It is not necessary to call this when iterating
         through results; paging happens implicitly in iteration.
         """
-        if self.response_future.has_more_pages:
+        if self._start_prefetching():
+            self._set_current_rows(self._prefetcher.next_page())
+        elif self.response_future.has_more_pages:
             self.response_future.start_fetching_next_page()
             result = self.response_future.result()
             self._current_rows = result._current_rows  # ResultSet has already _set_current_rows to the appropriate form
@@ -4367,6 +4898,11 @@ class ResultSet(object):
         except TypeError:
             self._current_rows = [result] if result else []
 
+    def _start_prefetching(self):
+        if self._prefetcher is None and self.fetch_ahead > 0:
+            self._prefetcher = _PagePrefetcher(self.response_future, self.fetch_ahead)
+        return self._prefetcher is not None
+
     def _fetch_all(self):
         self._current_rows = list(self)
         self._page_iter = None
@@ -4446,4 +4982,80 @@ class ResultSet(object):
         The driver treats paging state as opaque, but it may contain primary key data, so applications may want to
         avoid sending this to untrusted parties.
         """
+        if self._prefetcher is not None:
+            return self._prefetcher.paging_state
         return self.response_future._paging_state
+
+
+class _PagePrefetcher(object):
+    """
+    Requests the pages of a paged :class:`.ResponseFuture` ahead of
+    :class:`.ResultSet` iteration, holding at most `depth` pages that have not
+    been handed out yet. Pages are requested one at a time, since each one
+    needs the paging state of the previous one.
+    """
+
+    paging_state = None
+    """
+    The paging state of the last page handed out.
+    """
+
+    def __init__(self, response_future, depth):
+        self.response_future = response_future
+        self.depth = depth
+        self.paging_state = response_future._paging_state
+        self._pages = deque()
+        self._condition = Condition()
+        self._in_flight = False
+        self._failed = False
+        with self._condition:
+            self._fetch_next_page()
+        if self._in_flight:
+            # registered once for all remaining pages; runs immediately if
+            # the page already arrived
+            response_future.add_callbacks(self._on_page, self._on_error)
+
+    def next_page(self):
+        """
+        Returns the rows of the next page, waiting for it if it has not
+        arrived yet, or raises the exception the page failed with. Returns an
+        empty list when there are no more pages.
+        """
+        with self._condition:
+            while not self._pages:
+                if not self._in_flight:
+                    return []
+                self._condition.wait()
+            rows, paging_state, exc = self._pages.popleft()
+            if exc is None:
+                self.paging_state = paging_state
+                self._fetch_next_page()
+        if exc is not None:
+            raise exc
+        return rows
+
+    def _fetch_next_page(self):
+        # called with the condition held
+        if self._in_flight or self._failed or len(self._pages) >= self.depth:
+            return
+        if not self.response_future.has_more_pages:
+            return
+        self._in_flight = True
+        try:
+            self.response_future.start_fetching_next_page()
+        except Exception as exc:
+            self._on_error(exc)
+
+    def _on_page(self, rows):
+        with self._condition:
+            self._pages.append((rows, self.response_future._paging_state, None))
+            self._in_flight = False
+            self._fetch_next_page()
+            self._condition.notify()
+
+    def _on_error(self, exc):
+        with self._condition:
+            self._pages.append((None, None, exc))
+            self._in_flight = False
+            self._failed = True
+            self._condition.notify()
@@ -0,0 +1,305 @@
+# Copyright DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Materializes all pages of a result into one set of typed NumPy columns.
+
+Each page is appended to growable buffers as it arrives, so the result is
+never held as rows and pages are never concatenated. Works with any row
+factory, and with :attr:`~cassandra.protocol.NumpyProtocolHandler`, whose
+pages are already arrays.
+
+=============================================================================
+This module should not be imported by any of the main python-driver modules,
+as numpy is an optional dependency.
+=============================================================================
+"""
+
+from collections import Mapping
+
+import numpy as np
+
+from cassandra import cqltypes
+from cassandra.util import OrderedDict
+
+
+class _GrowableArray(object):
+    """
+    A one dimensional array that doubles its capacity as values are appended.
+    """
+
+    def __init__(self, dtype, capacity=1024):
+        self._data = np.empty((capacity,), dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def extend(self, values):
+        count = len(values)
+        needed = self._size + count
+        if needed > len(self._data):
+            capacity = max(needed, 2 * len(self._data))
+            data = np.empty((capacity,), dtype=self._data.dtype)
+            data[:self._size] = self._data[:self._size]
+            self._data = data
+        self._data[self._size:needed] = values
+        self._size = needed
+
+    def finish(self):
+        # release the unused capacity
+        data = self._data[:self._size].copy()
+        self._data = None
+        return data
+
+
+class TextColumn(object):
+    """
+    A column of ``text``, ``ascii`` or ``blob`` values, stored as one buffer
+    holding all values back to back, as in Arrow: value ``i`` is
+    ``data[offsets[i]:offsets[i + 1]]``. Text is UTF-8 encoded.
+    """
+
+    offsets = None
+    """
+    An ``int64`` array of ``len(column) + 1`` offsets into :attr:`data`.
+    """
+
+    data = None
+    """
+    A ``uint8`` array holding all values.
+    """
+
+    mask = None
+    """
+    A ``bool`` array, :const:`True` where the value is null.
+    """
+
+    def __init__(self, offsets, data, mask, is_text):
+        self.offsets = offsets
+        self.data = data
+        self.mask = mask
+        self._is_text = is_text
+
+    def __len__(self):
+        return len(self.mask)
+
+    def __getitem__(self, i):
+        if self.mask[i]:
+            return None
+        value = self.data[self.offsets[i]:self.offsets[i + 1]].tobytes()
+        return value.decode('utf-8') if self._is_text else value
+
+    def to_list(self):
+        """
+        Returns the values as a list of strings (or bytes for ``blob``
+        columns), with :const:`None` for nulls.
+        """
+        return [self[i] for i in range(len(self))]
+
+
+class ColumnarResult(object):
+    """
+    All rows of a result as one column per selected column, as returned by
+    :meth:`.ResultSet.to_columnar`.
+
+    Numeric, ``boolean``, ``timestamp`` (``datetime64[ms]``), ``date``
+    (``datetime64[D]``) and ``time`` (``timedelta64[ns]``) columns are
+    :class:`numpy.ma.MaskedArray` instances masking nulls. ``text``,
+    ``ascii`` and ``blob`` columns are :class:`.TextColumn` instances. Other
+    types are object arrays holding the values the driver deserialized, with
+    :const:`None` for nulls.
+    """
+
+    columns = None
+    """
+    An ordered dict of column names to columns.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __len__(self):
+        for column in self.columns.values():
+            return len(column)
+        return 0
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def keys(self):
+        return self.columns.keys()
+
+    def __repr__(self):
+        return "<ColumnarResult: rows=%d, columns=%s>" % (len(self), list(self.columns))
+
+
+def _is_null(value):
+    return value is None
+
+
+class _FixedWidthColumnBuilder(object):
+
+    def __init__(self, dtype, convert=None):
+        self.dtype = np.dtype(dtype)
+        self.convert = convert
+        self._values = _GrowableArray(self.dtype)
+        self._mask = _GrowableArray(bool)
+
+    def extend(self, values):
+        if isinstance(values, np.ma.MaskedArray):
+            # a page from NumpyProtocolHandler
+            self._values.extend(values.data)
+            self._mask.extend(np.ma.getmaskarray(values))
+            return
+
+        mask = np.fromiter(map(_is_null, values), dtype=bool, count=len(values))
+        if self.convert is not None:
+            values = [None if v is None else self.convert(v) for v in values]
+        if mask.any():
+            # any placeholder will do, it is masked
+            values = [0 if v is None else v for v in values]
+        self._values.extend(np.asarray(values, dtype=self.dtype))
+        self._mask.extend(mask)
+
+    def finish(self):
+        return np.ma.MaskedArray(self._values.finish(), mask=self._mask.finish())
+
+
+class _TimestampColumnBuilder(_FixedWidthColumnBuilder):
+
+    def __init__(self):
+        _FixedWidthColumnBuilder.__init__(self, 'datetime64[ms]')
+
+    def extend(self, values):
+        mask = np.fromiter(map(_is_null, values), dtype=bool, count=len(values))
+        # None becomes NaT, and is masked as well
+        self._values.extend(np.asarray(list(values), dtype=self.dtype))
+        self._mask.extend(mask)
+
+
+class _TextColumnBuilder(object):
+
+    def __init__(self, is_text):
+        self.is_text = is_text
+        self._offsets = _GrowableArray(np.int64)
+        self._offsets.extend([0])
+        self._data = _GrowableArray(np.uint8)
+        self._mask = _GrowableArray(bool)
+
+    def extend(self, values):
+        mask = np.fromiter(map(_is_null, values), dtype=bool, count=len(values))
+        if self.is_text:
+            encoded = [b'' if v is None else v.encode('utf-8') for v in values]
+        else:
+            encoded = [b'' if v is None else bytes(v) for v in values]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        self._offsets.extend(len(self._data) + np.cumsum(lengths))
+        self._data.extend(np.frombuffer(b''.join(encoded), dtype=np.uint8))
+        self._mask.extend(mask)
+
+    def finish(self):
+        return TextColumn(self._offsets.finish(), self._data.finish(), self._mask.finish(), self.is_text)
+
+
+class _ObjectColumnBuilder(object):
+
+    def __init__(self):
+        self._values = _GrowableArray(object)
+
+    def extend(self, values):
+        array = np.empty((len(values),), dtype=object)
+        # assigned one by one, so that sequences are not broadcast
+        for i, value in enumerate(values):
+            array[i] = value
+        self._values.extend(array)
+
+    def finish(self):
+        return self._values.finish()
+
+
+def _days_from_epoch(date):
+    return date.days_from_epoch
+
+
+def _nanosecond_time(time):
+    return time.nanosecond_time
+
+
+_builder_factories = {
+    cqltypes.LongType: lambda: _FixedWidthColumnBuilder(np.int64),
+    cqltypes.CounterColumnType: lambda: _FixedWidthColumnBuilder(np.int64),
+    cqltypes.Int32Type: lambda: _FixedWidthColumnBuilder(np.int32),
+    cqltypes.ShortType: lambda: _FixedWidthColumnBuilder(np.int16),
+    cqltypes.ByteType: lambda: _FixedWidthColumnBuilder(np.int8),
+    cqltypes.FloatType: lambda: _FixedWidthColumnBuilder(np.float32),
+    cqltypes.DoubleType: lambda: _FixedWidthColumnBuilder(np.float64),
+    cqltypes.BooleanType: lambda: _FixedWidthColumnBuilder(bool),
+    cqltypes.DateType: _TimestampColumnBuilder,
+    cqltypes.SimpleDateType: lambda: _FixedWidthColumnBuilder('datetime64[D]', _days_from_epoch),
+    cqltypes.TimeType: lambda: _FixedWidthColumnBuilder('timedelta64[ns]', _nanosecond_time),
+    cqltypes.UTF8Type: lambda: _TextColumnBuilder(is_text=True),
+    cqltypes.AsciiType: lambda: _TextColumnBuilder(is_text=True),
+    cqltypes.BytesType: lambda: _TextColumnBuilder(is_text=False),
+}
+
+
+def _make_builder(coltype):
+    for cls in getattr(coltype, '__mro__', ()):
+        factory = _builder_factories.get(cls)
+        if factory is not None:
+            return factory()
+    return _ObjectColumnBuilder()
+
+
+def _page_columns(rows, names):
+    """
+    Returns the columns of a page of `rows` as a list of sequences, in the
+    order of `names`.
+    """
+    if len(rows) == 1 and isinstance(rows[0], Mapping) and \
+            all(isinstance(v, np.ndarray) for v in rows[0].values()):
+        # a page from NumpyProtocolHandler, already columnar
+        return [rows[0][name] for name in names]
+    if not rows:
+        return [()] * len(names)
+    if isinstance(rows[0], Mapping):
+        return [[row[name] for row in rows] for name in names]
+    return [list(column) for column in zip(*rows)]
+
+
+def to_columnar(result_set):
+    """
+    Consumes all pages of `result_set` and returns a :class:`.ColumnarResult`.
+    See :meth:`.ResultSet.to_columnar`.
+    """
+    names = result_set.column_names or []
+    types = result_set.column_types or [None] * len(names)
+    builders = [_make_builder(coltype) for coltype in types]
+
+    while True:
+        rows = result_set.current_rows
+        if not isinstance(rows, (list, tuple)):
+            rows = list(rows)
+        for builder, values in zip(builders, _page_columns(rows, names)):
+            builder.extend(values)
+        if not result_set.has_more_pages:
+            break
+        result_set.fetch_next_page()
+
+    return ColumnarResult(OrderedDict(
+        (name, builder.finish()) for name, builder in zip(names, builders)))
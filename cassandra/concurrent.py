@@ -13,15 +13,20 @@
 # limitations under the License.
 
 
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 from heapq import heappush, heappop
 from itertools import cycle
+from math import ceil
 import six
-from six.moves import xrange, zip
+from six.moves import xrange, zip, queue as Queue
 from threading import Condition
 import sys
+import time
 
-from cassandra.cluster import ResultSet
+from cassandra.cluster import ResultSet, _NOT_SET
+from cassandra.metadata import Murmur3Token, MD5Token, BytesToken, MIN_LONG, MAX_LONG, protect_name
+from cassandra.policies import HostDistance
+from cassandra.query import BatchStatement, BatchType
 
 import logging
 log = logging.getLogger(__name__)
@@ -236,3 +241,372 @@ def execute_concurrent_with_args(session, statement, parameters, *args, **kwargs
         execute_concurrent_with_args(session, statement, parameters, concurrency=50)
     """
     return execute_concurrent(session, zip(cycle((statement,)), parameters), *args, **kwargs)
+
+
+def _first_replica(replicas, distance):
+    # the replica TokenAwarePolicy would send a request to first
+    for host in replicas:
+        if host.is_up and distance(host) == HostDistance.LOCAL:
+            return host
+    for host in replicas:
+        if host.is_up:
+            return host
+    return None
+
+
+class BulkLoadResult(object):
+    """
+    A summary of a :func:`bulk_load` run, as returned by
+    :meth:`.Session.bulk_load`.
+    """
+
+    rows = 0
+    """
+    The number of rows written successfully.
+    """
+
+    failed_rows = 0
+    """
+    The number of rows that could not be bound or written.
+    """
+
+    requests = 0
+    """
+    The number of requests (single statements or batches) that completed,
+    successfully or not.
+    """
+
+    failed_requests = 0
+    """
+    The number of requests that failed.
+    """
+
+    errors = None
+    """
+    A list of up to :attr:`max_errors` ``(rows, exception)`` tuples, where
+    ``rows`` is the list of parameter sequences affected by the failure.
+    """
+
+    max_errors = 100
+    """
+    The maximum number of failures kept in :attr:`errors`.
+    """
+
+    elapsed = 0.0
+    """
+    The time the load took, in seconds.
+    """
+
+    def __init__(self):
+        self.errors = []
+
+    @property
+    def rows_per_second(self):
+        """
+        The throughput of the load, in rows written per second.
+        """
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return "<BulkLoadResult: rows=%d, failed_rows=%d, requests=%d, elapsed=%.3f>" % (
+            self.rows, self.failed_rows, self.requests, self.elapsed)
+
+
+class _BulkLoader(object):
+
+    def __init__(self, session, prepared_statement, max_in_flight_per_host, batch_size, timeout, fail_fast):
+        self.session = session
+        self.prepared_statement = prepared_statement
+        self.max_in_flight_per_host = max_in_flight_per_host
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.fail_fast = fail_fast
+
+        cluster = session.cluster
+        self._metadata = cluster.metadata
+        self._distance = cluster._default_load_balancing_policy.distance
+        self._keyspace = prepared_statement.keyspace or session.keyspace
+
+        self._condition = Condition()
+        self._in_flight = defaultdict(int)
+        self._total_in_flight = 0
+        # host -> (routing key, batch, rows) of the batch being filled
+        self._batches = {}
+        self._exception = None
+        self.result = BulkLoadResult()
+
+    def load(self, parameters):
+        start = time.time()
+        for params in parameters:
+            try:
+                bound = self.prepared_statement.bind(params)
+            except (ValueError, TypeError, KeyError) as exc:
+                with self._condition:
+                    self._record_failure([params], exc)
+                    self._raise_if_failed()
+                continue
+
+            host = self._coordinator(bound)
+            if self.batch_size:
+                self._add_to_batch(host, bound, params)
+            else:
+                self._send(host, bound, [params])
+
+        for host, (_, batch, rows) in list(self._batches.items()):
+            self._send(host, batch, rows)
+        self._batches.clear()
+
+        with self._condition:
+            while self._total_in_flight and not (self.fail_fast and self._exception):
+                self._condition.wait()
+            self._raise_if_failed()
+
+        self.result.elapsed = time.time() - start
+        return self.result
+
+    def _coordinator(self, bound):
+        routing_key = bound.routing_key
+        if routing_key is None or self._keyspace is None:
+            return None
+        return _first_replica(self._metadata.get_replicas(self._keyspace, routing_key), self._distance)
+
+    def _add_to_batch(self, host, bound, params):
+        current = self._batches.get(host)
+        if current is not None and current[0] != bound.routing_key:
+            del self._batches[host]
+            self._send(host, current[1], current[2])
+            current = None
+
+        if current is None:
+            batch = BatchStatement(BatchType.UNLOGGED,
+                                   consistency_level=self.prepared_statement.consistency_level)
+            current = (bound.routing_key, batch, [])
+            self._batches[host] = current
+
+        current[1].add(bound)
+        current[2].append(params)
+        if len(current[2]) >= self.batch_size:
+            del self._batches[host]
+            self._send(host, current[1], current[2])
+
+    def _send(self, host, statement, rows):
+        with self._condition:
+            while self._in_flight[host] >= self.max_in_flight_per_host and not (self.fail_fast and self._exception):
+                self._condition.wait()
+            self._raise_if_failed()
+            self._in_flight[host] += 1
+            self._total_in_flight += 1
+
+        try:
+            future = self.session.execute_async(statement, timeout=self.timeout)
+        except Exception as exc:
+            self._on_done(exc, host, rows)
+            return
+        future.add_callbacks(
+            callback=self._on_success, callback_args=(host, rows),
+            errback=self._on_done, errback_args=(host, rows))
+
+    def _on_success(self, result, host, rows):
+        self._on_done(None, host, rows)
+
+    def _on_done(self, exc, host, rows):
+        with self._condition:
+            self._in_flight[host] -= 1
+            self._total_in_flight -= 1
+            self.result.requests += 1
+            if exc is None:
+                self.result.rows += len(rows)
+            else:
+                self.result.failed_requests += 1
+                self._record_failure(rows, exc)
+            self._condition.notify_all()
+
+    def _record_failure(self, rows, exc):
+        # lock must be held
+        result = self.result
+        result.failed_rows += len(rows)
+        if len(result.errors) < result.max_errors:
+            result.errors.append((rows, exc))
+        if self._exception is None:
+            self._exception = exc
+
+    def _raise_if_failed(self):
+        # lock must be held
+        if self.fail_fast and self._exception is not None:
+            raise self._exception
+
+
+def bulk_load(session, prepared_statement, parameters, max_in_flight_per_host=32, batch_size=None,
+              timeout=_NOT_SET, raise_on_first_error=True):
+    """
+    Writes every sequence of parameters in `parameters` with
+    `prepared_statement`, which is usually an ``INSERT``, and returns a
+    :class:`.BulkLoadResult`. See :meth:`.Session.bulk_load`.
+    """
+    if max_in_flight_per_host <= 0:
+        raise ValueError("max_in_flight_per_host must be greater than 0")
+    if batch_size is not None and batch_size <= 0:
+        raise ValueError("batch_size must be greater than 0")
+
+    loader = _BulkLoader(session, prepared_statement, max_in_flight_per_host, batch_size, timeout,
+                         raise_on_first_error)
+    return loader.load(parameters)
+
+
+# the (exclusive) lower and (inclusive) upper bounds of token values, per
+# partitioner; ranges can only be split when both are integers
+_TOKEN_BOUNDS = {
+    Murmur3Token: (MIN_LONG, MAX_LONG),
+    MD5Token: (-1, 2 ** 127),
+    BytesToken: (b'', None)
+}
+
+
+class _TableScanner(object):
+
+    def __init__(self, session, keyspace, table, columns, splits_per_host, max_in_flight_per_host,
+                 fetch_size, timeout):
+        self.session = session
+        self.keyspace = keyspace
+        self.table = table
+        self.columns = columns
+        self.splits_per_host = splits_per_host
+        self.max_in_flight_per_host = max_in_flight_per_host
+        self.fetch_size = fetch_size
+        self.timeout = timeout
+
+        cluster = session.cluster
+        self._metadata = cluster.metadata
+        self._distance = cluster._default_load_balancing_policy.distance
+
+        # host -> list of (statement, (start, end), routing token) still to query
+        self._ranges = defaultdict(list)
+        self._in_flight = defaultdict(int)
+        self._total_in_flight = 0
+        self._pages = Queue.Queue()
+
+    def scan(self):
+        for host in list(self._ranges):
+            for _ in range(self.max_in_flight_per_host):
+                self._query_next_range(host)
+
+        while self._total_in_flight:
+            host, future, rows, exc = self._pages.get()
+            if exc is not None:
+                raise exc
+            if future.has_more_pages:
+                # request the next page of this range before handing out the
+                # current one; at most one page per range is held
+                future.start_fetching_next_page()
+            else:
+                self._in_flight[host] -= 1
+                self._total_in_flight -= 1
+                self._query_next_range(host)
+            for row in rows:
+                yield row
+
+    def plan(self):
+        try:
+            table_meta = self._metadata.keyspaces[self.keyspace].tables[self.table]
+        except KeyError:
+            raise ValueError("Unknown table %s.%s" % (self.keyspace, self.table))
+
+        partition_key = ", ".join(protect_name(c.name) for c in table_meta.partition_key)
+        select = "SELECT %s FROM %s.%s" % (
+            ", ".join(protect_name(c) for c in self.columns) if self.columns else "*",
+            protect_name(self.keyspace), protect_name(self.table))
+
+        token_map = self._metadata.token_map
+        if token_map is None or not token_map.ring:
+            # without token metadata, there is a single unrestricted range
+            self._ranges[None].append((self._prepare(select), (), None))
+            return
+
+        range_statement = self._prepare("%s WHERE token(%s) > ? AND token(%s) <= ?" % (select, partition_key, partition_key))
+        tail_statement = self._prepare("%s WHERE token(%s) > ?" % (select, partition_key))
+
+        ring = token_map.ring
+        token_class = token_map.token_class
+        min_value, max_value = _TOKEN_BOUNDS[token_class]
+        num_hosts = len(set(token_map.token_to_host_owner.values()))
+        splits_per_range = max(1, int(ceil(float(self.splits_per_host) * num_hosts / len(ring))))
+
+        for i, token in enumerate(ring):
+            # each token owns the range from the previous token (exclusive)
+            # to itself (inclusive); the first one wraps around the ring
+            start = ring[i - 1].value
+            end = token.value
+            if i == 0:
+                bounds = [(start, max_value), (min_value, end)]
+            else:
+                bounds = [(start, end)]
+
+            host = _first_replica(token_map.get_replicas(self.keyspace, token), self._distance)
+            for start, end in bounds:
+                if end is None:
+                    self._ranges[host].append((tail_statement, (start,), token))
+                    continue
+                for sub_range in self._split(start, end, splits_per_range, max_value):
+                    self._ranges[host].append((range_statement, sub_range, token))
+
+        for ranges in self._ranges.values():
+            # ranges are popped from the end
+            ranges.reverse()
+
+    @staticmethod
+    def _split(start, end, splits, max_value):
+        if splits == 1 or max_value is None or end - start < splits:
+            return [(start, end)]
+        points = [start + (end - start) * i // splits for i in range(splits + 1)]
+        return list(zip(points[:-1], points[1:]))
+
+    def _prepare(self, query):
+        statement = self.session.prepare(query)
+        statement.is_idempotent = True
+        if self.fetch_size is not None:
+            statement.fetch_size = self.fetch_size
+        return statement
+
+    def _query_next_range(self, host):
+        ranges = self._ranges.get(host)
+        if not ranges:
+            return
+        statement, values, token = ranges.pop()
+        bound = statement.bind(values)
+        bound.routing_token = token
+
+        self._in_flight[host] += 1
+        self._total_in_flight += 1
+        try:
+            future = self.session.execute_async(bound, timeout=self.timeout)
+        except Exception as exc:
+            self._on_error(exc, host, None)
+            return
+        # registered once for all pages of the range
+        future.add_callbacks(
+            callback=self._on_page, callback_args=(host, future),
+            errback=self._on_error, errback_args=(host, future))
+
+    def _on_page(self, rows, host, future):
+        self._pages.put((host, future, rows, None))
+
+    def _on_error(self, exc, host, future):
+        self._pages.put((host, future, None, exc))
+
+
+def scan_table(session, keyspace, table, columns=None, splits_per_host=1, max_in_flight_per_host=2,
+               fetch_size=None, timeout=_NOT_SET):
+    """
+    Returns a generator over all rows of `table`, queried by token range.
+    See :meth:`.Session.scan_table`.
+    """
+    if splits_per_host <= 0:
+        raise ValueError("splits_per_host must be greater than 0")
+    if max_in_flight_per_host <= 0:
+        raise ValueError("max_in_flight_per_host must be greater than 0")
+
+    scanner = _TableScanner(session, keyspace, table, columns, splits_per_host, max_in_flight_per_host,
+                            fetch_size, timeout)
+    # planned before iteration starts, so that errors are raised here
+    scanner.plan()
+    return scanner.scan()
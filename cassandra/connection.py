@@ -16,15 +16,15 @@ from __future__ import absolute_import  # to enable import io from stdlib
 from collections import defaultdict, deque
 import errno
 from functools import wraps, partial
-from heapq import heappush, heappop
 import io
 import logging
+from math import ceil
 import six
 from six.moves import range
 import socket
 import struct
 import sys
-from threading import Thread, Event, RLock
+from threading import Thread, Event, RLock, Condition
 import time
 
 try:
@@ -145,6 +145,44 @@ class _Frame(object):
 NONBLOCKING = (errno.EAGAIN, errno.EWOULDBLOCK)
 
 
+def pop_coalesced(chunks, max_size):
+    """
+    Pops queued chunks from the left of the deque `chunks` and joins them
+    into a single buffer of at most `max_size` bytes (a first chunk larger
+    than that is returned as is). Raises :exc:`IndexError` if `chunks` is
+    empty. The caller is responsible for holding the deque's lock.
+    """
+    first = chunks.popleft()
+    size = len(first)
+    if not chunks or size >= max_size:
+        return first
+
+    parts = [first]
+    while chunks and size + len(chunks[0]) <= max_size:
+        chunk = chunks.popleft()
+        parts.append(chunk)
+        size += len(chunk)
+    return b''.join(parts) if len(parts) > 1 else first
+
+
+def drain_coalesced(first, get_nowait, empty_exc, max_size):
+    """
+    Joins `first` with chunks already waiting in a queue, taken with
+    `get_nowait` until it raises `empty_exc` or at least `max_size` bytes
+    are collected.
+    """
+    size = len(first)
+    parts = [first]
+    while size < max_size:
+        try:
+            chunk = get_nowait()
+        except empty_exc:
+            break
+        parts.append(chunk)
+        size += len(chunk)
+    return b''.join(parts) if len(parts) > 1 else first
+
+
 class ConnectionException(Exception):
     """
     An unrecoverable error was hit when attempting to use a connection,
@@ -207,6 +245,19 @@ if six.PY3:
 else:
     int_from_buf_item = ord
 
+if hasattr(io.BytesIO, 'getbuffer'):
+    def _get_buffer_view(iobuf):
+        return iobuf.getbuffer()
+
+    def _release_buffer_view(view):
+        view.release()
+else:
+    def _get_buffer_view(iobuf):
+        return memoryview(iobuf.getvalue())
+
+    def _release_buffer_view(view):
+        pass
+
 
 class Connection(object):
 
@@ -215,6 +266,10 @@ class Connection(object):
     in_buffer_size = 4096
     out_buffer_size = 4096
 
+    # Reactors join frames queued for writing into a single send of up to this
+    # many bytes, to cut the number of send calls with many small requests.
+    max_coalesced_write_size = 65536
+
     cql_version = None
     no_compact = False
     protocol_version = ProtocolVersion.MAX_SUPPORTED
@@ -540,6 +595,50 @@ class Connection(object):
             self.defunct(exc)
             raise
 
+    def wait_for_pipelined_responses(self, msgs, window, timeout=None):
+        """
+        Sends `msgs` keeping at most `window` of them in flight, and returns
+        a list of (success, response) tuples in the same order, as
+        :meth:`wait_for_responses` with ``fail_on_error=False`` does.
+
+        :exc:`.OperationTimedOut` is raised if no response is received for
+        `timeout` seconds.
+        """
+        if self.is_closed or self.is_defunct:
+            raise ConnectionShutdown("Connection %s is already closed" % (self, ))
+        msgs = list(msgs)
+        window = max(1, min(window, self.max_request_id + 1))
+        waiter = PipelinedResponseWaiter(self, len(msgs))
+
+        messages_sent = 0
+        while True:
+            with waiter.condition:
+                needed = min(window - waiter.in_flight, len(msgs) - messages_sent)
+            with self.lock:
+                available = max(0, min(needed, self.max_request_id - self.in_flight + 1))
+                request_ids = [self.get_request_id() for _ in range(available)]
+                self.in_flight += available
+            with waiter.condition:
+                waiter.in_flight += available
+
+            for i, request_id in enumerate(request_ids):
+                self.send_msg(msgs[messages_sent + i],
+                              request_id,
+                              partial(waiter.got_response, index=messages_sent + i))
+            messages_sent += available
+
+            with waiter.condition:
+                if waiter.received == len(msgs):
+                    return waiter.responses
+                if waiter.in_flight:
+                    received = waiter.received
+                    waiter.condition.wait(timeout)
+                    if waiter.received == received:
+                        raise OperationTimedOut()
+                    continue
+            # busy wait for space on the connection
+            time.sleep(0.01)
+
     def register_watcher(self, event_type, callback, register_timeout=None):
         """
         Register a callback for a given event type.
@@ -564,46 +663,65 @@ class Connection(object):
         self._push_watchers = {}
 
     @defunct_on_error
-    def _read_frame_header(self):
-        buf = self._iobuf.getvalue()
-        pos = len(buf)
+    def _read_frame_header(self, buf, offset, end):
+        """
+        Parses the frame header starting at `offset` in `buf` in place.
+        Frame offsets are relative to the start of the frame.
+        """
+        pos = end - offset
         if pos:
-            version = int_from_buf_item(buf[0]) & PROTOCOL_VERSION_MASK
+            version = int_from_buf_item(buf[offset]) & PROTOCOL_VERSION_MASK
             if version > ProtocolVersion.MAX_SUPPORTED:
                 raise ProtocolError("This version of the driver does not support protocol version %d" % version)
             frame_header = frame_header_v3 if version >= 3 else frame_header_v1_v2
             # this frame header struct is everything after the version byte
             header_size = frame_header.size + 1
             if pos >= header_size:
-                flags, stream, op, body_len = frame_header.unpack_from(buf, 1)
+                flags, stream, op, body_len = frame_header.unpack_from(buf, offset + 1)
                 if body_len < 0:
                     raise ProtocolError("Received negative body length: %r" % body_len)
                 self._current_frame = _Frame(version, flags, stream, op, header_size, body_len + header_size)
         return pos
 
     def _reset_frame(self):
-        self._iobuf = io.BytesIO(self._iobuf.read())
-        self._iobuf.seek(0, 2)  # io.SEEK_END == 2 (constant not present in 2.6)
         self._current_frame = None
 
     def process_io_buffer(self):
-        while True:
-            if not self._current_frame:
-                pos = self._read_frame_header()
-            else:
-                pos = self._iobuf.tell()
+        """
+        Processes every complete frame currently held in the read buffer.
+
+        Frames are parsed in place, and :meth:`process_msg` is handed a
+        :class:`memoryview` of each body, which is only valid for the duration
+        of that call. Unconsumed bytes are carried over once per call rather
+        than once per frame.
+        """
+        buf = _get_buffer_view(self._iobuf)
+        end = len(buf)
+        offset = 0
+        try:
+            while True:
+                if not self._current_frame:
+                    pos = self._read_frame_header(buf, offset, end)
+                else:
+                    pos = end - offset
 
-            if not self._current_frame or pos < self._current_frame.end_pos:
-                # we don't have a complete header yet or we
-                # already saw a header, but we don't have a
-                # complete message yet
-                return
-            else:
                 frame = self._current_frame
-                self._iobuf.seek(frame.body_offset)
-                msg = self._iobuf.read(frame.end_pos - frame.body_offset)
-                self.process_msg(frame, msg)
+                if not frame or pos < frame.end_pos:
+                    # we don't have a complete header yet or we
+                    # already saw a header, but we don't have a
+                    # complete message yet
+                    break
+
+                self.process_msg(frame, buf[offset + frame.body_offset:offset + frame.end_pos])
+                offset += frame.end_pos
                 self._reset_frame()
+        finally:
+            if offset:
+                # keep only the partial frame; the old buffer is dropped along
+                # with any body views that outlived process_msg
+                self._iobuf = io.BytesIO()
+                self._iobuf.write(buf[offset:end])
+            _release_buffer_view(buf)
 
     @defunct_on_error
     def process_msg(self, header, body):
@@ -966,6 +1084,32 @@ class ResponseWaiter(object):
             return self.responses
 
 
+class PipelinedResponseWaiter(object):
+
+    def __init__(self, connection, num_responses):
+        self.connection = connection
+        self.responses = [None] * num_responses
+        self.in_flight = 0
+        self.received = 0
+        self.condition = Condition()
+
+    def got_response(self, response, index):
+        with self.connection.lock:
+            self.connection.in_flight -= 1
+        if isinstance(response, Exception):
+            if hasattr(response, 'to_exception'):
+                response = response.to_exception()
+            result = (False, response)
+        else:
+            result = (True, response)
+
+        with self.condition:
+            self.responses[index] = result
+            self.in_flight -= 1
+            self.received += 1
+            self.condition.notify()
+
+
 class HeartbeatFuture(object):
     def __init__(self, connection, owner):
         self._exception = None
@@ -1092,6 +1236,10 @@ class Timer(object):
 
     canceled = False
 
+    # set by the TimerManager once the timer is in its wheel
+    _tick = None
+    _slot = None
+
     def __init__(self, timeout, callback):
         self.end = time.time() + timeout
         self.callback = callback
@@ -1101,6 +1249,9 @@ class Timer(object):
 
     def cancel(self):
         self.canceled = True
+        slot = self._slot
+        if slot is not None:
+            slot.discard(self)
 
     def finish(self, time_now):
         if self.canceled:
@@ -1114,16 +1265,42 @@ class Timer(object):
 
 
 class TimerManager(object):
+    """
+    Keeps timers in a hashed timing wheel: a ring of :attr:`wheel_size`
+    slots, each covering :attr:`resolution` seconds. Adding, canceling and
+    expiring a timer are O(1), and canceled timers are removed right away
+    instead of lingering until their end. Timers due more than one turn of
+    the wheel ahead share slots with earlier ones and are skipped until due.
+
+    Timers fire at most :attr:`resolution` seconds late.
+    """
+
+    resolution = 0.001
+    """
+    The number of seconds covered by each slot of the wheel.
+    """
+
+    wheel_size = 16384
+    """
+    The number of slots in the wheel; a power of two.
+    """
 
     def __init__(self):
-        self._queue = []
         self._new_timers = []
+        # slots hold sets of timers, created as needed
+        self._slots = [None] * self.wheel_size
+        self._mask = self.wheel_size - 1
+        # the last tick serviced
+        self._current_tick = None
+        # no timer is due before this tick; it may be earlier than the
+        # first timer when timers were canceled
+        self._next_tick = None
 
     def add_timer(self, timer):
         """
         called from client thread with a Timer object
         """
-        self._new_timers.append((timer.end, timer))
+        self._new_timers.append(timer)
 
     def service_timeouts(self):
         """
@@ -1131,27 +1308,68 @@ class TimerManager(object):
         Called from the event thread
         :return: next end time, or None
         """
-        queue = self._queue
-        if self._new_timers:
-            new_timers = self._new_timers
-            while new_timers:
-                heappush(queue, new_timers.pop())
-
-        if queue:
-            now = time.time()
-            while queue:
-                try:
-                    timer = queue[0][1]
-                    if timer.finish(now):
-                        heappop(queue)
-                    else:
-                        return timer.end
-                except Exception:
-                    log.exception("Exception while servicing timeout callback: ")
+        now = time.time()
+        now_tick = int(now / self.resolution)
+        if self._current_tick is None:
+            self._current_tick = now_tick - 1
+
+        new_timers = self._new_timers
+        while new_timers:
+            self._insert(new_timers.pop())
+
+        next_tick = self._next_tick
+        if next_tick is not None and next_tick <= now_tick:
+            self._expire(max(self._current_tick + 1, next_tick), now_tick, now)
+            self._next_tick = self._find_next_tick(now_tick)
+        self._current_tick = max(self._current_tick, now_tick)
+
+        return self.next_timeout
+
+    def _insert(self, timer):
+        if timer.canceled:
+            return
+        # ticks up to the current one were serviced already
+        tick = max(int(ceil(timer.end / self.resolution)), self._current_tick + 1)
+        index = tick & self._mask
+        slot = self._slots[index]
+        if slot is None:
+            slot = self._slots[index] = set()
+        timer._tick = tick
+        timer._slot = slot
+        slot.add(timer)
+        if self._next_tick is None or tick < self._next_tick:
+            self._next_tick = tick
+
+    def _expire(self, first_tick, now_tick, now):
+        slots = self._slots
+        mask = self._mask
+        for tick in range(first_tick, min(now_tick, first_tick + self.wheel_size - 1) + 1):
+            slot = slots[tick & mask]
+            if not slot:
+                continue
+            # copied, since timers may be canceled from other threads
+            for timer in list(slot):
+                if timer._tick <= now_tick:
+                    slot.discard(timer)
+                    if timer.canceled:
+                        continue
+                    try:
+                        # the timer is due by its tick; don't let float
+                        # rounding against its end time drop it
+                        timer.finish(max(now, timer.end))
+                    except Exception:
+                        log.exception("Exception while servicing timeout callback: ")
+
+    def _find_next_tick(self, now_tick):
+        slots = self._slots
+        mask = self._mask
+        for tick in range(now_tick + 1, now_tick + self.wheel_size + 1):
+            if slots[tick & mask]:
+                return tick
+        return None
 
     @property
     def next_timeout(self):
-        try:
-            return self._queue[0][0]
-        except IndexError:
-            pass
+        next_tick = self._next_tick
+        if next_tick is not None:
+            return next_tick * self.resolution
@@ -32,7 +32,6 @@ from binascii import unhexlify
 import calendar
 from collections import namedtuple
 from decimal import Decimal
-import io
 import logging
 import re
 import socket
@@ -752,14 +751,13 @@ class _SimpleParameterizedType(_ParameterizedType):
 
         subtype, = cls.subtypes
         pack = int32_pack if protocol_version >= 3 else uint16_pack
-        buf = io.BytesIO()
-        buf.write(pack(len(items)))
+        parts = [pack(len(items))]
         inner_proto = max(3, protocol_version)
         for item in items:
             itembytes = subtype.to_binary(item, inner_proto)
-            buf.write(pack(len(itembytes)))
-            buf.write(itembytes)
-        return buf.getvalue()
+            parts.append(pack(len(itembytes)))
+            parts.append(itembytes)
+        return b''.join(parts)
 
 
 class ListType(_SimpleParameterizedType):
@@ -809,8 +807,7 @@ class MapType(_ParameterizedType):
     def serialize_safe(cls, themap, protocol_version):
         key_type, value_type = cls.subtypes
         pack = int32_pack if protocol_version >= 3 else uint16_pack
-        buf = io.BytesIO()
-        buf.write(pack(len(themap)))
+        parts = [pack(len(themap))]
         try:
             items = six.iteritems(themap)
         except AttributeError:
@@ -819,11 +816,11 @@ class MapType(_ParameterizedType):
         for key, val in items:
             keybytes = key_type.to_binary(key, inner_proto)
             valbytes = value_type.to_binary(val, inner_proto)
-            buf.write(pack(len(keybytes)))
-            buf.write(keybytes)
-            buf.write(pack(len(valbytes)))
-            buf.write(valbytes)
-        return buf.getvalue()
+            parts.append(pack(len(keybytes)))
+            parts.append(keybytes)
+            parts.append(pack(len(valbytes)))
+            parts.append(valbytes)
+        return b''.join(parts)
 
 
 class TupleType(_ParameterizedType):
@@ -861,15 +858,15 @@ class TupleType(_ParameterizedType):
                              (len(cls.subtypes), len(val), val))
 
         proto_version = max(3, protocol_version)
-        buf = io.BytesIO()
+        parts = []
         for item, subtype in zip(val, cls.subtypes):
             if item is not None:
                 packed_item = subtype.to_binary(item, proto_version)
-                buf.write(int32_pack(len(packed_item)))
-                buf.write(packed_item)
+                parts.append(int32_pack(len(packed_item)))
+                parts.append(packed_item)
             else:
-                buf.write(int32_pack(-1))
-        return buf.getvalue()
+                parts.append(int32_pack(-1))
+        return b''.join(parts)
 
     @classmethod
     def cql_parameterized_type(cls):
@@ -935,7 +932,7 @@ class UserType(TupleType):
     @classmethod
     def serialize_safe(cls, val, protocol_version):
         proto_version = max(3, protocol_version)
-        buf = io.BytesIO()
+        parts = []
         for i, (fieldname, subtype) in enumerate(zip(cls.fieldnames, cls.subtypes)):
             # first treat as a tuple, else by custom type
             try:
@@ -945,11 +942,11 @@ class UserType(TupleType):
 
             if item is not None:
                 packed_item = subtype.to_binary(item, proto_version)
-                buf.write(int32_pack(len(packed_item)))
-                buf.write(packed_item)
+                parts.append(int32_pack(len(packed_item)))
+                parts.append(packed_item)
             else:
-                buf.write(int32_pack(-1))
-        return buf.getvalue()
+                parts.append(int32_pack(-1))
+        return b''.join(parts)
 
     @classmethod
     def _make_registered_udt_namedtuple(cls, keyspace, name, field_names):
@@ -1,4 +1,4 @@
-from cassandra.connection import Connection, ConnectionShutdown
+from cassandra.connection import Connection, ConnectionShutdown, drain_coalesced
 
 import asyncio
 import logging
@@ -177,6 +177,8 @@ class AsyncioConnection(Connection):
         while True:
             try:
                 next_msg = yield from self._write_queue.get()
+                next_msg = drain_coalesced(next_msg, self._write_queue.get_nowait,
+                                           asyncio.QueueEmpty, self.max_coalesced_write_size)
                 if next_msg:
                     yield from self._loop.sock_sendall(self._socket, next_msg)
             except socket.error as err:
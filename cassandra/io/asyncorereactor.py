@@ -37,7 +37,8 @@ try:
 except ImportError:
     ssl = None  # NOQA
 
-from cassandra.connection import Connection, ConnectionShutdown, NONBLOCKING, Timer, TimerManager
+from cassandra.connection import (Connection, ConnectionShutdown, NONBLOCKING, Timer, TimerManager,
+                                  pop_coalesced)
 
 log = logging.getLogger(__name__)
 
@@ -393,7 +394,7 @@ class AsyncoreConnection(Connection, asyncore.dispatcher):
         while True:
             with self.deque_lock:
                 try:
-                    next_msg = self.deque.popleft()
+                    next_msg = pop_coalesced(self.deque, self.max_coalesced_write_size)
                 except IndexError:
                     self._writable = False
                     return
@@ -18,7 +18,7 @@
 
 import eventlet
 from eventlet.green import socket
-from eventlet.queue import Queue
+from eventlet.queue import Queue, Empty
 from greenlet import GreenletExit
 import logging
 from threading import Event
@@ -26,7 +26,7 @@ import time
 
 from six.moves import xrange
 
-from cassandra.connection import Connection, ConnectionShutdown, Timer, TimerManager
+from cassandra.connection import Connection, ConnectionShutdown, Timer, TimerManager, drain_coalesced
 
 
 log = logging.getLogger(__name__)
@@ -120,7 +120,8 @@ class EventletConnection(Connection):
     def handle_write(self):
         while True:
             try:
-                next_msg = self._write_queue.get()
+                next_msg = drain_coalesced(self._write_queue.get(), self._write_queue.get_nowait,
+                                           Empty, self.max_coalesced_write_size)
                 self._socket.sendall(next_msg)
             except socket.error as err:
                 log.debug("Exception during socket send for %s: %s", self, err)
@@ -13,7 +13,7 @@
 # limitations under the License.
 import gevent
 import gevent.event
-from gevent.queue import Queue
+from gevent.queue import Queue, Empty
 from gevent import socket
 import gevent.ssl
 
@@ -22,7 +22,7 @@ import time
 
 from six.moves import range
 
-from cassandra.connection import Connection, ConnectionShutdown, Timer, TimerManager
+from cassandra.connection import Connection, ConnectionShutdown, Timer, TimerManager, drain_coalesced
 
 
 log = logging.getLogger(__name__)
@@ -108,7 +108,8 @@ class GeventConnection(Connection):
     def handle_write(self):
         while True:
             try:
-                next_msg = self._write_queue.get()
+                next_msg = drain_coalesced(self._write_queue.get(), self._write_queue.get_nowait,
+                                           Empty, self.max_coalesced_write_size)
                 self._socket.sendall(next_msg)
             except socket.error as err:
                 log.debug("Exception in send for %s: %s", self, err)
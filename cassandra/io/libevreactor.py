@@ -25,7 +25,7 @@ import weakref
 from six.moves import range
 
 from cassandra.connection import (Connection, ConnectionShutdown,
-                                  NONBLOCKING, Timer, TimerManager)
+                                  NONBLOCKING, Timer, TimerManager, pop_coalesced)
 try:
     import cassandra.io.libevwrapper as libev
 except ImportError:
@@ -309,7 +309,7 @@ class LibevConnection(Connection):
         while True:
             try:
                 with self._deque_lock:
-                    next_msg = self.deque.popleft()
+                    next_msg = pop_coalesced(self.deque, self.max_coalesced_write_size)
             except IndexError:
                 return
 
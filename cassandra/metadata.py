@@ -12,19 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from array import array
 from binascii import unhexlify
 from bisect import bisect_left
 from collections import defaultdict, Mapping
 from functools import total_ordering
 from hashlib import md5
-from itertools import islice, cycle
 import json
 import logging
 import re
 import six
 from six.moves import zip
 import sys
-from threading import RLock
+from threading import Lock, RLock
 import struct
 import random
 
@@ -40,7 +40,7 @@ from cassandra.encoder import Encoder
 from cassandra.marshal import varint_unpack
 from cassandra.protocol import QueryMessage
 from cassandra.query import dict_factory, bind_params
-from cassandra.util import OrderedDict
+from cassandra.util import OrderedDict, OrderedMap
 from cassandra.pool import HostDistance
 
 
@@ -109,6 +109,10 @@ class Metadata(object):
     token_map = None
     """ A :class:`~.TokenMap` instance describing the ring topology. """
 
+    _lazy_schema = False
+    _eager_keyspaces = frozenset()
+    _keyspace_loader = None
+
     def __init__(self):
         self.keyspaces = {}
         self._hosts = {}
@@ -131,6 +135,12 @@ class Metadata(object):
             return
 
         tt_lower = target_type.lower()
+        if tt_lower != 'keyspace':
+            keyspace_meta = self.keyspaces.get(kwargs.get('keyspace'))
+            if keyspace_meta is not None and keyspace_meta._loader is not None:
+                # contents of a lazy keyspace are up to date whenever they are loaded
+                return
+
         try:
             parse_method = getattr(parser, 'get_' + tt_lower)
             meta = parse_method(self.keyspaces, **kwargs)
@@ -148,9 +158,19 @@ class Metadata(object):
         except AttributeError:
             raise ValueError("Unknown schema target_type: '%s'" % target_type)
 
+    def _get_full_keyspace(self, connection, timeout, keyspace):
+        server_version = self.get_host(connection.host).release_version
+        parser = get_schema_parser(connection, server_version, timeout)
+        return parser.get_full_keyspace(keyspace)
+
     def _rebuild_all(self, parser):
+        if self._lazy_schema and self._keyspace_loader is not None:
+            keyspaces = self._get_lazy_keyspaces(parser)
+        else:
+            keyspaces = parser.get_all_keyspaces()
+
         current_keyspaces = set()
-        for keyspace_meta in parser.get_all_keyspaces():
+        for keyspace_meta in keyspaces:
             current_keyspaces.add(keyspace_meta.name)
             old_keyspace_meta = self.keyspaces.get(keyspace_meta.name, None)
             self.keyspaces[keyspace_meta.name] = keyspace_meta
@@ -167,11 +187,30 @@ class Metadata(object):
         for ksname in removed_keyspaces:
             self._keyspace_removed(ksname)
 
+    def _get_lazy_keyspaces(self, parser):
+        for keyspace_meta in parser.get_keyspaces_only():
+            old_keyspace_meta = self.keyspaces.get(keyspace_meta.name, None)
+            full_keyspace_meta = None
+            # keyspaces whose contents are already loaded stay loaded
+            if keyspace_meta.name in self._eager_keyspaces or \
+                    (old_keyspace_meta is not None and old_keyspace_meta._loader is None):
+                full_keyspace_meta = parser.get_full_keyspace(keyspace_meta.name)
+            if full_keyspace_meta is not None:
+                yield full_keyspace_meta
+            else:
+                keyspace_meta._loader = self._keyspace_loader
+                yield keyspace_meta
+
     def _update_keyspace(self, keyspace_meta, new_user_types=None):
         ks_name = keyspace_meta.name
         old_keyspace_meta = self.keyspaces.get(ks_name, None)
         self.keyspaces[ks_name] = keyspace_meta
-        if old_keyspace_meta:
+        if old_keyspace_meta and old_keyspace_meta._loader is not None:
+            # not loaded yet: the new keyspace will load its contents instead
+            keyspace_meta._loader = old_keyspace_meta._loader
+            if (keyspace_meta.replication_strategy != old_keyspace_meta.replication_strategy):
+                self._keyspace_updated(ks_name)
+        elif old_keyspace_meta:
             keyspace_meta.tables = old_keyspace_meta.tables
             keyspace_meta.user_types = new_user_types if new_user_types is not None else old_keyspace_meta.user_types
             keyspace_meta.indexes = old_keyspace_meta.indexes
@@ -299,10 +338,20 @@ class Metadata(object):
         if not t:
             return []
         try:
-            return t.get_replicas(keyspace, t.token_class.from_key(key))
+            return t.get_replicas_for_key(keyspace, key)
         except NoMurmur3:
             return []
 
+    def get_replicas_for_token(self, keyspace, token):
+        """
+        Returns a list of :class:`.Host` instances that are replicas for a given
+        :class:`.Token`.
+        """
+        t = self.token_map
+        if not t:
+            return []
+        return t.get_replicas(keyspace, token)
+
     def can_support_partitioner(self):
         if self.partitioner.endswith('Murmur3Partitioner') and murmur3 is None:
             return False
@@ -483,72 +532,94 @@ class NetworkTopologyStrategy(ReplicationStrategy):
                          for dc, rf in self.dc_replication_factors.items() if rf > 0)
 
         # build a map of DCs to lists of indexes into `ring` for tokens that
-        # belong to that DC
+        # belong to that DC, along with the owners of those tokens
         dc_to_token_offset = defaultdict(list)
+        dc_to_token_owner = defaultdict(list)
         dc_racks = defaultdict(set)
         hosts_per_dc = defaultdict(set)
         for i, token in enumerate(ring):
             host = token_to_host_owner[token]
             dc_to_token_offset[host.datacenter].append(i)
+            dc_to_token_owner[host.datacenter].append(host)
             if host.datacenter and host.rack:
                 dc_racks[host.datacenter].add(host.rack)
                 hosts_per_dc[host.datacenter].add(host)
 
-        # A map of DCs to an index into the dc_to_token_offset value for that dc.
+        # The replicas a DC contributes for a token only depend on the first
+        # token of that DC at or after it. They are placed once per token of
+        # the DC, and a single sweep of the ring then combines them.
+        dc_replicas = []
+        for dc, token_offsets in dc_to_token_offset.items():
+            if dc not in dc_rf_map:
+                continue
+            dc_replicas.append((token_offsets, self._place_dc_replicas(
+                dc_to_token_owner[dc], dc_rf_map[dc], len(dc_racks[dc]), len(hosts_per_dc[dc]))))
+
+        # A list of indexes into the dc_to_token_offset value for each DC.
         # This is how we keep track of advancing around the ring for each DC.
-        dc_to_current_index = defaultdict(int)
+        dc_current_index = [0] * len(dc_replicas)
 
         replica_map = defaultdict(list)
-        for i in range(len(ring)):
-            replicas = replica_map[ring[i]]
-
-            # go through each DC and find the replicas in that DC
-            for dc in dc_to_token_offset.keys():
-                if dc not in dc_rf_map:
-                    continue
-
+        for i, token in enumerate(ring):
+            replicas = replica_map[token]
+            for dc_index, (token_offsets, placements) in enumerate(dc_replicas):
                 # advance our per-DC index until we're up to at least the
-                # current token in the ring
-                token_offsets = dc_to_token_offset[dc]
-                index = dc_to_current_index[dc]
+                # current token in the ring; past the last token of the DC,
+                # we wrap around to its first one
+                index = dc_current_index[dc_index]
                 num_tokens = len(token_offsets)
                 while index < num_tokens and token_offsets[index] < i:
                     index += 1
-                dc_to_current_index[dc] = index
-
-                replicas_remaining = dc_rf_map[dc]
-                replicas_this_dc = 0
-                skipped_hosts = []
-                racks_placed = set()
-                racks_this_dc = dc_racks[dc]
-                hosts_this_dc = len(hosts_per_dc[dc])
-                for token_offset in islice(cycle(token_offsets), index, index + num_tokens):
-                    host = token_to_host_owner[ring[token_offset]]
-                    if replicas_remaining == 0 or replicas_this_dc == hosts_this_dc:
-                        break
-
-                    if host in replicas:
-                        continue
-
-                    if host.rack in racks_placed and len(racks_placed) < len(racks_this_dc):
-                        skipped_hosts.append(host)
-                        continue
-
-                    replicas.append(host)
-                    replicas_this_dc += 1
-                    replicas_remaining -= 1
-                    racks_placed.add(host.rack)
-
-                    if len(racks_placed) == len(racks_this_dc):
-                        for host in skipped_hosts:
-                            if replicas_remaining == 0:
-                                break
-                            replicas.append(host)
-                            replicas_remaining -= 1
-                        del skipped_hosts[:]
+                dc_current_index[dc_index] = index
+                replicas.extend(placements[index if index < num_tokens else 0])
 
         return replica_map
 
+    @staticmethod
+    def _place_dc_replicas(owners, rf, num_racks, num_hosts):
+        """
+        Returns, for each token of a DC, the replicas in that DC for ranges
+        ending at the token. `owners` holds the owner of each of the DC's
+        tokens, in ring order.
+        """
+        num_tokens = len(owners)
+        placements = []
+        for index in range(num_tokens):
+            replicas = []
+            placed = set()
+            replicas_remaining = rf
+            replicas_this_dc = 0
+            skipped_hosts = []
+            racks_placed = set()
+            for token_index in range(index, index + num_tokens):
+                if replicas_remaining == 0 or replicas_this_dc == num_hosts:
+                    break
+
+                host = owners[token_index % num_tokens]
+                if host in placed:
+                    continue
+
+                if host.rack in racks_placed and len(racks_placed) < num_racks:
+                    skipped_hosts.append(host)
+                    continue
+
+                replicas.append(host)
+                placed.add(host)
+                replicas_this_dc += 1
+                replicas_remaining -= 1
+                racks_placed.add(host.rack)
+
+                if len(racks_placed) == num_racks:
+                    for host in skipped_hosts:
+                        if replicas_remaining == 0:
+                            break
+                        replicas.append(host)
+                        placed.add(host)
+                        replicas_remaining -= 1
+                    del skipped_hosts[:]
+            placements.append(replicas)
+        return placements
+
     def export_for_schema(self):
         """
         Returns a string version of these replication options which are
@@ -584,9 +655,46 @@ class LocalStrategy(ReplicationStrategy):
         return isinstance(other, LocalStrategy)
 
 
+_keyspace_load_lock = Lock()
+
+
+def _lazy_keyspace_attribute(name, doc):
+    attr = '_' + name
+
+    def fget(self):
+        if self._loader is not None:
+            self._load()
+        return getattr(self, attr)
+
+    def fset(self, value):
+        setattr(self, attr, value)
+
+    return property(fget, fset, doc=doc)
+
+
+def _plain_maps(state, *names):
+    # option maps decoded from schema rows are OrderedMaps holding cqltypes;
+    # they are pickled as plain dicts
+    for name in names:
+        if state.get(name) is not None:
+            state[name] = _plain_map(state[name])
+    return state
+
+
+def _plain_map(value):
+    if isinstance(value, (dict, OrderedMap)):
+        return dict((k, _plain_map(v)) for k, v in value.items())
+    return value
+
+
 class KeyspaceMetadata(object):
     """
     A representation of the schema for a single keyspace.
+
+    With :attr:`.Cluster.schema_metadata_lazy`, the tables, indexes,
+    user-defined types, functions, aggregates and views of a keyspace are
+    queried the first time one of them is accessed, which blocks the calling
+    thread.
     """
 
     name = None
@@ -603,41 +711,35 @@ class KeyspaceMetadata(object):
     A :class:`.ReplicationStrategy` subclass object.
     """
 
-    tables = None
-    """
+    tables = _lazy_keyspace_attribute('tables', """
     A map from table names to instances of :class:`~.TableMetadata`.
-    """
+    """)
 
-    indexes = None
-    """
+    indexes = _lazy_keyspace_attribute('indexes', """
     A dict mapping index names to :class:`.IndexMetadata` instances.
-    """
+    """)
 
-    user_types = None
-    """
+    user_types = _lazy_keyspace_attribute('user_types', """
     A map from user-defined type names to instances of :class:`~cassandra.metadata.UserType`.
 
     .. versionadded:: 2.1.0
-    """
+    """)
 
-    functions = None
-    """
+    functions = _lazy_keyspace_attribute('functions', """
     A map from user-defined function signatures to instances of :class:`~cassandra.metadata.Function`.
 
     .. versionadded:: 2.6.0
-    """
+    """)
 
-    aggregates = None
-    """
+    aggregates = _lazy_keyspace_attribute('aggregates', """
     A map from user-defined aggregate signatures to instances of :class:`~cassandra.metadata.Aggregate`.
 
     .. versionadded:: 2.6.0
-    """
+    """)
 
-    views = None
-    """
+    views = _lazy_keyspace_attribute('views', """
     A dict mapping view names to :class:`.MaterializedViewMetadata` instances.
-    """
+    """)
 
     virtual = False
     """
@@ -650,6 +752,9 @@ class KeyspaceMetadata(object):
     _exc_info = None
     """ set if metadata parsing failed """
 
+    _loader = None
+    """ set until the contents of a lazily loaded keyspace are loaded """
+
     def __init__(self, name, durable_writes, strategy_class, strategy_options):
         self.name = name
         self.durable_writes = durable_writes
@@ -661,6 +766,29 @@ class KeyspaceMetadata(object):
         self.aggregates = {}
         self.views = {}
 
+    def __getstate__(self):
+        # the loader of a lazy keyspace and parsing errors are not kept
+        state = self.__dict__.copy()
+        state.pop('_loader', None)
+        state.pop('_exc_info', None)
+        return state
+
+    def _load(self):
+        with _keyspace_load_lock:
+            loader = self._loader
+            if loader is None:
+                return
+            keyspace_meta = loader(self.name)
+            if keyspace_meta is not None:
+                self.tables = keyspace_meta.tables
+                self.indexes = keyspace_meta.indexes
+                self.user_types = keyspace_meta.user_types
+                self.functions = keyspace_meta.functions
+                self.aggregates = keyspace_meta.aggregates
+                self.views = keyspace_meta.views
+                self._exc_info = keyspace_meta._exc_info
+            self._loader = None
+
     def export_as_string(self):
         """
         Returns a CQL query string that can be used to recreate the entire keyspace,
@@ -1124,6 +1252,12 @@ class TableMetadata(object):
         self.views = {}
         self.virtual = virtual
 
+    def __getstate__(self):
+        # parsing errors are not kept, tracebacks can't be pickled
+        state = self.__dict__.copy()
+        state.pop('_exc_info', None)
+        return _plain_maps(state, 'options', 'extensions')
+
     def export_as_string(self):
         """
         Returns a string of CQL queries that can be used to recreate this table
@@ -1414,6 +1548,9 @@ class IndexMetadata(object):
         self.kind = kind
         self.index_options = index_options
 
+    def __getstate__(self):
+        return _plain_maps(self.__dict__.copy(), 'index_options')
+
     def as_cql_query(self):
         """
         Returns a CQL query that can be used to recreate this index.
@@ -1447,6 +1584,9 @@ class IndexMetadata(object):
         return self.as_cql_query() + ';'
 
 
+_NO_REPLICA_MAP = object()
+
+
 class TokenMap(object):
     """
     Information about the layout of the ring.
@@ -1465,7 +1605,8 @@ class TokenMap(object):
     tokens_to_hosts_by_ks = None
     """
     A map of keyspace names to a nested map of :class:`.Token` objects to
-    sets of :class:`.Host` objects.
+    sets of :class:`.Host` objects. Keyspaces with equal replication
+    strategies share the same nested map.
     """
 
     ring = None
@@ -1473,6 +1614,13 @@ class TokenMap(object):
     An ordered list of :class:`.Token` instances in the ring.
     """
 
+    replica_cache_size = 10000
+    """
+    The maximum number of routing keys for which :meth:`get_replicas_for_key`
+    remembers the replicas. Hot partitions are then looked up without
+    hashing the key or searching the ring.
+    """
+
     _metadata = None
 
     def __init__(self, token_class, token_to_host_owner, all_tokens, metadata):
@@ -1483,21 +1631,55 @@ class TokenMap(object):
         self.tokens_to_hosts_by_ks = {}
         self._metadata = metadata
         self._rebuild_lock = RLock()
+        # replica maps are shared by all keyspaces with equal replication
+        # strategies; see _acquire_replica_map
+        self._shared_replica_maps = []
+
+        # Lookups bisect the raw token values rather than Token objects, and
+        # index lists of replicas in ring order rather than hashing Tokens.
+        # Murmur3 values normally fit a signed 64-bit array.
+        self._ring_values = [token.value for token in all_tokens]
+        if token_class is Murmur3Token:
+            try:
+                self._ring_values = array('q', self._ring_values)
+            except OverflowError:
+                pass
+        self._ring_replicas_by_ks = {}
+
+        # recently looked up (keyspace, routing key) pairs, least recently
+        # used first; cleared whenever a keyspace's replicas change
+        self._replica_cache = OrderedDict()
+        self._replica_cache_lock = Lock()
+        self._replica_cache_generation = 0
 
     def rebuild_keyspace(self, keyspace, build_if_absent=False):
         with self._rebuild_lock:
+            previous = (self.tokens_to_hosts_by_ks.get(keyspace, _NO_REPLICA_MAP),
+                        self._ring_replicas_by_ks.get(keyspace, _NO_REPLICA_MAP))
             try:
                 current = self.tokens_to_hosts_by_ks.get(keyspace, None)
                 if (build_if_absent and current is None) or (not build_if_absent and current is not None):
                     ks_meta = self._metadata.keyspaces.get(keyspace)
                     if ks_meta:
-                        replica_map = self.replica_map_for_keyspace(self._metadata.keyspaces[keyspace])
-                        self.tokens_to_hosts_by_ks[keyspace] = replica_map
+                        shared = self._acquire_replica_map(keyspace, ks_meta.replication_strategy)
+                        if shared is None:
+                            self.tokens_to_hosts_by_ks[keyspace] = None
+                            self._ring_replicas_by_ks[keyspace] = None
+                        else:
+                            self.tokens_to_hosts_by_ks[keyspace] = shared.replica_map
+                            self._ring_replicas_by_ks[keyspace] = shared.ring_replicas
             except Exception:
                 # should not happen normally, but we don't want to blow up queries because of unexpected meta state
                 # bypass until new map is generated
+                self._release_replica_map(keyspace)
                 self.tokens_to_hosts_by_ks[keyspace] = {}
+                self._ring_replicas_by_ks[keyspace] = []
                 log.exception("Failed creating a token map for keyspace '%s' with %s. PLEASE REPORT THIS: https://datastax-oss.atlassian.net/projects/PYTHON", keyspace, self.token_to_host_owner)
+            # lookups for keyspaces without a map end up here every time, and
+            # must not discard the cached replicas of other keyspaces
+            if (previous[0] is not self.tokens_to_hosts_by_ks.get(keyspace, _NO_REPLICA_MAP) or
+                    previous[1] is not self._ring_replicas_by_ks.get(keyspace, _NO_REPLICA_MAP)):
+                self._clear_replica_cache()
 
     def replica_map_for_keyspace(self, ks_metadata):
         strategy = ks_metadata.replication_strategy
@@ -1507,29 +1689,118 @@ class TokenMap(object):
             return None
 
     def remove_keyspace(self, keyspace):
-        self.tokens_to_hosts_by_ks.pop(keyspace, None)
+        with self._rebuild_lock:
+            self._release_replica_map(keyspace)
+            self.tokens_to_hosts_by_ks.pop(keyspace, None)
+            self._ring_replicas_by_ks.pop(keyspace, None)
+            self._clear_replica_cache()
+
+    def _acquire_replica_map(self, keyspace, strategy):
+        """
+        Returns the :class:`_SharedReplicaMap` for `strategy`, building it
+        only if no other keyspace uses an equal strategy. Must be called with
+        the rebuild lock held.
+        """
+        shared = self._find_shared_replica_map(keyspace)
+        if shared is not None and shared.strategy == strategy:
+            return shared
+        self._release_replica_map(keyspace)
+
+        if not strategy:
+            return None
+
+        for shared in self._shared_replica_maps:
+            if shared.strategy == strategy:
+                break
+        else:
+            shared = _SharedReplicaMap(strategy, strategy.make_token_replica_map(self.token_to_host_owner, self.ring),
+                                       self.ring)
+            self._shared_replica_maps.append(shared)
+        shared.keyspaces.add(keyspace)
+        return shared
+
+    def _release_replica_map(self, keyspace):
+        shared = self._find_shared_replica_map(keyspace)
+        if shared is not None:
+            shared.keyspaces.discard(keyspace)
+            if not shared.keyspaces:
+                self._shared_replica_maps.remove(shared)
+
+    def _find_shared_replica_map(self, keyspace):
+        for shared in self._shared_replica_maps:
+            if keyspace in shared.keyspaces:
+                return shared
+        return None
 
     def get_replicas(self, keyspace, token):
         """
         Get  a set of :class:`.Host` instances representing all of the
         replica nodes for a given :class:`.Token`.
         """
-        tokens_to_hosts = self.tokens_to_hosts_by_ks.get(keyspace, None)
-        if tokens_to_hosts is None:
+        return self._get_replicas(keyspace, token.value)
+
+    def get_replicas_for_key(self, keyspace, key):
+        """
+        Get a list of :class:`.Host` instances representing all of the
+        replica nodes for a given partition key.
+        """
+        cache_key = (keyspace, key)
+        with self._replica_cache_lock:
+            replicas = self._replica_cache.pop(cache_key, None)
+            if replicas is not None:
+                self._replica_cache[cache_key] = replicas
+                return replicas
+            generation = self._replica_cache_generation
+
+        replicas = self._get_replicas(keyspace, self.token_class.hash_fn(key))
+        if replicas:
+            with self._replica_cache_lock:
+                # don't cache replicas looked up before a concurrent rebuild
+                if generation == self._replica_cache_generation:
+                    self._replica_cache[cache_key] = replicas
+                    if len(self._replica_cache) > self.replica_cache_size:
+                        self._replica_cache.popitem(last=False)
+        return replicas
+
+    def _clear_replica_cache(self):
+        with self._replica_cache_lock:
+            self._replica_cache.clear()
+            self._replica_cache_generation += 1
+
+    def _get_replicas(self, keyspace, token_value):
+        ring_replicas = self._ring_replicas_by_ks.get(keyspace, None)
+        if ring_replicas is None:
             self.rebuild_keyspace(keyspace, build_if_absent=True)
-            tokens_to_hosts = self.tokens_to_hosts_by_ks.get(keyspace, None)
+            ring_replicas = self._ring_replicas_by_ks.get(keyspace, None)
 
-        if tokens_to_hosts:
+        if ring_replicas:
             # The values in self.ring correspond to the end of the
             # token range up to and including the value listed.
-            point = bisect_left(self.ring, token)
-            if point == len(self.ring):
-                return tokens_to_hosts[self.ring[0]]
+            point = bisect_left(self._ring_values, token_value)
+            if point == len(ring_replicas):
+                return ring_replicas[0]
             else:
-                return tokens_to_hosts[self.ring[point]]
+                return ring_replicas[point]
         return []
 
 
+class _SharedReplicaMap(object):
+    """
+    A replica map along with the strategy it was built for and the names of
+    the keyspaces using it. The map is dropped once no keyspace uses it.
+    `ring_replicas` holds the replicas of each token of the ring, in ring
+    order.
+    """
+
+    __slots__ = ('strategy', 'replica_map', 'ring_replicas', 'keyspaces')
+
+    def __init__(self, strategy, replica_map, ring):
+        self.strategy = strategy
+        self.replica_map = replica_map
+        self.ring_replicas = [replica_map[token] for token in ring] if replica_map else []
+        self.keyspaces = set()
+
+
 @total_ordering
 class Token(object):
     """
@@ -1648,6 +1919,9 @@ class TriggerMetadata(object):
         self.name = trigger_name
         self.options = options
 
+    def __getstate__(self):
+        return _plain_maps(self.__dict__.copy(), 'options')
+
     def as_cql_query(self):
         ret = "CREATE TRIGGER %s ON %s.%s USING %s" % (
             protect_name(self.name),
@@ -1767,8 +2041,8 @@ class SchemaParserV22(_SchemaParser):
         self.keyspace_agg_rows = defaultdict(list)
         self.keyspace_table_trigger_rows = defaultdict(lambda: defaultdict(list))
 
-    def get_all_keyspaces(self):
-        self._query_all()
+    def get_all_keyspaces(self, keyspace=None):
+        self._query_all(keyspace)
 
         for row in self.keyspaces_result:
             keyspace_meta = self._build_keyspace_metadata(row)
@@ -1837,6 +2111,28 @@ class SchemaParserV22(_SchemaParser):
         where_clause = bind_params(" WHERE keyspace_name = %s", (keyspace,), _encoder)
         return self._query_build_row(self._SELECT_KEYSPACES + where_clause, self._build_keyspace_metadata)
 
+    def get_keyspaces_only(self):
+        """
+        Returns the metadata of all keyspaces, without their tables, types,
+        functions and aggregates.
+        """
+        return self._query_build_rows(self._SELECT_KEYSPACES, self._build_keyspace_metadata)
+
+    def get_full_keyspace(self, keyspace):
+        """
+        Returns the metadata of a single keyspace with its tables, types,
+        functions and aggregates, or :const:`None` if it does not exist.
+        """
+        for keyspace_meta in self.get_all_keyspaces(keyspace):
+            if keyspace_meta.name == keyspace:
+                return keyspace_meta
+
+    @staticmethod
+    def _keyspace_where_clause(keyspace):
+        if keyspace is None:
+            return ""
+        return bind_params(" WHERE keyspace_name = %s", (keyspace,), _encoder)
+
     @classmethod
     def _build_keyspace_metadata(cls, row):
         try:
@@ -2106,16 +2402,17 @@ class SchemaParserV22(_SchemaParser):
         trigger_meta = TriggerMetadata(table_metadata, name, options)
         return trigger_meta
 
-    def _query_all(self):
+    def _query_all(self, keyspace=None):
         cl = ConsistencyLevel.ONE
+        where_clause = self._keyspace_where_clause(keyspace)
         queries = [
-            QueryMessage(query=self._SELECT_KEYSPACES, consistency_level=cl),
-            QueryMessage(query=self._SELECT_COLUMN_FAMILIES, consistency_level=cl),
-            QueryMessage(query=self._SELECT_COLUMNS, consistency_level=cl),
-            QueryMessage(query=self._SELECT_TYPES, consistency_level=cl),
-            QueryMessage(query=self._SELECT_FUNCTIONS, consistency_level=cl),
-            QueryMessage(query=self._SELECT_AGGREGATES, consistency_level=cl),
-            QueryMessage(query=self._SELECT_TRIGGERS, consistency_level=cl)
+            QueryMessage(query=self._SELECT_KEYSPACES + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_COLUMN_FAMILIES + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_COLUMNS + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_TYPES + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_FUNCTIONS + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_AGGREGATES + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_TRIGGERS + where_clause, consistency_level=cl)
         ]
 
         ((ks_success, ks_result),
@@ -2248,8 +2545,8 @@ class SchemaParserV3(SchemaParserV22):
         self.keyspace_table_index_rows = defaultdict(lambda: defaultdict(list))
         self.keyspace_view_rows = defaultdict(list)
 
-    def get_all_keyspaces(self):
-        for keyspace_meta in super(SchemaParserV3, self).get_all_keyspaces():
+    def get_all_keyspaces(self, keyspace=None):
+        for keyspace_meta in super(SchemaParserV3, self).get_all_keyspaces(keyspace):
             for row in self.keyspace_view_rows[keyspace_meta.name]:
                 view_meta = self._build_view_metadata(row)
                 keyspace_meta._add_view_metadata(view_meta)
@@ -2423,18 +2720,19 @@ class SchemaParserV3(SchemaParserV22):
         trigger_meta = TriggerMetadata(table_metadata, name, options)
         return trigger_meta
 
-    def _query_all(self):
+    def _query_all(self, keyspace=None):
         cl = ConsistencyLevel.ONE
+        where_clause = self._keyspace_where_clause(keyspace)
         queries = [
-            QueryMessage(query=self._SELECT_KEYSPACES, consistency_level=cl),
-            QueryMessage(query=self._SELECT_TABLES, consistency_level=cl),
-            QueryMessage(query=self._SELECT_COLUMNS, consistency_level=cl),
-            QueryMessage(query=self._SELECT_TYPES, consistency_level=cl),
-            QueryMessage(query=self._SELECT_FUNCTIONS, consistency_level=cl),
-            QueryMessage(query=self._SELECT_AGGREGATES, consistency_level=cl),
-            QueryMessage(query=self._SELECT_TRIGGERS, consistency_level=cl),
-            QueryMessage(query=self._SELECT_INDEXES, consistency_level=cl),
-            QueryMessage(query=self._SELECT_VIEWS, consistency_level=cl)
+            QueryMessage(query=self._SELECT_KEYSPACES + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_TABLES + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_COLUMNS + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_TYPES + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_FUNCTIONS + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_AGGREGATES + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_TRIGGERS + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_INDEXES + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_VIEWS + where_clause, consistency_level=cl)
         ]
 
         ((ks_success, ks_result),
@@ -2500,25 +2798,26 @@ class SchemaParserV4(SchemaParserV3):
         self.virtual_tables_rows = defaultdict(list)
         self.virtual_columns_rows = defaultdict(lambda: defaultdict(list))
 
-    def _query_all(self):
+    def _query_all(self, keyspace=None):
         cl = ConsistencyLevel.ONE
+        where_clause = self._keyspace_where_clause(keyspace)
         # todo: this duplicates V3; we should find a way for _query_all methods
         # to extend each other.
         queries = [
             # copied from V3
-            QueryMessage(query=self._SELECT_KEYSPACES, consistency_level=cl),
-            QueryMessage(query=self._SELECT_TABLES, consistency_level=cl),
-            QueryMessage(query=self._SELECT_COLUMNS, consistency_level=cl),
-            QueryMessage(query=self._SELECT_TYPES, consistency_level=cl),
-            QueryMessage(query=self._SELECT_FUNCTIONS, consistency_level=cl),
-            QueryMessage(query=self._SELECT_AGGREGATES, consistency_level=cl),
-            QueryMessage(query=self._SELECT_TRIGGERS, consistency_level=cl),
-            QueryMessage(query=self._SELECT_INDEXES, consistency_level=cl),
-            QueryMessage(query=self._SELECT_VIEWS, consistency_level=cl),
+            QueryMessage(query=self._SELECT_KEYSPACES + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_TABLES + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_COLUMNS + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_TYPES + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_FUNCTIONS + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_AGGREGATES + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_TRIGGERS + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_INDEXES + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_VIEWS + where_clause, consistency_level=cl),
             # V4-only queries
-            QueryMessage(query=self._SELECT_VIRTUAL_KEYSPACES, consistency_level=cl),
-            QueryMessage(query=self._SELECT_VIRTUAL_TABLES, consistency_level=cl),
-            QueryMessage(query=self._SELECT_VIRTUAL_COLUMNS, consistency_level=cl)
+            QueryMessage(query=self._SELECT_VIRTUAL_KEYSPACES + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_VIRTUAL_TABLES + where_clause, consistency_level=cl),
+            QueryMessage(query=self._SELECT_VIRTUAL_COLUMNS + where_clause, consistency_level=cl)
         ]
 
         responses = self.connection.wait_for_responses(
@@ -2581,8 +2880,16 @@ class SchemaParserV4(SchemaParserV3):
             tab_name = row[self._table_name_col]
             m[ks_name][tab_name].append(row)
 
-    def get_all_keyspaces(self):
-        for x in super(SchemaParserV4, self).get_all_keyspaces():
+    def get_keyspaces_only(self):
+        keyspaces = super(SchemaParserV4, self).get_keyspaces_only()
+        # the virtual keyspaces table doesn't exist in some DSE versions reporting 4.X
+        for keyspace_meta in self._query_build_rows(self._SELECT_VIRTUAL_KEYSPACES, self._build_keyspace_metadata):
+            keyspace_meta.virtual = True
+            keyspaces.append(keyspace_meta)
+        return keyspaces
+
+    def get_all_keyspaces(self, keyspace=None):
+        for x in super(SchemaParserV4, self).get_all_keyspaces(keyspace):
             yield x
 
         for row in self.virtual_keyspaces_result:
@@ -2704,6 +3011,9 @@ class MaterializedViewMetadata(object):
         self.where_clause = where_clause
         self.options = options or {}
 
+    def __getstate__(self):
+        return _plain_maps(self.__dict__.copy(), 'options', 'extensions')
+
     def as_cql_query(self, formatted=False):
         """
         Returns a CQL query that can be used to recreate this function.
@@ -12,24 +12,473 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from itertools import chain
+from binascii import hexlify
+from itertools import chain, count
 import logging
+import re
+import six
+from six.moves import range
+import socket
+from threading import Event, Lock, Thread, local
 
 try:
     from greplin import scales
 except ImportError:
-    raise ImportError(
-        "The scales library is required for metrics support: "
-        "https://pypi.org/project/scales/")
+    # the scales stats of Metrics are only kept when the library is installed
+    scales = None
+
+from cassandra import OperationTimedOut, Timeout, Unavailable
+from cassandra.util import OrderedDict
 
 log = logging.getLogger(__name__)
 
 
+# latencies are bucketed in microseconds: values below 2 ** _SUB_BUCKET_BITS
+# get a bucket each, then every power of two is split into
+# 2 ** _SUB_BUCKET_BITS linear buckets, for a relative error of at most 1/32
+_SUB_BUCKET_BITS = 5
+_SUB_BUCKET_COUNT = 1 << _SUB_BUCKET_BITS
+# about 19 hours; larger values are counted in the last bucket
+_MAX_MICROS = (1 << 36) - 1
+_BUCKET_COUNT = (36 - _SUB_BUCKET_BITS + 1) * _SUB_BUCKET_COUNT
+
+
+def _bucket_index(micros):
+    if micros < _SUB_BUCKET_COUNT:
+        return micros
+    shift = micros.bit_length() - _SUB_BUCKET_BITS - 1
+    return (shift + 1) * _SUB_BUCKET_COUNT + (micros >> shift) - _SUB_BUCKET_COUNT
+
+
+def _bucket_upper_bound(index):
+    # the largest value counted in bucket `index`, in microseconds
+    if index < _SUB_BUCKET_COUNT:
+        return index
+    shift = index // _SUB_BUCKET_COUNT - 1
+    return ((index % _SUB_BUCKET_COUNT + _SUB_BUCKET_COUNT + 1) << shift) - 1
+
+
+# each thread records into the histogram shard picked when it first records
+# anything; thread idents can't be used, they are aligned pointers on Linux
+_shard_counter = count()
+_thread_shard = local()
+
+
+def _thread_shard_index():
+    try:
+        return _thread_shard.index
+    except AttributeError:
+        _thread_shard.index = index = next(_shard_counter)
+        return index
+
+
+class _HistogramShard(object):
+
+    __slots__ = ('lock', 'counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        # bucket index to count, for the buckets used so far
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+
+class HistogramSnapshot(object):
+    """
+    The latencies recorded by a :class:`.LatencyHistogram` at some point.
+    Latencies are in seconds, and accurate to about 3%.
+    """
+
+    count = 0
+    """
+    The number of latencies recorded.
+    """
+
+    def __init__(self, counts, count, total, min_micros, max_micros):
+        self.counts = counts
+        self.count = count
+        self._total = total
+        self._min = min_micros or 0
+        self._max = max_micros
+
+    @property
+    def min(self):
+        """
+        The smallest latency recorded.
+        """
+        return self._min / 1e6
+
+    @property
+    def max(self):
+        """
+        The largest latency recorded.
+        """
+        return self._max / 1e6
+
+    @property
+    def mean(self):
+        """
+        The mean latency.
+        """
+        return self._total / 1e6 / self.count if self.count else 0.0
+
+    @property
+    def sum(self):
+        """
+        The sum of all latencies.
+        """
+        return self._total / 1e6
+
+    def percentile(self, percentile):
+        """
+        Returns the latency below which `percentile` percent of the latencies
+        fall, as the upper bound of the bucket it was counted in.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, int(round(percentile / 100.0 * self.count)))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(max(_bucket_upper_bound(index), self._min), self._max) / 1e6
+        return self.max
+
+    def merge(self, other):
+        """
+        Returns a new snapshot of the latencies of both snapshots, for example
+        to aggregate the latencies of several hosts.
+        """
+        if not other.count:
+            return self
+        if not self.count:
+            return other
+        return HistogramSnapshot([a + b for a, b in zip(self.counts, other.counts)],
+                                 self.count + other.count, self._total + other._total,
+                                 min(self._min, other._min), max(self._max, other._max))
+
+    def since(self, previous):
+        """
+        Returns a snapshot of the latencies recorded after `previous`, an
+        earlier snapshot of the same histogram. Its :attr:`min` and
+        :attr:`max` are the bounds of the buckets they fall in.
+        """
+        counts = [a - b for a, b in zip(self.counts, previous.counts)]
+        used = [i for i, c in enumerate(counts) if c]
+        if not used:
+            return HistogramSnapshot(counts, 0, 0, None, 0)
+        min_micros = _bucket_upper_bound(used[0] - 1) + 1 if used[0] else 0
+        return HistogramSnapshot(counts, self.count - previous.count, self._total - previous._total,
+                                 max(min_micros, self._min), min(_bucket_upper_bound(used[-1]), self._max))
+
+    def as_dict(self):
+        """
+        Returns the statistics under the keys used by the
+        :attr:`.Metrics.request_timer`.
+        """
+        return {
+            'count': self.count,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.mean,
+            'median': self.percentile(50),
+            '75percentile': self.percentile(75),
+            '95percentile': self.percentile(95),
+            '98percentile': self.percentile(98),
+            '99percentile': self.percentile(99),
+            '999percentile': self.percentile(99.9)
+        }
+
+    def __repr__(self):
+        return "<HistogramSnapshot: count=%d, mean=%f, 99percentile=%f>" % (
+            self.count, self.mean, self.percentile(99))
+
+
+class LatencyHistogram(object):
+    """
+    A histogram of latencies in logarithmic buckets, which records every
+    value instead of sampling. Updates from different threads mostly go to
+    different shards, so they rarely contend for a lock. Only the buckets
+    latencies were recorded in take up memory.
+    """
+
+    num_shards = 8
+
+    def __init__(self, num_shards=None):
+        if num_shards is not None:
+            self.num_shards = num_shards
+        self._shards = [_HistogramShard() for _ in range(self.num_shards)]
+
+    def record(self, latency):
+        """
+        Records a latency, in seconds.
+        """
+        micros = min(max(int(latency * 1e6), 0), _MAX_MICROS)
+        index = _bucket_index(micros)
+        shard = self._shards[_thread_shard_index() % self.num_shards]
+        with shard.lock:
+            counts = shard.counts
+            counts[index] = counts.get(index, 0) + 1
+            shard.count += 1
+            shard.total += micros
+            if shard.min is None or micros < shard.min:
+                shard.min = micros
+            if micros > shard.max:
+                shard.max = micros
+
+    def snapshot(self, reset=False):
+        """
+        Returns a :class:`.HistogramSnapshot` of the latencies recorded so
+        far, and starts over if `reset` is :const:`True`.
+        """
+        counts = [0] * _BUCKET_COUNT
+        count = total = max_micros = 0
+        min_micros = None
+        for shard in self._shards:
+            with shard.lock:
+                if shard.count:
+                    for index, bucket_count in six.iteritems(shard.counts):
+                        counts[index] += bucket_count
+                    count += shard.count
+                    total += shard.total
+                    if min_micros is None or shard.min < min_micros:
+                        min_micros = shard.min
+                    max_micros = max(max_micros, shard.max)
+                if reset:
+                    shard.reset()
+        return HistogramSnapshot(counts, count, total, min_micros, max_micros)
+
+    def reset(self):
+        """
+        Discards the latencies recorded so far.
+        """
+        for shard in self._shards:
+            with shard.lock:
+                shard.reset()
+
+
+class LatencyHistograms(object):
+    """
+    A :class:`.LatencyHistogram` per key, created when the first latency is
+    recorded for the key. These histograms have a single shard, since there
+    are many of them and each one is updated less often.
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = Lock()
+
+    def record(self, key, latency):
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, LatencyHistogram(1))
+        histogram.record(latency)
+
+    def snapshot(self, reset=False):
+        """
+        Returns a dict of keys to :class:`.HistogramSnapshot`.
+        """
+        with self._lock:
+            histograms = list(self._histograms.items())
+        return dict((key, histogram.snapshot(reset)) for key, histogram in histograms)
+
+    def remove(self, key):
+        """
+        Discards the histogram of `key`, if any.
+        """
+        with self._lock:
+            self._histograms.pop(key, None)
+
+    def reset(self):
+        """
+        Discards all histograms.
+        """
+        with self._lock:
+            self._histograms = {}
+
+
+class Counter(object):
+    """
+    A count that only goes up.
+    """
+
+    def __init__(self):
+        self._value = 0
+        self._lock = Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        return self._value
+
+
+class Gauge(object):
+    """
+    A value read from a function whenever metrics are collected.
+    """
+
+    def __init__(self, fn):
+        self._fn = fn
+
+    @property
+    def value(self):
+        return self._fn()
+
+
+class _NoopCounter(object):
+
+    value = 0
+
+    def inc(self, amount=1):
+        pass
+
+
+class _NoopHistogram(object):
+
+    def record(self, latency):
+        pass
+
+    def snapshot(self, reset=False):
+        return HistogramSnapshot([0] * _BUCKET_COUNT, 0, 0, None, 0)
+
+    def reset(self):
+        pass
+
+
+class _NoopHistograms(object):
+
+    def record(self, key, latency):
+        pass
+
+    def snapshot(self, reset=False):
+        return {}
+
+    def remove(self, key):
+        pass
+
+    def reset(self):
+        pass
+
+
+class MetricsRegistry(object):
+    """
+    A set of named counters, gauges and latency histograms, read by exporters
+    such as :class:`.PrometheusExporter` and :class:`.StatsdExporter`.
+
+    Registering a name again returns the metric already registered under it.
+    A registry created with ``enabled=False`` registers nothing and hands out
+    metrics that discard updates, so that instrumented code does not need to
+    check whether metrics are enabled.
+    """
+
+    COUNTER = 'counter'
+    GAUGE = 'gauge'
+    HISTOGRAM = 'histogram'
+    HISTOGRAMS = 'histograms'
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        # name -> (kind, description, label, metric)
+        self._metrics = OrderedDict()
+        self._lock = Lock()
+
+    def counter(self, name, description=''):
+        """
+        Returns the :class:`.Counter` registered as `name`.
+        """
+        if not self.enabled:
+            return _NoopCounter()
+        return self._register(name, self.COUNTER, Counter, description)
+
+    def gauge(self, name, fn, description=''):
+        """
+        Registers a :class:`.Gauge` reporting the return value of `fn`.
+        """
+        if not self.enabled:
+            return Gauge(fn)
+        return self._register(name, self.GAUGE, lambda: Gauge(fn), description)
+
+    def histogram(self, name, description=''):
+        """
+        Returns the :class:`.LatencyHistogram` registered as `name`.
+        """
+        if not self.enabled:
+            return _NoopHistogram()
+        return self._register(name, self.HISTOGRAM, LatencyHistogram, description)
+
+    def histograms(self, name, label, description=''):
+        """
+        Returns the :class:`.LatencyHistograms` registered as `name`, whose
+        keys are exported as the value of the `label` label.
+        """
+        if not self.enabled:
+            return _NoopHistograms()
+        return self._register(name, self.HISTOGRAMS, LatencyHistograms, description, label)
+
+    def _register(self, name, kind, factory, description, label=None):
+        with self._lock:
+            registered = self._metrics.get(name)
+            if registered is not None:
+                if registered[0] != kind:
+                    raise ValueError("%s is already registered as a %s" % (name, registered[0]))
+                return registered[3]
+            metric = factory()
+            self._metrics[name] = (kind, description, label, metric)
+            return metric
+
+    def collect(self):
+        """
+        Returns a list of ``(name, kind, description, label, metric)`` tuples
+        for all registered metrics, in registration order.
+        """
+        with self._lock:
+            return [(name,) + registered for name, registered in self._metrics.items()]
+
+    def as_dict(self):
+        """
+        Returns a dict of metric names to the values of counters and gauges,
+        the :meth:`.HistogramSnapshot.as_dict` of histograms, and dicts of
+        keys to those for keyed histograms.
+        """
+        stats = {}
+        for name, kind, _, _, metric in self.collect():
+            if kind == self.HISTOGRAM:
+                stats[name] = metric.snapshot().as_dict()
+            elif kind == self.HISTOGRAMS:
+                stats[name] = dict((key, snapshot.as_dict()) for key, snapshot in metric.snapshot().items())
+            else:
+                stats[name] = _gauge_value(name, metric) if kind == self.GAUGE else metric.value
+        return stats
+
+
 class Metrics(object):
     """
     A collection of timers and counters for various performance metrics.
 
     Timer metrics are represented as floating point seconds.
+
+    All metrics are kept in :attr:`registry`. The :mod:`greplin.scales`
+    stats are also kept when that library is installed; otherwise, the
+    attributes documented as scales stats are :const:`None`.
+    """
+
+    registry = None
+    """
+    The :class:`.MetricsRegistry` holding these metrics, to be read by
+    exporters. Application metrics registered in it are exported along with
+    the driver's.
+
+    .. versionadded:: 3.17.0
     """
 
     request_timer = None
@@ -94,6 +543,19 @@ class Metrics(object):
     failed request was ignored based on the :class:`.RetryPolicy` decision.
     """
 
+    throttle_queue_timer = None
+    """
+    A :class:`greplin.scales.PmfStat` timer for the time requests spent
+    queued by the :attr:`.Session.request_throttler` before being sent.
+    Only requests that actually had to wait are recorded.
+    """
+
+    throttled_requests = None
+    """
+    A :class:`greplin.scales.IntStat` count of requests rejected by the
+    :attr:`.Session.request_throttler` because its queue was full.
+    """
+
     known_hosts = None
     """
     A :class:`greplin.scales.IntStat` count of the number of nodes in
@@ -113,13 +575,80 @@ class Metrics(object):
     the driver currently has open.
     """
 
+    host_latencies = None
+    """
+    A :class:`.LatencyHistograms` of request latencies per :class:`.Host`
+    the request was last sent to, whether it responded or timed out.
+    """
+
+    statement_latencies = None
+    """
+    A :class:`.LatencyHistograms` of request latencies per prepared statement,
+    keyed by :attr:`.PreparedStatement.query_id`. Unprepared statements are not
+    recorded.
+    """
+
+    outcome_latencies = None
+    """
+    A :class:`.LatencyHistograms` of request latencies per outcome:
+    ``'success'``, ``'timeout'`` (client-side, read or write timeouts),
+    ``'unavailable'`` or ``'error'``.
+    """
+
+    host_reprepare_latencies = None
+    """
+    A :class:`.LatencyHistograms` of the time taken to prepare all known
+    statements on a :class:`.Host` as it came up or was added, per host (see
+    :attr:`.Cluster.reprepare_on_up`).
+
+    .. versionadded:: 3.17.0
+    """
+
     _stats_counter = 0
 
     def __init__(self, cluster_proxy):
         log.debug("Starting metric capture")
 
+        def known_hosts():
+            return len(cluster_proxy.metadata.all_hosts())
+
+        def connected_to():
+            return len(set(chain.from_iterable(s._pools.keys() for s in cluster_proxy.sessions)))
+
+        def open_connections():
+            return sum(sum(p.open_count for p in s._pools.values()) for s in cluster_proxy.sessions)
+
+        registry = self.registry = MetricsRegistry()
+        self._request_latency = registry.histogram('request_latency', "Latency of requests, in seconds")
+        self._connection_errors = registry.counter('connection_errors', "Requests failed by connection errors")
+        self._write_timeouts = registry.counter('write_timeouts', "Write requests that timed out")
+        self._read_timeouts = registry.counter('read_timeouts', "Read requests that timed out")
+        self._unavailables = registry.counter('unavailables', "Requests failed by too few live replicas")
+        self._other_errors = registry.counter('other_errors', "Requests failed by other errors")
+        self._retries = registry.counter('retries', "Requests retried by the retry policy")
+        self._ignores = registry.counter('ignores', "Failures ignored by the retry policy")
+        self._throttle_queue_latency = registry.histogram(
+            'throttle_queue_latency', "Time requests were queued by the request throttler, in seconds")
+        self._throttled_requests = registry.counter(
+            'throttled_requests', "Requests rejected by the request throttler")
+        self.host_latencies = registry.histograms(
+            'host_request_latency', 'host', "Latency of requests per host, in seconds")
+        self.statement_latencies = registry.histograms(
+            'statement_request_latency', 'query_id', "Latency of requests per prepared statement, in seconds")
+        self.outcome_latencies = registry.histograms(
+            'outcome_request_latency', 'outcome', "Latency of requests per outcome, in seconds")
+        self.host_reprepare_latencies = registry.histograms(
+            'host_reprepare_latency', 'host', "Time taken to prepare all statements on a host coming up, in seconds")
+        registry.gauge('known_hosts', known_hosts, "Nodes known to the driver")
+        registry.gauge('connected_to', connected_to, "Nodes the driver has connections to")
+        registry.gauge('open_connections', open_connections, "Connections the driver has open")
+
         self.stats_name = 'cassandra-{0}'.format(str(self._stats_counter))
         Metrics._stats_counter += 1
+        if scales is None:
+            self.stats = None
+            return
+
         self.stats = scales.collection(self.stats_name,
             scales.PmfStat('request_timer'),
             scales.IntStat('connection_errors'),
@@ -129,14 +658,13 @@ class Metrics(object):
             scales.IntStat('other_errors'),
             scales.IntStat('retries'),
             scales.IntStat('ignores'),
+            scales.PmfStat('throttle_queue_timer'),
+            scales.IntStat('throttled_requests'),
 
             # gauges
-            scales.Stat('known_hosts',
-                lambda: len(cluster_proxy.metadata.all_hosts())),
-            scales.Stat('connected_to',
-                lambda: len(set(chain.from_iterable(s._pools.keys() for s in cluster_proxy.sessions)))),
-            scales.Stat('open_connections',
-                lambda: sum(sum(p.open_count for p in s._pools.values()) for s in cluster_proxy.sessions)))
+            scales.Stat('known_hosts', known_hosts),
+            scales.Stat('connected_to', connected_to),
+            scales.Stat('open_connections', open_connections))
 
         # TODO, to be removed in 4.0
         # /cassandra contains the metrics of the first cluster registered
@@ -151,35 +679,114 @@ class Metrics(object):
         self.other_errors = self.stats.other_errors
         self.retries = self.stats.retries
         self.ignores = self.stats.ignores
+        self.throttle_queue_timer = self.stats.throttle_queue_timer
+        self.throttled_requests = self.stats.throttled_requests
         self.known_hosts = self.stats.known_hosts
         self.connected_to = self.stats.connected_to
         self.open_connections = self.stats.open_connections
 
+    def on_request_complete(self, latency, host, prepared_statement, exc):
+        """
+        Records the latency of a request that completed with a result, or
+        failed with `exc`.
+        """
+        self._request_latency.record(latency)
+        if self.stats is not None:
+            self.request_timer.addValue(latency)
+        if host is not None:
+            self.host_latencies.record(host, latency)
+        if prepared_statement is not None:
+            self.statement_latencies.record(prepared_statement.query_id, latency)
+        if exc is None:
+            outcome = 'success'
+        elif isinstance(exc, (OperationTimedOut, Timeout)):
+            outcome = 'timeout'
+        elif isinstance(exc, Unavailable):
+            outcome = 'unavailable'
+        else:
+            outcome = 'error'
+        self.outcome_latencies.record(outcome, latency)
+
+    def get_latency_snapshots(self, reset=False):
+        """
+        Returns a dict with the snapshots of :attr:`host_latencies`,
+        :attr:`statement_latencies` and :attr:`outcome_latencies`, under the
+        keys ``'hosts'``, ``'statements'`` and ``'outcomes'``. Snapshots of
+        the same dict can be combined with :meth:`.HistogramSnapshot.merge`.
+        If `reset` is :const:`True`, recording starts over.
+        """
+        return {
+            'hosts': self.host_latencies.snapshot(reset),
+            'statements': self.statement_latencies.snapshot(reset),
+            'outcomes': self.outcome_latencies.snapshot(reset)
+        }
+
+    def on_host_reprepared(self, host, latency):
+        """
+        Records the time taken to prepare all statements on `host`.
+        """
+        self.host_reprepare_latencies.record(host, latency)
+
+    def on_host_removed(self, host):
+        """
+        Discards the latencies recorded for `host`.
+        """
+        self.host_latencies.remove(host)
+        self.host_reprepare_latencies.remove(host)
+
     def on_connection_error(self):
-        self.stats.connection_errors += 1
+        self._connection_errors.inc()
+        if self.stats is not None:
+            self.stats.connection_errors += 1
 
     def on_write_timeout(self):
-        self.stats.write_timeouts += 1
+        self._write_timeouts.inc()
+        if self.stats is not None:
+            self.stats.write_timeouts += 1
 
     def on_read_timeout(self):
-        self.stats.read_timeouts += 1
+        self._read_timeouts.inc()
+        if self.stats is not None:
+            self.stats.read_timeouts += 1
 
     def on_unavailable(self):
-        self.stats.unavailables += 1
+        self._unavailables.inc()
+        if self.stats is not None:
+            self.stats.unavailables += 1
 
     def on_other_error(self):
-        self.stats.other_errors += 1
+        self._other_errors.inc()
+        if self.stats is not None:
+            self.stats.other_errors += 1
 
     def on_ignore(self):
-        self.stats.ignores += 1
+        self._ignores.inc()
+        if self.stats is not None:
+            self.stats.ignores += 1
 
     def on_retry(self):
-        self.stats.retries += 1
+        self._retries.inc()
+        if self.stats is not None:
+            self.stats.retries += 1
+
+    def on_throttled(self):
+        self._throttled_requests.inc()
+        if self.stats is not None:
+            self.stats.throttled_requests += 1
+
+    def on_throttle_queued(self, latency):
+        self._throttle_queue_latency.record(latency)
+        if self.stats is not None:
+            self.throttle_queue_timer.addValue(latency)
 
     def get_stats(self):
         """
-        Returns the metrics for the registered cluster instance.
+        Returns the metrics for the registered cluster instance. Without the
+        scales library, returns :meth:`.MetricsRegistry.as_dict` of
+        :attr:`registry`.
         """
+        if self.stats is None:
+            return self.registry.as_dict()
         return scales.getStats()[self.stats_name]
 
     def set_stats_name(self, stats_name):
@@ -192,6 +799,10 @@ class Metrics(object):
         if self.stats_name == stats_name:
             return
 
+        if self.stats is None:
+            self.stats_name = stats_name
+            return
+
         if stats_name in scales._Stats.stats:
             raise ValueError('"{0}" already exists in stats.'.format(stats_name))
 
@@ -199,3 +810,221 @@ class Metrics(object):
         del scales._Stats.stats[self.stats_name]
         self.stats_name = stats_name
         scales._Stats.stats[self.stats_name] = stats
+
+
+def _label_value(key):
+    if six.PY3 and isinstance(key, bytes):
+        # prepared statement ids
+        return hexlify(key).decode('ascii')
+    return six.text_type(key)
+
+
+def _gauge_value(name, gauge):
+    try:
+        return gauge.value
+    except Exception:
+        log.debug("Failed to read gauge %s", name, exc_info=True)
+        return None
+
+
+class PrometheusExporter(object):
+    """
+    Renders the metrics of a :class:`.MetricsRegistry` in the Prometheus text
+    exposition format, for example to serve them from an application's
+    ``/metrics`` endpoint::
+
+        >>> exporter = PrometheusExporter(cluster.metrics.registry)
+        >>> body = exporter.render()
+
+    Counters are named ``<prefix>_<name>_total``. Latency histograms are
+    exported as summaries of :attr:`quantiles` in seconds, accumulated since
+    they were created.
+
+    .. versionadded:: 3.17.0
+    """
+
+    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+    """
+    The content type to serve :meth:`render` with.
+    """
+
+    quantiles = (0.5, 0.75, 0.95, 0.99, 0.999)
+    """
+    The quantiles exported for each histogram.
+    """
+
+    def __init__(self, registry, prefix='cassandra'):
+        self.registry = registry
+        self.prefix = prefix
+
+    def render(self):
+        """
+        Returns the current value of all metrics, as text.
+        """
+        lines = []
+        for name, kind, description, label, metric in self.registry.collect():
+            name = '%s_%s' % (self.prefix, name) if self.prefix else name
+            if kind == MetricsRegistry.COUNTER:
+                name += '_total'
+            prometheus_type = {MetricsRegistry.COUNTER: 'counter',
+                               MetricsRegistry.GAUGE: 'gauge'}.get(kind, 'summary')
+            if description:
+                lines.append('# HELP %s %s' % (name, description.replace('\\', '\\\\').replace('\n', '\\n')))
+            lines.append('# TYPE %s %s' % (name, prometheus_type))
+
+            if kind == MetricsRegistry.COUNTER:
+                lines.append('%s %d' % (name, metric.value))
+            elif kind == MetricsRegistry.GAUGE:
+                value = _gauge_value(name, metric)
+                if value is not None:
+                    lines.append('%s %s' % (name, float(value)))
+            elif kind == MetricsRegistry.HISTOGRAM:
+                self._render_summary(lines, name, '', metric.snapshot())
+            else:
+                for key, snapshot in metric.snapshot().items():
+                    value = _label_value(key).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+                    self._render_summary(lines, name, '%s="%s"' % (label, value), snapshot)
+        lines.append('')
+        return '\n'.join(lines)
+
+    def _render_summary(self, lines, name, labels, snapshot):
+        separator = ',' if labels else ''
+        for quantile in self.quantiles:
+            lines.append('%s{%s%squantile="%s"} %r' % (
+                name, labels, separator, quantile, snapshot.percentile(quantile * 100)))
+        labels = '{%s}' % (labels,) if labels else ''
+        lines.append('%s_sum%s %r' % (name, labels, snapshot.sum))
+        lines.append('%s_count%s %d' % (name, labels, snapshot.count))
+
+
+class StatsdExporter(object):
+    """
+    Pushes the metrics of a :class:`.MetricsRegistry` to a StatsD server over
+    UDP every `interval` seconds, from a background thread::
+
+        >>> exporter = StatsdExporter(cluster.metrics.registry, host='statsd.local')
+        >>> exporter.start()
+        >>> ...
+        >>> exporter.stop()
+
+    Counters are sent as their increase since the previous push, gauges as
+    their current value, and each latency histogram as the count, mean, 50th,
+    99th and 99.9th percentile and max of the latencies recorded since the
+    previous push, in milliseconds. Counters and histograms that did not
+    change are not sent. Keys of keyed histograms become part of the metric
+    name.
+
+    .. versionadded:: 3.17.0
+    """
+
+    max_packet_size = 1432
+    """
+    The maximum size of a UDP packet; metrics are split across packets of at
+    most this many bytes.
+    """
+
+    _name_re = re.compile(r'[^A-Za-z0-9_\-]')
+
+    def __init__(self, registry, host='127.0.0.1', port=8125, prefix='cassandra', interval=10.0):
+        self.registry = registry
+        self.address = (host, port)
+        self.prefix = prefix
+        self.interval = interval
+        self._counters = {}
+        self._snapshots = {}
+        self._socket = None
+        self._thread = None
+        self._stopped = Event()
+
+    def start(self):
+        """
+        Starts pushing metrics every :attr:`interval` seconds.
+        """
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = Thread(target=self._run, name="StatsD Metrics Exporter")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        """
+        Stops pushing metrics, after pushing them one last time.
+        """
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopped.set()
+            thread.join()
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self._flush_safely()
+        self._flush_safely()
+
+    def _flush_safely(self):
+        try:
+            self.flush()
+        except Exception:
+            log.warning("Failed to push metrics to StatsD at %s:%s", *self.address, exc_info=True)
+
+    def flush(self):
+        """
+        Pushes the metrics now.
+        """
+        packet = []
+        size = 0
+        for line in self.lines():
+            line = line.encode('utf-8')
+            if packet and size + len(line) + 1 > self.max_packet_size:
+                self._send(b'\n'.join(packet))
+                packet = []
+                size = 0
+            packet.append(line)
+            size += len(line) + 1
+        if packet:
+            self._send(b'\n'.join(packet))
+
+    def _send(self, packet):
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.sendto(packet, self.address)
+
+    def lines(self):
+        """
+        Returns the StatsD lines for the metrics, recording the current
+        values of counters and histograms as the base of the next push.
+        """
+        lines = []
+        for name, kind, _, _, metric in self.registry.collect():
+            name = '%s.%s' % (self.prefix, name) if self.prefix else name
+            if kind == MetricsRegistry.COUNTER:
+                value = metric.value
+                increase = value - self._counters.get(name, 0)
+                self._counters[name] = value
+                if increase:
+                    lines.append('%s:%d|c' % (name, increase))
+            elif kind == MetricsRegistry.GAUGE:
+                value = _gauge_value(name, metric)
+                if value is not None:
+                    lines.append('%s:%s|g' % (name, value))
+            elif kind == MetricsRegistry.HISTOGRAM:
+                self._histogram_lines(lines, name, metric.snapshot())
+            else:
+                for key, snapshot in metric.snapshot().items():
+                    key_name = '%s.%s' % (name, self._name_re.sub('_', _label_value(key)))
+                    self._histogram_lines(lines, key_name, snapshot)
+        return lines
+
+    def _histogram_lines(self, lines, name, snapshot):
+        previous = self._snapshots.get(name)
+        self._snapshots[name] = snapshot
+        if previous is not None:
+            snapshot = snapshot.since(previous)
+        if snapshot.count:
+            lines.append('%s.count:%d|c' % (name, snapshot.count))
+            for stat, value in (('mean', snapshot.mean), ('p50', snapshot.percentile(50)),
+                                ('p99', snapshot.percentile(99)), ('p999', snapshot.percentile(99.9)),
+                                ('max', snapshot.max)):
+                lines.append('%s.%s:%.3f|g' % (name, stat, value * 1000))
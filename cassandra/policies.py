@@ -12,11 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from collections import deque
 from itertools import islice, cycle, groupby, repeat
 import logging
+import math
 from random import randint, shuffle
 from threading import Lock
 import socket
+import time
 import warnings
 from cassandra import WriteType as WT
 
@@ -27,7 +30,7 @@ from cassandra import WriteType as WT
 WriteType = WT
 
 
-from cassandra import ConsistencyLevel, OperationTimedOut
+from cassandra import ConsistencyLevel, OperationTimedOut, RequestThrottled, Timeout
 
 log = logging.getLogger(__name__)
 
@@ -90,6 +93,27 @@ class HostStateListener(object):
         raise NotImplementedError()
 
 
+class LatencyTracker(object):
+    """
+    Latency trackers are notified of the latency of every request completed
+    by the :class:`.Cluster` they are registered with through
+    :meth:`.Cluster.register_latency_tracker`.
+
+    .. versionadded:: 3.17.0
+    """
+
+    def update(self, host, query, latency, exc):
+        """
+        Called when a request completes. `host` is the :class:`.Host` the
+        request was last sent to (:const:`None` if it was never sent),
+        `query` the :class:`.Statement`, `latency` the time it took in
+        seconds and `exc` the exception it failed with, or :const:`None`.
+
+        This is called from the event loop thread and must not block.
+        """
+        raise NotImplementedError()
+
+
 class LoadBalancingPolicy(HostStateListener):
     """
     Load balancing policies are used to decide how to distribute
@@ -329,23 +353,45 @@ class TokenAwarePolicy(LoadBalancingPolicy):
     hosts are exhausted, the remaining hosts in the child policy's query
     plan will be used in the order provided by the child policy.
 
+    If the query carries a :attr:`~.Statement.routing_token`, replicas are
+    looked up by it instead of by hashing the routing key.
+
+    If :attr:`.balance_replicas` is truthy, the local replica tried first is
+    the less busy of two random ones instead.
+
     If no :attr:`~.Statement.routing_key` is set on the query, the child
     policy's query plan will be used as is.
     """
 
     _child_policy = None
     _cluster_metadata = None
+    _cluster = None
     shuffle_replicas = False
     """
     Yield local replicas in a random order.
     """
 
-    def __init__(self, child_policy, shuffle_replicas=False):
+    balance_replicas = False
+    """
+    Yield local replicas in a random order, except that of the first two,
+    the one with fewer requests in flight (see
+    :meth:`.Cluster.get_in_flight_requests`) comes first. Comparing two
+    random replicas rather than picking the least busy of all keeps
+    concurrent requests from all going to the same replica, while a replica
+    slowed down by compaction or GC, whose requests pile up, gets less
+    traffic.
+
+    .. versionadded:: 3.17.0
+    """
+
+    def __init__(self, child_policy, shuffle_replicas=False, balance_replicas=False):
         self._child_policy = child_policy
         self.shuffle_replicas = shuffle_replicas
+        self.balance_replicas = balance_replicas
 
     def populate(self, cluster, hosts):
         self._cluster_metadata = cluster.metadata
+        self._cluster = cluster
         self._child_policy.populate(cluster, hosts)
 
     def check_supported(self):
@@ -371,18 +417,26 @@ class TokenAwarePolicy(LoadBalancingPolicy):
             for host in child.make_query_plan(keyspace, query):
                 yield host
         else:
-            routing_key = query.routing_key
-            if routing_key is None or keyspace is None:
+            routing_token = query.routing_token
+            routing_key = query.routing_key if routing_token is None else None
+            if (routing_token is None and routing_key is None) or keyspace is None:
                 for host in child.make_query_plan(keyspace, query):
                     yield host
             else:
-                replicas = self._cluster_metadata.get_replicas(keyspace, routing_key)
-                if self.shuffle_replicas:
-                    shuffle(replicas)
-                for replica in replicas:
-                    if replica.is_up and \
-                            child.distance(replica) == HostDistance.LOCAL:
+                if routing_token is not None:
+                    replicas = self._cluster_metadata.get_replicas_for_token(keyspace, routing_token)
+                else:
+                    replicas = self._cluster_metadata.get_replicas(keyspace, routing_key)
+                if self.balance_replicas:
+                    for replica in self._balanced_local_replicas(replicas):
                         yield replica
+                else:
+                    if self.shuffle_replicas:
+                        shuffle(replicas)
+                    for replica in replicas:
+                        if replica.is_up and \
+                                child.distance(replica) == HostDistance.LOCAL:
+                            yield replica
 
                 for host in child.make_query_plan(keyspace, query):
                     # skip if we've already listed this host
@@ -390,6 +444,17 @@ class TokenAwarePolicy(LoadBalancingPolicy):
                             child.distance(host) == HostDistance.REMOTE:
                         yield host
 
+    def _balanced_local_replicas(self, replicas):
+        child = self._child_policy
+        local_replicas = [r for r in replicas
+                          if r.is_up and child.distance(r) == HostDistance.LOCAL]
+        shuffle(local_replicas)
+        if len(local_replicas) > 1:
+            in_flight = self._cluster.get_in_flight_requests
+            if in_flight(local_replicas[1]) < in_flight(local_replicas[0]):
+                local_replicas[0], local_replicas[1] = local_replicas[1], local_replicas[0]
+        return local_replicas
+
     def on_up(self, *args, **kwargs):
         return self._child_policy.on_up(*args, **kwargs)
 
@@ -562,6 +627,191 @@ class HostFilterPolicy(LoadBalancingPolicy):
         return self._child_policy.check_supported()
 
 
+class _TimestampedAverage(object):
+
+    __slots__ = ('timestamp', 'average', 'count')
+
+    def __init__(self, timestamp, average, count):
+        self.timestamp = timestamp
+        self.average = average
+        self.count = count
+
+
+class _HostLatencyTracker(LatencyTracker):
+    """
+    Keeps an exponentially weighted average of the latency of each host,
+    weighting previous averages less the older they are.
+    """
+
+    def __init__(self, scale, min_measure, update_rate):
+        self._scale = scale
+        self._min_measure = min_measure
+        self._update_rate = update_rate
+        self._latencies = {}
+        self._lock = Lock()
+        self._min_average = None
+        self._min_updated_at = None
+
+    def update(self, host, query, latency, exc):
+        # fast failures say nothing about how loaded a host is, but timeouts do
+        if host is None or (exc is not None and not isinstance(exc, (OperationTimedOut, Timeout))):
+            return
+
+        now = time.time()
+        with self._lock:
+            previous = self._latencies.get(host)
+            count = previous.count + 1 if previous else 1
+            if count < self._min_measure:
+                average = None
+            elif previous is None or previous.average is None:
+                average = latency
+            else:
+                delay = now - previous.timestamp
+                if delay <= 0:
+                    average = previous.average
+                else:
+                    scaled_delay = delay / self._scale
+                    previous_weight = math.log(scaled_delay + 1) / scaled_delay
+                    average = (1.0 - previous_weight) * latency + previous_weight * previous.average
+            self._latencies[host] = _TimestampedAverage(now, average, count)
+
+    def get(self, host):
+        return self._latencies.get(host)
+
+    def remove(self, host):
+        with self._lock:
+            self._latencies.pop(host, None)
+
+    def min_average(self, now):
+        """
+        Returns the lowest average latency of all hosts, recomputed at most
+        every `update_rate` seconds.
+        """
+        if self._min_updated_at is None or now - self._min_updated_at >= self._update_rate:
+            with self._lock:
+                averages = [l.average for l in self._latencies.values() if l.average is not None]
+            self._min_average = min(averages) if averages else None
+            self._min_updated_at = now
+        return self._min_average
+
+
+class LatencyAwarePolicy(LoadBalancingPolicy):
+    """
+    A :class:`.LoadBalancingPolicy` wrapper that moves hosts that are
+    noticeably slower than the fastest host to the end of the child policy's
+    query plans.
+
+    The latency of each host is an exponentially weighted average of the
+    latencies of the requests completed by it, so a host that starts
+    pausing or gets overloaded is penalized within a few requests, long
+    before it is marked down. Failures other than timeouts are not taken
+    into account. A host is penalized when its average is more than
+    :attr:`exclusion_threshold` times the lowest average of all hosts.
+
+    Penalized hosts get no new latencies while the faster hosts are
+    available, so once a host has not been measured for
+    :attr:`retry_period` seconds, it is used again as the child policy
+    orders it, and its next latencies decide whether it stays penalized.
+
+    Wrap it in a :class:`.TokenAwarePolicy` so that replicas are still
+    tried first, in the order of this policy:
+
+    .. code-block:: python
+
+        policy = TokenAwarePolicy(LatencyAwarePolicy(DCAwareRoundRobinPolicy('dc1')))
+
+    .. versionadded:: 3.17.0
+    """
+
+    exclusion_threshold = 2.0
+    """
+    How many times slower than the fastest host a host must be to be
+    penalized.
+    """
+
+    retry_period = 10.0
+    """
+    Seconds after the last latency of a penalized host before it is used
+    again.
+    """
+
+    _child_policy = None
+    _tracker = None
+
+    def __init__(self, child_policy, exclusion_threshold=2.0, scale=0.1, retry_period=10.0,
+                 update_rate=0.1, min_measure=50):
+        """
+        :param child_policy: an instantiated :class:`.LoadBalancingPolicy`
+                             whose query plans are reordered.
+        :param exclusion_threshold: see :attr:`exclusion_threshold`.
+        :param scale: how fast previous latencies lose weight, in seconds:
+                      a previous average ``scale`` seconds old weighs as much
+                      as a new latency.
+        :param retry_period: see :attr:`retry_period`.
+        :param update_rate: how often the lowest average is recomputed, in
+                            seconds.
+        :param min_measure: the number of latencies of a host needed before
+                            it can be penalized, so that hosts are not
+                            judged on their first, slower requests.
+        """
+        if exclusion_threshold < 1:
+            raise ValueError("exclusion_threshold must be at least 1")
+        if scale <= 0:
+            raise ValueError("scale must be greater than 0")
+        super(LatencyAwarePolicy, self).__init__()
+        self._child_policy = child_policy
+        self.exclusion_threshold = exclusion_threshold
+        self.retry_period = retry_period
+        self._tracker = _HostLatencyTracker(scale, min_measure, update_rate)
+
+    def populate(self, cluster, hosts):
+        cluster.register_latency_tracker(self._tracker)
+        self._child_policy.populate(cluster, hosts)
+
+    def check_supported(self):
+        return self._child_policy.check_supported()
+
+    def distance(self, host):
+        return self._child_policy.distance(host)
+
+    def make_query_plan(self, working_keyspace=None, query=None):
+        child_plan = self._child_policy.make_query_plan(working_keyspace, query)
+        tracker = self._tracker
+        now = time.time()
+        min_average = tracker.min_average(now)
+        if min_average is None:
+            for host in child_plan:
+                yield host
+            return
+
+        limit = min_average * self.exclusion_threshold
+        penalized = []
+        for host in child_plan:
+            latency = tracker.get(host)
+            if latency is None or latency.average is None or latency.average <= limit or \
+                    now - latency.timestamp > self.retry_period:
+                yield host
+            else:
+                penalized.append(host)
+
+        for host in penalized:
+            yield host
+
+    def on_up(self, host):
+        return self._child_policy.on_up(host)
+
+    def on_down(self, host):
+        self._tracker.remove(host)
+        return self._child_policy.on_down(host)
+
+    def on_add(self, host):
+        return self._child_policy.on_add(host)
+
+    def on_remove(self, host):
+        self._tracker.remove(host)
+        return self._child_policy.on_remove(host)
+
+
 class ConvictionPolicy(object):
     """
     A policy which decides when hosts should be considered down
@@ -1029,6 +1279,14 @@ class SpeculativeExecutionPlan(object):
     def next_execution(self, host):
         raise NotImplementedError()
 
+    def cancel(self):
+        """
+        Called when the request completed, or is about to time out, before
+        the speculative execution last scheduled by :meth:`next_execution`
+        was sent.
+        """
+        pass
+
 
 class NoSpeculativeExecutionPlan(SpeculativeExecutionPlan):
     def next_execution(self, host):
@@ -1064,3 +1322,354 @@ class ConstantSpeculativeExecutionPolicy(SpeculativeExecutionPolicy):
 
     def new_plan(self, keyspace, statement):
         return self.ConstantSpeculativeExecutionPlan(self.delay, self.max_attempts)
+
+
+class _StatementLatencies(object):
+
+    __slots__ = ('histogram', 'delay', 'refresh_at')
+
+    def __init__(self, refresh_at):
+        from cassandra.metrics import LatencyHistogram
+        self.histogram = LatencyHistogram()
+        self.delay = None
+        self.refresh_at = refresh_at
+
+
+class PercentileSpeculativeExecutionPolicy(SpeculativeExecutionPolicy, LatencyTracker):
+    """
+    A speculative execution policy that sends a new query once a request has
+    taken longer than `percentile` percent of recent successful requests of
+    the same keyspace, or of the same prepared statement if `per_statement`
+    is :const:`True`, for a maximum of `max_attempts` speculative executions.
+
+    The delays adapt to the workload: latencies are recorded for
+    `interval` seconds, after which their percentile becomes the delay for
+    the next interval, provided at least `min_samples` were recorded.
+    Until then, requests are not speculatively executed.
+
+    Speculative executions are capped at `max_ratio` times the number of
+    requests, so a cluster-wide slowdown does not double the load on it. A
+    speculative execution counts against the cap from the moment it is
+    scheduled, until the request completes without sending it.
+    Once a request completes, the executions still in flight are abandoned
+    and their stream ids are released.
+
+    The keyspace of a statement is its :attr:`~.Statement.keyspace`, which
+    is :const:`None` for simple statements without one. Prepared statements
+    are told apart by :attr:`.PreparedStatement.query_id`; with
+    `per_statement`, other statements share the latencies of their keyspace.
+
+    Latencies are recorded through the :class:`.LatencyTracker` interface;
+    a :class:`.Cluster` registers the speculative execution policies of its
+    execution profiles that are latency trackers. The same policy instance
+    can be shared by several profiles.
+
+    .. versionadded:: 3.17.0
+    """
+
+    _no_plan = NoSpeculativeExecutionPlan()
+
+    def __init__(self, percentile=99.0, max_attempts=1, per_statement=False, max_ratio=0.1,
+                 min_samples=100, interval=10.0):
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        self.percentile = percentile
+        self.max_attempts = max_attempts
+        self.per_statement = per_statement
+        self.max_ratio = max_ratio
+        self.min_samples = min_samples
+        self.interval = interval
+        self._latencies = {}
+        self._lock = Lock()
+        self._requests = 0
+        self._speculated = 0
+        self._decay_at = time.time() + interval
+
+    class PercentileSpeculativeExecutionPlan(SpeculativeExecutionPlan):
+        def __init__(self, policy, delay, max_attempts):
+            self.policy = policy
+            self.delay = delay
+            self.remaining = max_attempts
+            self.scheduled = False
+
+        def next_execution(self, host):
+            # the speculative execution is counted as sent until canceled
+            self.scheduled = self.remaining > 0 and self.policy._reserve_speculation()
+            if self.scheduled:
+                self.remaining -= 1
+                return self.delay
+            return -1
+
+        def cancel(self):
+            if self.scheduled:
+                self.scheduled = False
+                self.remaining += 1
+                self.policy._release_speculation()
+
+    def _key(self, statement):
+        # keying other statements by query string would keep latencies for
+        # every distinct literal query
+        if self.per_statement:
+            prepared_statement = getattr(statement, 'prepared_statement', None)
+            if prepared_statement is not None:
+                return prepared_statement.query_id
+        return statement.keyspace
+
+    def update(self, host, query, latency, exc):
+        if exc is not None or query is None:
+            return
+        key = self._key(query)
+        latencies = self._latencies.get(key)
+        if latencies is None:
+            with self._lock:
+                latencies = self._latencies.setdefault(key, _StatementLatencies(time.time() + self.interval))
+        latencies.histogram.record(latency)
+
+    def new_plan(self, keyspace, statement):
+        now = time.time()
+        with self._lock:
+            if now >= self._decay_at:
+                # older requests count for less
+                self._requests //= 2
+                self._speculated //= 2
+                self._decay_at = now + self.interval
+            self._requests += 1
+
+        latencies = self._latencies.get(self._key(statement))
+        if latencies is None:
+            return self._no_plan
+        if now >= latencies.refresh_at:
+            self._refresh(latencies, now)
+        if latencies.delay is None:
+            return self._no_plan
+        return self.PercentileSpeculativeExecutionPlan(self, latencies.delay, self.max_attempts)
+
+    def _refresh(self, latencies, now):
+        with self._lock:
+            if now < latencies.refresh_at:
+                return
+            latencies.refresh_at = now + self.interval
+        snapshot = latencies.histogram.snapshot()
+        if snapshot.count >= self.min_samples:
+            latencies.delay = snapshot.percentile(self.percentile)
+            latencies.histogram.reset()
+
+    def _reserve_speculation(self):
+        with self._lock:
+            if self._speculated < self.max_ratio * self._requests:
+                self._speculated += 1
+                return True
+            return False
+
+    def _release_speculation(self):
+        with self._lock:
+            # may have been halved since it was reserved
+            if self._speculated > 0:
+                self._speculated -= 1
+
+
+class RequestThrottler(object):
+    """
+    Decides when requests issued through :meth:`.Session.execute_async` are
+    sent, giving backpressure when requests are issued faster than the
+    cluster completes them. Set an instance as
+    :attr:`.Session.request_throttler`; an instance must not be shared
+    between sessions.
+
+    Requests that cannot be sent right away are queued; once the queue is
+    full, new requests are rejected with :exc:`.RequestThrottled` instead of
+    piling up. A queued request still counts against its timeout.
+    """
+
+    def submit(self, response_future):
+        """
+        Called with each new :class:`.ResponseFuture` before it is sent.
+        Implementations call ``response_future.send_request()`` immediately,
+        queue the request and send it later through :meth:`_send_queued`,
+        or raise :exc:`.RequestThrottled`.
+        """
+        raise NotImplementedError()
+
+    def on_request_done(self, response_future):
+        """
+        Called once for each request accepted by :meth:`submit` when it
+        completes, fails or times out, including while it is still queued.
+        """
+        raise NotImplementedError()
+
+    def _send_queued(self, response_future, queued_at):
+        metrics = response_future.session.cluster.metrics
+        if metrics is not None:
+            metrics.on_throttle_queued(time.time() - queued_at)
+        # queued requests are released from completion callbacks and
+        # timers, which run on the event loop thread
+        response_future.session.submit(response_future.send_request)
+
+
+class ConcurrencyLimitingRequestThrottler(RequestThrottler):
+    """
+    A :class:`.RequestThrottler` that allows at most `max_concurrent_requests`
+    requests in flight at once. Further requests wait in a queue of up to
+    `max_queue_size` entries and are sent, in order, as earlier requests
+    complete.
+    """
+
+    max_concurrent_requests = None
+    """
+    The maximum number of requests in flight at any time.
+    """
+
+    max_queue_size = None
+    """
+    The maximum number of requests waiting to be sent.
+    """
+
+    def __init__(self, max_concurrent_requests=1024, max_queue_size=10000):
+        if max_concurrent_requests < 1:
+            raise ValueError("max_concurrent_requests must be at least 1")
+        if max_queue_size < 0:
+            raise ValueError("max_queue_size must not be negative")
+        self.max_concurrent_requests = max_concurrent_requests
+        self.max_queue_size = max_queue_size
+        self._lock = Lock()
+        self._in_flight = 0
+        self._queue = deque()
+        # requests still waiting; entries of the deque which are not in
+        # this set timed out while queued and are skipped
+        self._queued = set()
+
+    @property
+    def in_flight(self):
+        """
+        The number of requests currently sent and not yet completed.
+        """
+        return self._in_flight
+
+    @property
+    def queue_size(self):
+        """
+        The number of requests currently waiting to be sent.
+        """
+        return len(self._queued)
+
+    def submit(self, response_future):
+        with self._lock:
+            if self._in_flight < self.max_concurrent_requests:
+                self._in_flight += 1
+            elif len(self._queued) < self.max_queue_size:
+                self._queue.append((response_future, time.time()))
+                self._queued.add(response_future)
+                return
+            else:
+                raise RequestThrottled(
+                    "%d requests in flight and %d queued" % (self._in_flight, len(self._queued)))
+        response_future.send_request()
+
+    def on_request_done(self, response_future):
+        next_request = None
+        with self._lock:
+            if response_future in self._queued:
+                self._queued.remove(response_future)
+                return
+            while self._queue:
+                candidate = self._queue.popleft()
+                if candidate[0] in self._queued:
+                    self._queued.remove(candidate[0])
+                    next_request = candidate
+                    break
+            if next_request is None:
+                self._in_flight -= 1
+        # the completed request's slot goes to the next one in line
+        if next_request is not None:
+            self._send_queued(*next_request)
+
+
+class RateLimitingRequestThrottler(RequestThrottler):
+    """
+    A :class:`.RequestThrottler` that sends at most `max_requests_per_second`
+    requests per second, allowing bursts of up to one second's worth of
+    requests. Further requests wait in a queue of up to `max_queue_size`
+    entries, which is drained from an event loop timer as the rate allows.
+    """
+
+    max_requests_per_second = None
+    """
+    The sustained number of requests sent per second.
+    """
+
+    max_queue_size = None
+    """
+    The maximum number of requests waiting to be sent.
+    """
+
+    def __init__(self, max_requests_per_second, max_queue_size=10000):
+        if max_requests_per_second <= 0:
+            raise ValueError("max_requests_per_second must be positive")
+        if max_queue_size < 0:
+            raise ValueError("max_queue_size must not be negative")
+        self.max_requests_per_second = max_requests_per_second
+        self.max_queue_size = max_queue_size
+        self._lock = Lock()
+        self._permits = float(max_requests_per_second)
+        self._last_refill = time.time()
+        self._queue = deque()
+        self._queued = set()
+        self._create_timer = None
+        self._drain_scheduled = False
+
+    @property
+    def queue_size(self):
+        """
+        The number of requests currently waiting to be sent.
+        """
+        return len(self._queued)
+
+    def submit(self, response_future):
+        with self._lock:
+            self._refill()
+            if not self._queued and self._permits >= 1:
+                self._permits -= 1
+            elif len(self._queued) < self.max_queue_size:
+                self._queue.append((response_future, time.time()))
+                self._queued.add(response_future)
+                if not self._drain_scheduled:
+                    self._create_timer = response_future.session.cluster.connection_class.create_timer
+                    self._schedule_drain()
+                return
+            else:
+                raise RequestThrottled("%d requests queued" % (len(self._queued),))
+        response_future.send_request()
+
+    def on_request_done(self, response_future):
+        with self._lock:
+            self._queued.discard(response_future)
+
+    def _refill(self):
+        now = time.time()
+        self._permits = min(self.max_requests_per_second,
+                            self._permits + (now - self._last_refill) * self.max_requests_per_second)
+        self._last_refill = now
+
+    def _schedule_drain(self):
+        # called with the lock held
+        self._drain_scheduled = True
+        delay = max(0, (1 - self._permits) / self.max_requests_per_second)
+        self._create_timer(delay, self._drain)
+
+    def _drain(self):
+        to_send = []
+        with self._lock:
+            self._drain_scheduled = False
+            self._refill()
+            while self._queue and self._permits >= 1:
+                candidate = self._queue.popleft()
+                if candidate[0] in self._queued:
+                    self._queued.remove(candidate[0])
+                    self._permits -= 1
+                    to_send.append(candidate)
+            if self._queued:
+                self._schedule_drain()
+            else:
+                self._queue.clear()
+        for response_future, queued_at in to_send:
+            self._send_queued(response_future, queued_at)
@@ -183,6 +183,7 @@ class _ReconnectionHandler(object):
     """
 
     _cancelled = False
+    _scheduled = None
 
     def __init__(self, scheduler, schedule, callback, *callback_args, **callback_kwargs):
         self.scheduler = scheduler
@@ -197,7 +198,7 @@ class _ReconnectionHandler(object):
             return
 
         first_delay = next(self.schedule)
-        self.scheduler.schedule(first_delay, self.run)
+        self._scheduled = self.scheduler.schedule(first_delay, self.run)
 
     def run(self):
         if self._cancelled:
@@ -220,7 +221,7 @@ class _ReconnectionHandler(object):
                         "Will not continue to retry reconnection attempts "
                         "due to an exhausted retry schedule")
                 else:
-                    self.scheduler.schedule(next_delay, self.run)
+                    self._scheduled = self.scheduler.schedule(next_delay, self.run)
         else:
             if not self._cancelled:
                 self.on_reconnection(conn)
@@ -231,6 +232,10 @@ class _ReconnectionHandler(object):
 
     def cancel(self):
         self._cancelled = True
+        # don't wait for the next attempt to notice
+        scheduled = self._scheduled
+        if scheduled is not None:
+            scheduled.cancel()
 
     def try_reconnect(self):
         """
@@ -300,6 +305,14 @@ class HostConnection(object):
     When using v3 of the native protocol, this is used instead of a connection
     pool per host (HostConnectionPool) due to the increased in-flight capacity
     of individual connections.
+
+    A single connection is opened per host by default. When
+    :meth:`.Cluster.set_max_connections_per_host` allows more, requests are
+    sent on the least busy connection, new connections are opened while the
+    least busy one has at least :meth:`.Cluster.get_max_requests_per_connection`
+    requests in flight, and connections above
+    :meth:`.Cluster.get_core_connections_per_host` are closed again once their
+    load drops to :meth:`.Cluster.get_min_requests_per_connection`.
     """
 
     host = None
@@ -308,9 +321,10 @@ class HostConnection(object):
     shutdown_on_error = False
 
     _session = None
-    _connection = None
     _lock = None
     _keyspace = None
+    _scheduled_for_creation = 0
+    _next_trash_allowed_at = 0
 
     def __init__(self, host, host_distance, session):
         self.host = host
@@ -319,7 +333,8 @@ class HostConnection(object):
         self._lock = Lock()
         # this is used in conjunction with the connection streams. Not using the connection lock because the connection can be replaced in the lifetime of the pool.
         self._stream_available_condition = Condition(self._lock)
-        self._is_replacing = False
+        self._connections = []
+        self._trash = set()
 
         if host_distance == HostDistance.IGNORED:
             log.debug("Not opening connection to ignored host %s", self.host)
@@ -328,41 +343,68 @@ class HostConnection(object):
             log.debug("Not opening connection to remote host %s", self.host)
             return
 
-        log.debug("Initializing connection for host %s", self.host)
-        self._connection = session.cluster.connection_factory(host.address)
-        self._keyspace = session.keyspace
-        if self._keyspace:
-            self._connection.set_keyspace_blocking(self._keyspace)
-        log.debug("Finished initializing connection for host %s", self.host)
+        log.debug("Initializing connections for host %s", self.host)
+        core_conns = session.cluster.get_core_connections_per_host(host_distance)
+        connections = []
+        try:
+            for _ in range(core_conns):
+                connections.append(session.cluster.connection_factory(host.address))
+            self._keyspace = session.keyspace
+            if self._keyspace:
+                for conn in connections:
+                    conn.set_keyspace_blocking(self._keyspace)
+        except Exception:
+            # the pool is not created, don't leave the connections opened so far behind
+            for conn in connections:
+                conn.close()
+            raise
+        self._connections = connections
+        self._next_trash_allowed_at = time.time()
+        log.debug("Finished initializing connections for host %s", self.host)
 
     def borrow_connection(self, timeout):
         if self.is_shutdown:
             raise ConnectionException(
                 "Pool for %s is shutdown" % (self.host,), self.host)
 
-        conn = self._connection
-        if not conn:
+        conns = self._connections
+        if not conns:
             raise NoConnectionsAvailable()
 
         start = time.time()
         remaining = timeout
         while True:
+            conn = min(conns, key=_in_flight) if len(conns) > 1 else conns[0]
             with conn.lock:
                 if conn.in_flight <= conn.max_request_id:
                     conn.in_flight += 1
-                    return conn, conn.get_request_id()
+                    in_flight = conn.in_flight
+                    request_id = conn.get_request_id()
+                    break
             if timeout is not None:
                 remaining = timeout - time.time() + start
                 if remaining < 0:
-                    break
+                    raise NoConnectionsAvailable("All request IDs are currently in use")
             with self._stream_available_condition:
                 self._stream_available_condition.wait(remaining)
+            if self.is_shutdown:
+                raise ConnectionException(
+                    "Pool for %s is shutdown" % (self.host,), self.host)
+            conns = self._connections or conns
 
-        raise NoConnectionsAvailable("All request IDs are currently in use")
+        # open another connection if even the least busy one is loaded and
+        # there is still room under the max for this distance
+        max_conns = self._session.cluster.get_max_connections_per_host(self.host_distance)
+        if len(conns) < max_conns and \
+                in_flight >= self._session.cluster.get_max_requests_per_connection(self.host_distance):
+            self._maybe_spawn_new_connection()
+
+        return conn, request_id
 
     def return_connection(self, connection):
         with connection.lock:
             connection.in_flight -= 1
+            in_flight = connection.in_flight
         with self._stream_available_condition:
             self._stream_available_condition.notify()
 
@@ -385,16 +427,34 @@ class HostConnection(object):
             if is_down:
                 self.shutdown()
             else:
-                self._connection = None
                 with self._lock:
-                    if self._is_replacing:
+                    if connection not in self._connections:
                         return
-                    self._is_replacing = True
-                    self._session.submit(self._replace, connection)
+                    self._connections = [c for c in self._connections if c is not connection]
+                    self._scheduled_for_creation += 1
+                self._session.submit(self._replace, connection)
+        elif connection in self._trash:
+            if in_flight == 0:
+                with self._lock:
+                    if connection not in self._trash:
+                        return
+                    self._trash.remove(connection)
+                log.debug("Closing trashed connection (%s) to %s", id(connection), self.host)
+                connection.close()
+        elif len(self._connections) > 1:
+            # we can use in_flight here without holding the connection lock
+            # because the fact that in_flight dipped below the min at some
+            # point is enough to start the trashing procedure
+            cluster = self._session.cluster
+            if len(self._connections) > cluster.get_core_connections_per_host(self.host_distance) and \
+                    in_flight <= cluster.get_min_requests_per_connection(self.host_distance) and \
+                    time.time() >= self._next_trash_allowed_at:
+                self._maybe_trash_connection(connection)
 
     def _replace(self, connection):
         with self._lock:
             if self.is_shutdown:
+                self._scheduled_for_creation -= 1
                 return
 
         log.debug("Replacing connection (%s) to %s", id(connection), self.host)
@@ -402,14 +462,71 @@ class HostConnection(object):
             conn = self._session.cluster.connection_factory(self.host.address)
             if self._keyspace:
                 conn.set_keyspace_blocking(self._keyspace)
-            self._connection = conn
         except Exception:
             log.warning("Failed reconnecting %s. Retrying." % (self.host.address,))
             self._session.submit(self._replace, connection)
         else:
+            self._add_connection(conn)
+
+    def _maybe_spawn_new_connection(self):
+        max_conns = self._session.cluster.get_max_connections_per_host(self.host_distance)
+        with self._lock:
+            if self.is_shutdown or self._scheduled_for_creation >= _MAX_SIMULTANEOUS_CREATION:
+                return
+            if len(self._connections) + self._scheduled_for_creation >= max_conns:
+                return
+            self._scheduled_for_creation += 1
+
+        log.debug("Submitting task for creation of new Connection to %s", self.host)
+        self._session.submit(self._create_new_connection)
+
+    def _create_new_connection(self):
+        log.debug("Going to open new connection to host %s", self.host)
+        try:
+            conn = self._session.cluster.connection_factory(self.host.address)
+            if self._keyspace:
+                conn.set_keyspace_blocking(self._keyspace)
+        except (ConnectionException, socket.error) as exc:
+            log.warning("Failed to create new connection to %s: %s", self.host, exc)
+            with self._lock:
+                self._scheduled_for_creation -= 1
+        except Exception:
+            log.exception("Unexpectedly failed to create new connection")
             with self._lock:
-                self._is_replacing = False
-                self._stream_available_condition.notify()
+                self._scheduled_for_creation -= 1
+        else:
+            self._next_trash_allowed_at = time.time() + _MIN_TRASH_INTERVAL
+            self._add_connection(conn)
+
+    def _add_connection(self, conn):
+        with self._lock:
+            self._scheduled_for_creation -= 1
+            if not self.is_shutdown:
+                self._connections = self._connections + [conn]
+                log.debug("Added new connection (%s) to pool for host %s, signaling availablility",
+                          id(conn), self.host)
+                self._stream_available_condition.notify_all()
+                return
+
+        # the pool was shut down while the connection was being opened
+        conn.close()
+
+    def _maybe_trash_connection(self, connection):
+        core_conns = self._session.cluster.get_core_connections_per_host(self.host_distance)
+        with self._lock:
+            if connection not in self._connections or len(self._connections) <= core_conns:
+                return
+
+            self._connections = [c for c in self._connections if c is not connection]
+            with connection.lock:
+                if connection.in_flight == 0:
+                    log.debug("Skipping trash and closing unused connection (%s) to %s", id(connection), self.host)
+                    connection.close()
+                else:
+                    self._trash.add(connection)
+                    log.debug("Trashed connection (%s) to %s", id(connection), self.host)
+
+        self._next_trash_allowed_at = time.time() + _MIN_TRASH_INTERVAL
 
     def shutdown(self):
         with self._lock:
@@ -418,37 +535,79 @@ class HostConnection(object):
             else:
                 self.is_shutdown = True
             self._stream_available_condition.notify_all()
+            connections, self._connections = self._connections, []
+            trash, self._trash = self._trash, set()
+
+        for conn in connections:
+            conn.close()
 
-        if self._connection:
-            self._connection.close()
-            self._connection = None
+        for conn in trash:
+            conn.close()
+
+    def ensure_core_connections(self):
+        if self.is_shutdown:
+            return
+        if self.host_distance == HostDistance.REMOTE and not self._session.cluster.connect_to_remote_hosts:
+            return
+
+        core_conns = self._session.cluster.get_core_connections_per_host(self.host_distance)
+        with self._lock:
+            to_create = core_conns - (len(self._connections) + self._scheduled_for_creation)
+            for _ in range(to_create):
+                self._scheduled_for_creation += 1
+                self._session.submit(self._create_new_connection)
 
     def _set_keyspace_for_all_conns(self, keyspace, callback):
-        if self.is_shutdown or not self._connection:
+        """
+        Asynchronously sets the keyspace for all connections.  When all
+        connections have been set, `callback` will be called with two
+        arguments: this pool, and a list of any errors that occurred.
+        """
+        connections = self._connections
+        if self.is_shutdown or not connections:
             return
 
+        remaining_callbacks = set(connections)
+        errors = []
+
         def connection_finished_setting_keyspace(conn, error):
             self.return_connection(conn)
-            errors = [] if not error else [error]
-            callback(self, errors)
+            remaining_callbacks.remove(conn)
+            if error:
+                errors.append(error)
+
+            if not remaining_callbacks:
+                callback(self, errors)
 
         self._keyspace = keyspace
-        self._connection.set_keyspace_async(keyspace, connection_finished_setting_keyspace)
+        for conn in connections:
+            conn.set_keyspace_async(keyspace, connection_finished_setting_keyspace)
 
     def get_connections(self):
-        c = self._connection
-        return [c] if c else []
+        return self._connections
 
     def get_state(self):
-        connection = self._connection
-        open_count = 1 if connection and not (connection.is_closed or connection.is_defunct) else 0
-        in_flights = [connection.in_flight] if connection else []
-        return {'shutdown': self.is_shutdown, 'open_count': open_count, 'in_flights': in_flights}
+        connections = self._connections
+        in_flights = [c.in_flight for c in connections]
+        return {'shutdown': self.is_shutdown, 'open_count': self._open_count(connections), 'in_flights': in_flights}
 
     @property
     def open_count(self):
-        connection = self._connection
-        return 1 if connection and not (connection.is_closed or connection.is_defunct) else 0
+        return self._open_count(self._connections)
+
+    @property
+    def in_flight(self):
+        """ The number of requests sent through this pool and not yet answered. """
+        return sum(c.in_flight for c in self._connections)
+
+    @staticmethod
+    def _open_count(connections):
+        return sum(1 for c in connections if not (c.is_closed or c.is_defunct))
+
+
+def _in_flight(connection):
+    return connection.in_flight
+
 
 _MAX_SIMULTANEOUS_CREATION = 1
 _MIN_TRASH_INTERVAL = 10
@@ -794,3 +953,8 @@ class HostConnectionPool(object):
     def get_state(self):
         in_flights = [c.in_flight for c in self._connections]
         return {'shutdown': self.is_shutdown, 'open_count': self.open_count, 'in_flights': in_flights}
+
+    @property
+    def in_flight(self):
+        """ The number of requests sent through this pool and not yet answered. """
+        return sum(c.in_flight for c in self._connections)
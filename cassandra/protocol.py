@@ -1111,13 +1111,15 @@ class _ProtocolHandler(object):
         :param stream_id: native protocol stream id from the frame header
         :param flags: native protocol flags bitmap from the header
         :param opcode: native protocol opcode from the header
-        :param body: frame body
+        :param body: frame body; may be a :class:`memoryview` into the connection's read buffer
         :param decompressor: optional decompression function to inflate the body
         :return: a message decoded from the body and frame attributes
         """
         if flags & COMPRESSED_FLAG:
             if decompressor is None:
                 raise RuntimeError("No de-compressor available for compressed frame!")
+            if isinstance(body, memoryview):
+                body = body.tobytes()
             body = decompressor(body)
             flags ^= COMPRESSED_FLAG
 
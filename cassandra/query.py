@@ -25,15 +25,26 @@ import struct
 import time
 import six
 from six.moves import range, zip
+from threading import Lock
 import warnings
 
 from cassandra import ConsistencyLevel, OperationTimedOut
 from cassandra.util import unix_time_from_uuid1
 from cassandra.encoder import Encoder
 import cassandra.encoder
+from cassandra.cython_deps import HAVE_CYTHON
 from cassandra.protocol import _UNSET_VALUE
 from cassandra.util import OrderedDict, _sanitize_identifiers
 
+if HAVE_CYTHON:
+    from cassandra.serializers import make_serializers
+
+    def _make_serializers(cqltypes):
+        return [serializer.serialize for serializer in make_serializers(cqltypes)]
+else:
+    def _make_serializers(cqltypes):
+        return [cqltype.serialize for cqltype in cqltypes]
+
 import logging
 log = logging.getLogger(__name__)
 
@@ -66,6 +77,44 @@ def _clean_column_name(name):
         return clean
 
 
+# namedtuple classes created by named_tuple_factory for recently seen column
+# names, least recently used first
+_row_class_cache = OrderedDict()
+_row_class_cache_lock = Lock()
+_row_class_cache_size = 256
+
+
+def _named_tuple_row_class(colnames):
+    key = tuple(colnames)
+    with _row_class_cache_lock:
+        Row = _row_class_cache.pop(key, None)
+        if Row is not None:
+            _row_class_cache[key] = Row
+            return Row
+
+    clean_column_names = map(_clean_column_name, colnames)
+    try:
+        Row = namedtuple('Row', clean_column_names)
+    except SyntaxError:
+        # not cached: too many columns for namedtuple on this Python
+        return None
+    except Exception:
+        clean_column_names = list(map(_clean_column_name, colnames))  # create list because py3 map object will be consumed by first attempt
+        log.warning("Failed creating named tuple for results with column names %s (cleaned: %s) "
+                    "(see Python 'namedtuple' documentation for details on name rules). "
+                    "Results will be returned with positional names. "
+                    "Avoid this by choosing different names, using SELECT \"<col name>\" AS aliases, "
+                    "or specifying a different row_factory on your Session" %
+                    (colnames, clean_column_names))
+        Row = namedtuple('Row', _sanitize_identifiers(clean_column_names))
+
+    with _row_class_cache_lock:
+        _row_class_cache[key] = Row
+        if len(_row_class_cache) > _row_class_cache_size:
+            _row_class_cache.popitem(last=False)
+    return Row
+
+
 def tuple_factory(colnames, rows):
     """
     Returns each row as a tuple
@@ -147,10 +196,8 @@ def named_tuple_factory(colnames, rows):
     .. versionchanged:: 2.0.0
         moved from ``cassandra.decoder`` to ``cassandra.query``
     """
-    clean_column_names = map(_clean_column_name, colnames)
-    try:
-        Row = namedtuple('Row', clean_column_names)
-    except SyntaxError:
+    Row = _named_tuple_row_class(colnames)
+    if Row is None:
         warnings.warn(
             "Failed creating namedtuple for a result because there were too "
             "many columns. This is due to a Python limitation that affects "
@@ -164,16 +211,6 @@ def named_tuple_factory(colnames, rows):
             )
         )
         return pseudo_namedtuple_factory(colnames, rows)
-    except Exception:
-        clean_column_names = list(map(_clean_column_name, colnames))  # create list because py3 map object will be consumed by first attempt
-        log.warning("Failed creating named tuple for results with column names %s (cleaned: %s) "
-                    "(see Python 'namedtuple' documentation for details on name rules). "
-                    "Results will be returned with positional names. "
-                    "Avoid this by choosing different names, using SELECT \"<col name>\" AS aliases, "
-                    "or specifying a different row_factory on your Session" %
-                    (colnames, clean_column_names))
-        Row = namedtuple('Row', _sanitize_identifiers(clean_column_names))
-
     return [Row(*row) for row in rows]
 
 
@@ -268,6 +305,16 @@ class Statement(object):
     Flag indicating whether this statement is safe to run multiple times in speculative execution.
     """
 
+    routing_token = None
+    """
+    An optional precomputed :class:`~.Token` for the :attr:`routing_key`, such
+    as ``cluster.metadata.token_map.token_class.from_key(routing_key)``.
+    When set, :class:`~.TokenAwarePolicy` routes by it without hashing the
+    routing key. It is reset whenever :attr:`routing_key` is assigned.
+
+    .. versionadded:: 3.17.0
+    """
+
     _serial_consistency_level = None
     _routing_key = None
 
@@ -300,6 +347,7 @@ class Statement(object):
         return self._routing_key
 
     def _set_routing_key(self, key):
+        self.routing_token = None
         if isinstance(key, (list, tuple)):
             if len(key) == 1:
                 self._routing_key = key[0]
@@ -310,6 +358,7 @@ class Statement(object):
 
     def _del_routing_key(self):
         self._routing_key = None
+        self.routing_token = None
 
     routing_key = property(
         _get_routing_key,
@@ -445,6 +494,8 @@ class PreparedStatement(object):
     result_metadata_id = None
     routing_key_indexes = None
     _routing_key_index_set = None
+    _serializers = None
+    _last_bound = 0  # when a BoundStatement was last created, to reprepare recent statements first
     serial_consistency_level = None  # TODO never used?
 
     def __init__(self, column_metadata, query_id, routing_key_indexes, query,
@@ -500,6 +551,14 @@ class PreparedStatement(object):
         """
         return BoundStatement(self).bind(values)
 
+    def _get_serializers(self):
+        # one serialize function per bind marker, compiled when the Cython
+        # extensions are built, resolved once for all executions
+        serializers = self._serializers
+        if serializers is None:
+            serializers = self._serializers = _make_serializers([col.type for col in self.column_metadata])
+        return serializers
+
     def is_routing_key_index(self, i):
         if self._routing_key_index_set is None:
             self._routing_key_index_set = set(self.routing_key_indexes) if self.routing_key_indexes else set()
@@ -537,6 +596,7 @@ class BoundStatement(Statement):
         See :class:`Statement` attributes for a description of the other parameters.
         """
         self.prepared_statement = prepared_statement
+        prepared_statement._last_bound = time.time()
 
         self.retry_policy = prepared_statement.retry_policy
         self.consistency_level = prepared_statement.consistency_level
@@ -614,7 +674,8 @@ class BoundStatement(Statement):
 
         self.raw_values = values
         self.values = []
-        for value, col_spec in zip(values, col_meta):
+        serializers = self.prepared_statement._get_serializers()
+        for value, col_spec, serialize in zip(values, col_meta, serializers):
             if value is None:
                 self.values.append(None)
             elif value is UNSET_VALUE:
@@ -624,7 +685,7 @@ class BoundStatement(Statement):
                     raise ValueError("Attempt to bind UNSET_VALUE while using unsuitable protocol version (%d < 4)" % proto_version)
             else:
                 try:
-                    self.values.append(col_spec.type.serialize(value, proto_version))
+                    self.values.append(serialize(value, proto_version))
                 except (TypeError, struct.error) as exc:
                     actual_type = type(value)
                     message = ('Received an argument of invalid type for column "%s". '
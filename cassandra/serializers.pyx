@@ -0,0 +1,270 @@
+# Copyright DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Cython-based serializers for the values bound to prepared statements. They
+produce the same bytes, and raise the same exceptions, as the ``serialize``
+methods of the cqltypes they are found for.
+"""
+
+from libc.stdint cimport int64_t, uint32_t, uint64_t, INT64_MIN, INT64_MAX
+from libc.string cimport memcpy
+from libc.float cimport FLT_MAX
+from libc.math cimport isinf, isnan
+from cpython.bytes cimport PyBytes_FromStringAndSize
+from cpython.number cimport PyNumber_Index
+from cpython.unicode cimport PyUnicode_AsUTF8String
+
+import six
+import struct
+
+from cassandra import cqltypes
+
+
+cdef class Serializer:
+    """Cython-based serializer class for a cqltype"""
+
+    def __init__(self, cqltype):
+        self.cqltype = cqltype
+
+    cpdef serialize(self, object value, int protocol_version):
+        raise NotImplementedError
+
+
+cdef class GenericSerializer(Serializer):
+    """
+    Wrap a generic cqltype serialize() method, for types without a compiled
+    serializer
+    """
+
+    cpdef serialize(self, object value, int protocol_version):
+        return self.cqltype.serialize(value, protocol_version)
+
+
+#--------------------------------------------------------------------------
+# Fixed width types
+
+cdef inline bytes _pack(uint64_t value, int size):
+    """Pack the `size` low order bytes of `value` in network byte order"""
+    cdef char out[8]
+    cdef int i
+    for i in range(size):
+        out[size - i - 1] = <char> (value & 0xff)
+        value >>= 8
+    return PyBytes_FromStringAndSize(out, size)
+
+
+cdef inline int64_t _int_value(object value, int64_t low, int64_t high) except? -1:
+    """Convert `value` to a C integer, raising the errors struct.pack raises"""
+    cdef int64_t result
+    try:
+        value = PyNumber_Index(value)
+    except TypeError:
+        raise struct.error("required argument is not an integer")
+    try:
+        result = value
+    except OverflowError:
+        raise struct.error("argument out of range")
+    if result < low or result > high:
+        raise struct.error("argument out of range")
+    return result
+
+
+cdef class SerLongType(Serializer):
+    cpdef serialize(self, object value, int protocol_version):
+        return _pack(<uint64_t> _int_value(value, INT64_MIN, INT64_MAX), 8)
+
+
+cdef class SerInt32Type(Serializer):
+    cpdef serialize(self, object value, int protocol_version):
+        return _pack(<uint64_t> _int_value(value, -0x80000000, 0x7fffffff), 4)
+
+
+cdef class SerShortType(Serializer):
+    cpdef serialize(self, object value, int protocol_version):
+        return _pack(<uint64_t> _int_value(value, -0x8000, 0x7fff), 2)
+
+
+cdef class SerByteType(Serializer):
+    cpdef serialize(self, object value, int protocol_version):
+        return _pack(<uint64_t> _int_value(value, -0x80, 0x7f), 1)
+
+
+cdef class SerBooleanType(SerByteType):
+    pass
+
+
+cdef inline double _float_value(object value) except? -1:
+    """Convert `value` to a C double, raising the errors struct.pack raises"""
+    try:
+        return value
+    except TypeError:
+        raise struct.error("required argument is not a float")
+
+
+cdef class SerDoubleType(Serializer):
+    cpdef serialize(self, object value, int protocol_version):
+        cdef double d = _float_value(value)
+        cdef uint64_t bits
+        memcpy(&bits, &d, 8)
+        return _pack(bits, 8)
+
+
+cdef class SerFloatType(Serializer):
+    cpdef serialize(self, object value, int protocol_version):
+        cdef double d = _float_value(value)
+        cdef float f
+        cdef uint32_t bits
+        if (d > FLT_MAX or d < -FLT_MAX) and not isinf(d) and not isnan(d):
+            raise OverflowError("float too large to pack with f format")
+        f = <float> d
+        memcpy(&bits, &f, 4)
+        return _pack(bits, 4)
+
+
+#--------------------------------------------------------------------------
+# Variable width types
+
+cdef class SerUTF8Type(Serializer):
+    cpdef serialize(self, object value, int protocol_version):
+        if type(value) is unicode:
+            return PyUnicode_AsUTF8String(value)
+        return self.cqltype.serialize(value, protocol_version)
+
+
+cdef class SerBytesType(Serializer):
+    cpdef serialize(self, object value, int protocol_version):
+        if type(value) is bytes:
+            return value
+        return self.cqltype.serialize(value, protocol_version)
+
+
+#--------------------------------------------------------------------------
+# Collections, built into a single list of parts that is joined once
+
+cdef inline bytes _pack_length(Py_ssize_t length, int protocol_version):
+    if protocol_version >= 3:
+        return _pack(<uint64_t> length, 4)
+    if length > 0xffff:
+        raise struct.error("argument out of range")
+    return _pack(<uint64_t> length, 2)
+
+
+cdef inline bytes _to_binary(Serializer serializer, object value, int protocol_version):
+    if value is None:
+        return b''
+    return serializer.serialize(value, protocol_version)
+
+
+cdef class SerListType(Serializer):
+    cdef Serializer subtype
+
+    def __init__(self, cqltype):
+        super(SerListType, self).__init__(cqltype)
+        self.subtype = find_serializer(cqltype.subtypes[0])
+
+    cpdef serialize(self, object value, int protocol_version):
+        cdef list parts
+        cdef bytes item_bytes
+        cdef int inner_proto = max(3, protocol_version)
+        if isinstance(value, six.string_types):
+            raise TypeError("Received a string for a type that expects a sequence")
+
+        parts = [_pack_length(len(value), protocol_version)]
+        for item in value:
+            item_bytes = _to_binary(self.subtype, item, inner_proto)
+            parts.append(_pack_length(len(item_bytes), protocol_version))
+            parts.append(item_bytes)
+        return b''.join(parts)
+
+
+cdef class SerMapType(Serializer):
+    cdef Serializer key_type
+    cdef Serializer value_type
+
+    def __init__(self, cqltype):
+        super(SerMapType, self).__init__(cqltype)
+        self.key_type = find_serializer(cqltype.subtypes[0])
+        self.value_type = find_serializer(cqltype.subtypes[1])
+
+    cpdef serialize(self, object value, int protocol_version):
+        cdef list parts
+        cdef bytes key_bytes, value_bytes
+        cdef int inner_proto = max(3, protocol_version)
+
+        parts = [_pack_length(len(value), protocol_version)]
+        try:
+            items = six.iteritems(value)
+        except AttributeError:
+            raise TypeError("Got a non-map object for a map value")
+        for key, val in items:
+            key_bytes = _to_binary(self.key_type, key, inner_proto)
+            value_bytes = _to_binary(self.value_type, val, inner_proto)
+            parts.append(_pack_length(len(key_bytes), protocol_version))
+            parts.append(key_bytes)
+            parts.append(_pack_length(len(value_bytes), protocol_version))
+            parts.append(value_bytes)
+        return b''.join(parts)
+
+
+cdef class SerFrozenType(Serializer):
+    cdef Serializer subtype
+
+    def __init__(self, cqltype):
+        super(SerFrozenType, self).__init__(cqltype)
+        self.subtype = find_serializer(cqltype.subtypes[0])
+
+    cpdef serialize(self, object value, int protocol_version):
+        return _to_binary(self.subtype, value, protocol_version)
+
+
+#--------------------------------------------------------------------------
+# Helper utilities
+
+def make_serializers(cqltypes):
+    """Create a list of Serializers for each given cqltype in cqltypes"""
+    return [find_serializer(ct) for ct in cqltypes]
+
+
+cdef list _fixed_serializers = [
+    (cqltypes.LongType, SerLongType),
+    (cqltypes.Int32Type, SerInt32Type),
+    (cqltypes.ShortType, SerShortType),
+    (cqltypes.ByteType, SerByteType),
+    (cqltypes.BooleanType, SerBooleanType),
+    (cqltypes.DoubleType, SerDoubleType),
+    (cqltypes.FloatType, SerFloatType),
+    (cqltypes.UTF8Type, SerUTF8Type),
+    (cqltypes.BytesType, SerBytesType),
+]
+
+
+cpdef Serializer find_serializer(cqltype):
+    """Find a serializer for a cqltype"""
+    if issubclass(cqltype, cqltypes._ParameterizedType) and not cqltype.subtypes:
+        pass
+    elif issubclass(cqltype, (cqltypes.ListType, cqltypes.SetType)):
+        if cqltype.serialize_safe.__func__ is cqltypes._SimpleParameterizedType.serialize_safe.__func__:
+            return SerListType(cqltype)
+    elif issubclass(cqltype, cqltypes.MapType):
+        if cqltype.serialize_safe.__func__ is cqltypes.MapType.serialize_safe.__func__:
+            return SerMapType(cqltype)
+    elif issubclass(cqltype, (cqltypes.FrozenType, cqltypes.ReversedType)):
+        return SerFrozenType(cqltype)
+    else:
+        for base, cls in _fixed_serializers:
+            # custom subclasses may serialize differently
+            if issubclass(cqltype, base) and cqltype.serialize is base.serialize:
+                return cls(cqltype)
+    return GenericSerializer(cqltype)
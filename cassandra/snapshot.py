@@ -0,0 +1,185 @@
+# Copyright DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module reads and writes the metadata snapshots used by
+:attr:`.Cluster.metadata_snapshot_path`: the hosts, tokens and schema of a
+cluster as last seen by the driver, so that a new :class:`.Cluster` can
+route requests before refreshing them from the system tables.
+
+A snapshot file holds an 8 byte magic string, the format version as an
+unsigned 16 bit integer in network byte order, the version of the driver that
+wrote it as a string prefixed by its length in one byte, and the snapshot as a
+pickle. Snapshots are only read back by the driver version that wrote them,
+and only schema metadata classes are loaded from them.
+
+.. versionadded:: 3.17.0
+"""
+
+from binascii import hexlify
+import codecs
+from collections import defaultdict, OrderedDict
+import os
+import struct
+import tempfile
+
+import six
+from six import BytesIO
+from six.moves import cPickle as pickle
+
+import cassandra
+from cassandra import metadata as metadata_module
+from cassandra.metadata import BytesToken
+
+SNAPSHOT_FORMAT_VERSION = 1
+"""
+The version of the snapshot format written by this driver version.
+"""
+
+_MAGIC = b'CQLMDSNP'
+_header = struct.Struct('>8sHB')
+
+# besides the classes of cassandra.metadata, the only globals a snapshot may
+# refer to; protocol 2 pickles name builtins as in Python 2, and bytes as
+# calls to _codecs.encode in Python 3
+_ALLOWED_GLOBALS = {
+    ('collections', 'OrderedDict'): OrderedDict,
+    ('__builtin__', 'set'): set,
+    ('__builtin__', 'frozenset'): frozenset,
+    ('builtins', 'set'): set,
+    ('builtins', 'frozenset'): frozenset,
+    ('_codecs', 'encode'): codecs.encode
+}
+
+_HOST_ATTRIBUTES = ('broadcast_address', 'listen_address', 'release_version',
+                    'dse_version', 'dse_workload')
+
+# os.replace is not available on Python 2, where os.rename replaces existing
+# files everywhere but on Windows
+_replace = getattr(os, 'replace', os.rename)
+
+
+def _token_string(token):
+    # as read from the system tables
+    if isinstance(token, BytesToken):
+        return hexlify(token.value).decode('ascii')
+    return str(token.value)
+
+
+def make_snapshot(metadata):
+    """
+    Returns the snapshot of a :class:`.Metadata` instance, as a dict.
+    """
+    tokens = defaultdict(list)
+    if metadata.token_map:
+        for token, host in six.iteritems(metadata.token_map.token_to_host_owner):
+            tokens[host].append(_token_string(token))
+
+    hosts = []
+    for host in metadata.all_hosts():
+        hosts.append({
+            'address': host.address,
+            'datacenter': host.datacenter,
+            'rack': host.rack,
+            'attributes': dict((name, getattr(host, name)) for name in _HOST_ATTRIBUTES),
+            'tokens': tokens.get(host, [])
+        })
+
+    keyspaces = dict(metadata.keyspaces)
+    return {
+        'cluster_name': metadata.cluster_name,
+        'partitioner': metadata.partitioner,
+        'hosts': hosts,
+        'keyspaces': keyspaces,
+        # keyspaces whose contents were not loaded, see Cluster.schema_metadata_lazy
+        'lazy_keyspaces': [name for name, ks in six.iteritems(keyspaces) if ks._loader is not None]
+    }
+
+
+def write_snapshot(metadata, path):
+    """
+    Writes the snapshot of a :class:`.Metadata` instance to `path`. The file
+    is replaced atomically, so that concurrent readers never see a partial
+    snapshot.
+    """
+    driver_version = cassandra.__version__.encode('ascii')
+    data = (_header.pack(_MAGIC, SNAPSHOT_FORMAT_VERSION, len(driver_version)) + driver_version +
+            pickle.dumps(make_snapshot(metadata), 2))
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix=os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        _replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def read_snapshot(path):
+    """
+    Reads a snapshot written by :func:`.write_snapshot`, as returned by
+    :func:`.make_snapshot`.
+
+    Raises :exc:`ValueError` if the file is not a snapshot, was written
+    with another format or driver version, or refers to anything but schema
+    metadata classes. Both versions are checked before unpickling anything.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if len(data) < _header.size:
+        raise ValueError("%s is not a metadata snapshot" % (path,))
+    magic, version, driver_version_length = _header.unpack_from(data)
+    if magic != _MAGIC:
+        raise ValueError("%s is not a metadata snapshot" % (path,))
+    if version != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError("Unsupported metadata snapshot format version %d in %s" % (version, path))
+    start = _header.size + driver_version_length
+    driver_version = data[_header.size:start].decode('ascii', 'replace')
+    if driver_version != cassandra.__version__:
+        raise ValueError("Metadata snapshot %s was written by driver version %s" % (path, driver_version))
+
+    try:
+        snapshot = _loads(data[start:])
+    except pickle.UnpicklingError as exc:
+        raise ValueError("Invalid metadata snapshot %s: %s" % (path, exc))
+    if not isinstance(snapshot, dict):
+        raise ValueError("Invalid metadata snapshot %s" % (path,))
+    return snapshot
+
+
+def _find_global(module, name):
+    if module == metadata_module.__name__:
+        cls = getattr(metadata_module, name, None)
+        if isinstance(cls, type):
+            return cls
+    elif (module, name) in _ALLOWED_GLOBALS:
+        return _ALLOWED_GLOBALS[(module, name)]
+    raise pickle.UnpicklingError("%s.%s is not allowed in metadata snapshots" % (module, name))
+
+
+if six.PY2:
+    def _loads(data):
+        unpickler = pickle.Unpickler(BytesIO(data))
+        unpickler.find_global = _find_global
+        return unpickler.load()
+else:
+    class _SnapshotUnpickler(pickle.Unpickler):
+
+        def find_class(self, module, name):
+            return _find_global(module, name)
+
+    def _loads(data):
+        return _SnapshotUnpickler(BytesIO(data)).load()
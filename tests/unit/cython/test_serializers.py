@@ -0,0 +1,77 @@
+# Copyright DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from decimal import Decimal
+import uuid
+
+from cassandra import cqltypes
+from cassandra.cython_deps import HAVE_CYTHON
+from tests.unit.cython.utils import cythontest
+
+if HAVE_CYTHON:
+    from cassandra.serializers import find_serializer
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest  # noqa
+
+
+def serialize(fn, value, protocol_version):
+    try:
+        return fn(value, protocol_version)
+    except Exception as exc:
+        return type(exc)
+
+
+class SerializersTest(unittest.TestCase):
+
+    def assert_same_as_cqltype(self, cqltype, values):
+        serializer = find_serializer(cqltype)
+        for value in values:
+            for protocol_version in (2, 4):
+                self.assertEqual(serialize(serializer.serialize, value, protocol_version),
+                                 serialize(cqltype.serialize, value, protocol_version),
+                                 (cqltype, value, protocol_version))
+
+    @cythontest
+    def test_fixed_width_types(self):
+        values = [0, 1, -1, 127, -129, 2 ** 15, 2 ** 31 - 1, -2 ** 31 - 1, 2 ** 63 - 1, -2 ** 63, 2 ** 63,
+                  True, False, 1.5, -0.0, float('inf'), 1e39, 'abc', None, Decimal('1.5')]
+        for cqltype in (cqltypes.LongType, cqltypes.CounterColumnType, cqltypes.Int32Type, cqltypes.ShortType,
+                        cqltypes.ByteType, cqltypes.BooleanType, cqltypes.DoubleType, cqltypes.FloatType):
+            self.assert_same_as_cqltype(cqltype, values)
+
+    @cythontest
+    def test_variable_width_types(self):
+        values = [u'abc', u'h\xe9', b'xy', bytearray(b'z'), 1, uuid.uuid4()]
+        for cqltype in (cqltypes.UTF8Type, cqltypes.VarcharType, cqltypes.BytesType, cqltypes.UUIDType):
+            self.assert_same_as_cqltype(cqltype, values)
+
+    @cythontest
+    def test_collections(self):
+        values = [[1, 2, None], ['a', 'b'], {'a': 1, 'b': None}, {1: {'x': 1.5}}, 'abc', 5, [2 ** 40]]
+        for cass_type in ('ListType(Int32Type)', 'SetType(UTF8Type)', 'MapType(UTF8Type, LongType)',
+                          'ListType(FrozenType(ListType(Int32Type)))',
+                          'MapType(Int32Type, FrozenType(MapType(UTF8Type, DoubleType)))'):
+            self.assert_same_as_cqltype(cqltypes.lookup_casstype(cass_type), values)
+
+    @cythontest
+    def test_custom_types(self):
+        class CustomInt32Type(cqltypes.Int32Type):
+            @staticmethod
+            def serialize(val, protocol_version):
+                return b'custom'
+
+        self.assertEqual(find_serializer(CustomInt32Type).serialize(1, 4), b'custom')
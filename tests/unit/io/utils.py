@@ -181,7 +181,7 @@ class TimerTestMixin(object):
         time.sleep(.2)
         timer_manager = self._timers
         # Assert that the cancellation was honored
-        self.assertFalse(timer_manager._queue)
+        self.assertFalse(any(timer_manager._slots))
         self.assertFalse(timer_manager._new_timers)
         self.assertFalse(callback.was_invoked())
 
@@ -383,6 +383,19 @@ class ReactorTestMixin(object):
         self.assertEqual(last_write_size,
                          len(self.get_socket(c).send.call_args[0][0]))
 
+    def test_coalesced_write(self):
+        c = self.make_connection()
+
+        # queue up more frames behind the OptionsMessage
+        c.push(six.b('a') * 10)
+        c.push(six.b('b') * 10)
+        c.handle_write(*self.null_handle_function_args)
+
+        self.assertFalse(c.is_defunct)
+        self.assertEqual(1, self.get_socket(c).send.call_count)
+        sent = self.get_socket(c).send.call_args[0][0]
+        self.assertTrue(sent.endswith(six.b('a') * 10 + six.b('b') * 10))
+
     def test_socket_error_on_read(self):
         c = self.make_connection()
 
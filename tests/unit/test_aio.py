@@ -0,0 +1,126 @@
+# Copyright DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest # noqa
+
+from threading import Thread
+
+try:
+    import asyncio
+    from cassandra.aio import wrap_future, AsyncResultSetIterator
+except (ImportError, SyntaxError):
+    asyncio = None
+
+from cassandra.cluster import ResultSet
+
+
+class FakeResponseFuture(object):
+    """
+    Serves `pages` one at a time from a separate thread, the way the
+    IO thread completes a ResponseFuture.
+    """
+
+    _col_names = None
+    _col_types = None
+
+    def __init__(self, pages, error=None):
+        self._pages = list(pages)
+        self._error = error
+        self._callbacks = []
+        self._errbacks = []
+        self._result = None
+        self._exception = None
+        self.fetches = 0
+
+    @property
+    def has_more_pages(self):
+        return bool(self._pages)
+
+    def add_callbacks(self, callback, errback):
+        self._callbacks.append(callback)
+        self._errbacks.append(errback)
+        if self._result is not None:
+            callback(self._result)
+        elif self._exception is not None:
+            errback(self._exception)
+
+    def complete(self):
+        if self._error:
+            self._exception = self._error
+            for errback in self._errbacks:
+                errback(self._error)
+        else:
+            self._result = self._pages.pop(0)
+            for callback in self._callbacks:
+                callback(self._result)
+
+    def start_fetching_next_page(self):
+        self.fetches += 1
+        self._result = None
+        t = Thread(target=self.complete)
+        t.start()
+
+
+@unittest.skipIf(asyncio is None, "asyncio support requires Python 3.5.2+")
+class AsyncioSupportTests(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_wrap_future_result(self):
+        response_future = FakeResponseFuture([[1, 2, 3]])
+        future = wrap_future(response_future, loop=self.loop)
+        response_future.start_fetching_next_page()
+
+        result = self.loop.run_until_complete(future)
+        self.assertIsInstance(result, ResultSet)
+        self.assertEqual(result.current_rows, [1, 2, 3])
+
+    def test_wrap_future_exception(self):
+        response_future = FakeResponseFuture([], error=ValueError("failed"))
+        future = wrap_future(response_future, loop=self.loop)
+        response_future.start_fetching_next_page()
+
+        self.assertRaises(ValueError, self.loop.run_until_complete, future)
+
+    def test_async_iteration_prefetches(self):
+        response_future = FakeResponseFuture([[3, 4], [5]])
+        result_set = ResultSet(response_future, [1, 2])
+        iterator = AsyncResultSetIterator(result_set, loop=self.loop)
+        # the second page is requested before the first one is consumed
+        self.assertEqual(response_future.fetches, 1)
+
+        rows = []
+        while True:
+            try:
+                rows.append(self.loop.run_until_complete(iterator.__anext__()))
+            except StopAsyncIteration:
+                break
+
+        self.assertEqual(rows, [1, 2, 3, 4, 5])
+        self.assertEqual(response_future.fetches, 2)
+        self.assertEqual(len(response_future._callbacks), 1)
+
+    def test_async_iteration_error(self):
+        response_future = FakeResponseFuture([[3]], error=ValueError("failed"))
+        iterator = AsyncResultSetIterator(ResultSet(response_future, [1]), loop=self.loop)
+
+        self.assertEqual(self.loop.run_until_complete(iterator.__anext__()), 1)
+        self.assertRaises(ValueError, self.loop.run_until_complete, iterator.__anext__())
@@ -17,15 +17,17 @@ except ImportError:
     import unittest  # noqa
 
 import logging
+from threading import Event
+import time
 
-from mock import patch, Mock
+from mock import patch, Mock, ANY, call
 
 from cassandra import ConsistencyLevel, DriverException, Timeout, Unavailable, RequestExecutionException, ReadTimeout, WriteTimeout, CoordinationFailure, ReadFailure, WriteFailure, FunctionFailure, AlreadyExists,\
     InvalidRequest, Unauthorized, AuthenticationFailed, OperationTimedOut, UnsupportedOperation, RequestValidationException, ConfigurationException
 from cassandra.cluster import _Scheduler, Session, Cluster, _NOT_SET, default_lbp_factory, \
     ExecutionProfile, _ConfigMode, EXEC_PROFILE_DEFAULT, NoHostAvailable
 from cassandra.policies import HostDistance, RetryPolicy, RoundRobinPolicy, \
-    DowngradingConsistencyRetryPolicy, SimpleConvictionPolicy
+    DowngradingConsistencyRetryPolicy, SimpleConvictionPolicy, PercentileSpeculativeExecutionPolicy
 from cassandra.query import SimpleStatement, named_tuple_factory, tuple_factory
 from cassandra.pool import Host
 from tests.unit.utils import mock_session_pools
@@ -110,6 +112,54 @@ class ClusterTest(unittest.TestCase):
         for n in (0, mn, 128):
             self.assertRaises(ValueError, c.set_max_requests_per_connection, d, n)
 
+    def test_connections_per_host_v3(self):
+        d = HostDistance.LOCAL
+        c = Cluster(protocol_version=4)
+        self.assertEqual(c.get_core_connections_per_host(d), 1)
+        self.assertEqual(c.get_max_connections_per_host(d), 1)
+
+        c.set_max_connections_per_host(d, 4)
+        c.set_max_requests_per_connection(d, 2048)
+        self.assertEqual(c.get_max_connections_per_host(d), 4)
+        self.assertEqual(c.get_max_requests_per_connection(d), 2048)
+        # v1/v2 settings are left alone
+        self.assertEqual(c._max_connections_per_host[d], 8)
+
+        self.assertRaises(ValueError, c.set_core_connections_per_host, d, 0)
+        self.assertRaises(ValueError, c.set_max_connections_per_host, d, 0)
+        self.assertRaises(ValueError, c.set_max_requests_per_connection, d, 2 ** 15 + 1)
+
+    def test_get_in_flight_requests(self):
+        c = Cluster(protocol_version=4)
+        host, other_host = Mock(), Mock()
+        sessions = [Mock(_pools={host: Mock(in_flight=n)}) for n in (3, 4)]
+        for session in sessions:
+            c.sessions.add(session)
+        self.assertEqual(c.get_in_flight_requests(host), 7)
+        self.assertEqual(c.get_in_flight_requests(other_host), 0)
+
+    def test_prepare_all_queries_most_recent_first(self):
+        c = Cluster(protocol_version=4)
+        c.metrics_enabled = True
+        c.metrics = Mock()
+        statements = [Mock(query_string='q%d' % i, keyspace=ks, _last_bound=last_bound)
+                      for i, (ks, last_bound) in enumerate([('ks1', 1), ('ks2', 3), (None, 0), ('ks1', 2)])]
+        c._prepared_statements = dict(enumerate(statements))
+
+        connection = Mock()
+        connection.wait_for_pipelined_responses.side_effect = lambda msgs, window, timeout: [(True, None)] * len(msgs)
+        c.connection_factory = Mock(return_value=connection)
+        host = Mock()
+        c._prepare_all_queries(host)
+
+        # statements are grouped by keyspace, the most recently bound first
+        connection.set_keyspace_blocking.assert_has_calls([call('ks2'), call('ks1')])
+        self.assertEqual([[m.query for m in args[0]] for args, _ in connection.wait_for_pipelined_responses.call_args_list],
+                         [['q1'], ['q3', 'q0'], ['q2']])
+        self.assertEqual(connection.wait_for_pipelined_responses.call_args[0][1], c.reprepare_window)
+        c.metrics.on_host_reprepared.assert_called_once_with(host, ANY)
+        connection.close.assert_called_once_with()
+
 
 class SchedulerTest(unittest.TestCase):
     # TODO: this suite could be expanded; for now just adding a test covering a ticket
@@ -126,6 +176,51 @@ class SchedulerTest(unittest.TestCase):
         sched.schedule(0, lambda: None)
         sched.schedule(0, lambda: None)  # pre-473: "TypeError: unorderable types: function() < function()"t
 
+    def _run_inline(self, fn, *args, **kwargs):
+        fn(*args, **kwargs)
+        return Mock()
+
+    def test_runs_when_due(self):
+        sched = _Scheduler(Mock(submit=self._run_inline))
+        self.addCleanup(sched.shutdown)
+        done = Event()
+        ran = []
+
+        sched.schedule(10, ran.append, 'late')
+        start = time.time()
+        # inserting a task due earlier wakes the scheduler up
+        sched.schedule(0.01, done.set)
+        self.assertTrue(done.wait(5))
+        elapsed = time.time() - start
+        self.assertGreaterEqual(elapsed, 0.01)
+        self.assertLess(elapsed, 0.09)
+        self.assertEqual(ran, [])
+
+    def test_cancel(self):
+        sched = _Scheduler(Mock(submit=self._run_inline))
+        self.addCleanup(sched.shutdown)
+        done = Event()
+        ran = []
+
+        handle = sched.schedule_unique(0.01, ran.append, 'canceled')
+        self.assertIs(sched.schedule_unique(0.01, ran.append, 'canceled'), handle)
+        handle.cancel()
+        # a canceled task no longer counts as scheduled
+        self.assertIsNot(sched.schedule_unique(0.02, ran.append, 'rescheduled'), handle)
+        sched.schedule(0.03, done.set)
+
+        self.assertTrue(done.wait(5))
+        self.assertEqual(ran, ['rescheduled'])
+
+    def test_shutdown(self):
+        sched = _Scheduler(Mock(submit=self._run_inline))
+        ran = []
+        sched.schedule(0.5, ran.append, 'pending')
+        sched.shutdown()
+        self.assertFalse(sched.is_alive())
+        self.assertIsNone(sched.schedule(0, ran.append, 'after shutdown'))
+        self.assertEqual(ran, [])
+
 
 class SessionTest(unittest.TestCase):
     def setUp(self):
@@ -337,6 +432,14 @@ class ExecutionProfileTest(unittest.TestCase):
         rf = session.execute_async("query", execution_profile=by_value)
         self._verify_response_future_profile(rf, by_value)
 
+    def test_latency_tracking_speculative_execution_policy(self):
+        policy = PercentileSpeculativeExecutionPolicy()
+        cluster = Cluster(execution_profiles={
+            EXEC_PROFILE_DEFAULT: ExecutionProfile(RoundRobinPolicy(), speculative_execution_policy=policy),
+            'other': ExecutionProfile(RoundRobinPolicy(), speculative_execution_policy=policy)})
+        cluster.profile_manager.populate(cluster, [])
+        self.assertEqual(cluster._latency_trackers, (policy,))
+
     @mock_session_pools
     def test_exec_profile_clone(self):
 
@@ -0,0 +1,130 @@
+# Copyright DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest # noqa
+
+import datetime
+from mock import Mock
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from cassandra import cqltypes
+from cassandra.cluster import ResultSet
+from cassandra.query import dict_factory
+from cassandra.util import Date, Time
+
+
+class PagedResponseFuture(object):
+    """
+    Serves the remaining `pages` through ResponseFuture.result(), the way
+    ResultSet.fetch_next_page consumes them.
+    """
+
+    def __init__(self, names, types, pages):
+        self._col_names = names
+        self._col_types = types
+        self._pages = list(pages)
+        self.row_factory = None
+
+    @property
+    def has_more_pages(self):
+        return bool(self._pages)
+
+    def start_fetching_next_page(self):
+        pass
+
+    def result(self):
+        return ResultSet(self, self._pages.pop(0))
+
+
+@unittest.skipIf(np is None, "NumPy is not available")
+class ColumnarTest(unittest.TestCase):
+
+    names = ['id', 'score', 'ts', 'day', 'name', 'data', 'tags']
+    types = [cqltypes.Int32Type, cqltypes.DoubleType, cqltypes.DateType, cqltypes.SimpleDateType,
+             cqltypes.VarcharType, cqltypes.BytesType, cqltypes.SetType.apply_parameters([cqltypes.UTF8Type])]
+
+    def make_row(self, i):
+        if i % 3 == 2:
+            return (i, None, None, None, None, None, None)
+        return (i, i / 2.0, datetime.datetime(2019, 1, 1, 0, 0, i), Date(17897 + i),
+                u'n\xe9%d' % i, b'\x00' * i, set([u'a%d' % i]))
+
+    def test_pages_to_columns(self):
+        rows = [self.make_row(i) for i in range(10)]
+        response_future = PagedResponseFuture(self.names, self.types, [rows[4:8], rows[8:]])
+        columns = ResultSet(response_future, rows[:4]).to_columnar()
+
+        self.assertEqual(len(columns), 10)
+        self.assertEqual(list(columns), self.names)
+        nulls = [i % 3 == 2 for i in range(10)]
+
+        self.assertEqual(columns['id'].dtype, np.int32)
+        self.assertEqual(columns['id'].tolist(), list(range(10)))
+        self.assertEqual(columns['score'].dtype, np.float64)
+        self.assertEqual(columns['score'].mask.tolist(), nulls)
+        self.assertEqual(columns['score'][3], 1.5)
+
+        self.assertEqual(columns['ts'].dtype, np.dtype('datetime64[ms]'))
+        self.assertEqual(columns['ts'].mask.tolist(), nulls)
+        self.assertEqual(columns['ts'][1], np.datetime64('2019-01-01T00:00:01.000'))
+        self.assertEqual(columns['day'].dtype, np.dtype('datetime64[D]'))
+        self.assertEqual(columns['day'][0], np.datetime64('2019-01-01'))
+
+        name = columns['name']
+        self.assertEqual(name.offsets[:4].tolist(), [0, 4, 8, 8])
+        self.assertEqual(name.mask.tolist(), nulls)
+        self.assertEqual(name.to_list(), [None if nulls[i] else u'n\xe9%d' % i for i in range(10)])
+        self.assertEqual(columns['data'][4], b'\x00' * 4)
+        self.assertIsNone(columns['data'][5])
+
+        self.assertEqual(columns['tags'].dtype, object)
+        self.assertEqual(columns['tags'][0], set([u'a0']))
+        self.assertIsNone(columns['tags'][2])
+
+    def test_dict_rows(self):
+        rows = [dict(zip(self.names, self.make_row(i))) for i in range(3)]
+        response_future = PagedResponseFuture(self.names, self.types, [])
+        response_future.row_factory = dict_factory
+        columns = ResultSet(response_future, rows).to_columnar()
+
+        self.assertEqual(columns['id'].tolist(), [0, 1, 2])
+        self.assertEqual(columns['name'].to_list(), [u'n\xe90', u'n\xe91', None])
+
+    def test_numpy_pages(self):
+        # pages as NumpyProtocolHandler decodes them
+        def page(ids, mask):
+            return {'id': np.ma.MaskedArray(np.array(ids, dtype=np.int64), mask=mask),
+                    'name': np.array([u'x%d' % i for i in ids], dtype=object)}
+
+        response_future = PagedResponseFuture(['id', 'name'], [cqltypes.LongType, cqltypes.UTF8Type],
+                                              [page([3, 4], [False, True])])
+        columns = ResultSet(response_future, page([1, 2], [False, False])).to_columnar()
+
+        self.assertEqual(columns['id'].dtype, np.int64)
+        self.assertEqual(columns['id'].tolist(), [1, 2, 3, None])
+        self.assertEqual(columns['name'].to_list(), [u'x1', u'x2', u'x3', u'x4'])
+
+    def test_empty(self):
+        response_future = PagedResponseFuture(['id', 't'], [cqltypes.Int32Type, cqltypes.TimeType], [])
+        columns = ResultSet(response_future, []).to_columnar()
+
+        self.assertEqual(len(columns), 0)
+        self.assertEqual(columns['t'].dtype, np.dtype('timedelta64[ns]'))
@@ -18,8 +18,10 @@ try:
 except ImportError:
     import unittest  # noqa
 
+from collections import defaultdict
 from itertools import cycle
 from mock import Mock
+import random
 import time
 import threading
 from six.moves.queue import PriorityQueue
@@ -27,9 +29,13 @@ import sys
 import platform
 
 from cassandra.cluster import Cluster, Session
-from cassandra.concurrent import execute_concurrent, execute_concurrent_with_args
+from cassandra.concurrent import execute_concurrent, execute_concurrent_with_args, bulk_load, scan_table
+from cassandra.cqltypes import Int32Type
+from cassandra.metadata import Murmur3Token, MIN_LONG, MAX_LONG
 from cassandra.pool import Host
-from cassandra.policies import SimpleConvictionPolicy
+from cassandra.policies import SimpleConvictionPolicy, HostDistance
+from cassandra.protocol import ColumnMetadata
+from cassandra.query import PreparedStatement, BatchStatement
 from tests.unit.utils import mock_session_pools
 
 
@@ -258,3 +264,243 @@ class ConcurrencyTest((unittest.TestCase)):
         for r in results:
             self.assertFalse(r[0])
             self.assertIsInstance(r[1], TypeError)
+
+
+class BulkLoadFuture(object):
+
+    def __init__(self, loader_session, statement):
+        self.session = loader_session
+        self.statement = statement
+
+    def add_callbacks(self, callback, errback, callback_args=(), errback_args=()):
+        with self.session.lock:
+            self.session.pending.append((self, callback, errback, callback_args))
+
+
+class BulkLoadSession(object):
+    """
+    Records the statements passed to execute_async, keeping them in flight
+    until complete() is called.
+    """
+
+    keyspace = None
+
+    def __init__(self, replicas_by_key):
+        self.replicas_by_key = replicas_by_key
+        self.cluster = Mock()
+        self.cluster.metadata.get_replicas.side_effect = lambda keyspace, key: self.replicas_by_key[key]
+        self.cluster._default_load_balancing_policy.distance.return_value = HostDistance.LOCAL
+        self.lock = threading.Lock()
+        self.pending = []
+        self.executed = []
+        self.fail = set()
+        self.max_in_flight = {}
+
+    def execute_async(self, statement, timeout=None):
+        with self.lock:
+            self.executed.append(statement)
+            hosts = [self.host_of(f.statement) for f, _, _, _ in self.pending] + [self.host_of(statement)]
+            for host in set(hosts):
+                self.max_in_flight[host] = max(self.max_in_flight.get(host, 0), hosts.count(host))
+        return BulkLoadFuture(self, statement)
+
+    def host_of(self, statement):
+        return self.replicas_by_key[statement.routing_key][0]
+
+    def complete(self):
+        with self.lock:
+            done, self.pending = self.pending, []
+        for future, callback, errback, args in done:
+            if future.statement in self.fail:
+                errback(Exception("failed"), *args)
+            else:
+                callback(None, *args)
+
+
+class BulkLoadTest(unittest.TestCase):
+
+    def setUp(self):
+        column_metadata = [ColumnMetadata('ks', 'cf', 'pk', Int32Type),
+                           ColumnMetadata('ks', 'cf', 'v', Int32Type)]
+        self.prepared = PreparedStatement(column_metadata=column_metadata, query_id=b'id',
+                                          routing_key_indexes=[0], query=None, keyspace='ks',
+                                          protocol_version=4, result_metadata=None,
+                                          result_metadata_id=None)
+        self.hosts = [Host("127.0.0.%d" % i, SimpleConvictionPolicy) for i in range(1, 3)]
+        for host in self.hosts:
+            host.set_up()
+        # even partitions on the first host, odd ones on the second
+        self.session = BulkLoadSession(dict((Int32Type.serialize(pk, 4), [self.hosts[pk % 2]]) for pk in range(10)))
+
+        self.stopped = threading.Event()
+        self.completer = threading.Thread(target=self._complete)
+        self.completer.start()
+
+    def tearDown(self):
+        self.stopped.set()
+        self.completer.join()
+
+    def _complete(self):
+        while not self.stopped.is_set():
+            self.stopped.wait(0.005)
+            self.session.complete()
+
+    def test_in_flight_bounded_per_host(self):
+        rows = [(pk % 10, pk) for pk in range(40)]
+        result = bulk_load(self.session, self.prepared, rows, max_in_flight_per_host=3)
+
+        self.assertEqual(result.rows, 40)
+        self.assertEqual(result.requests, 40)
+        self.assertEqual(result.failed_rows, 0)
+        self.assertEqual(self.session.max_in_flight, {self.hosts[0]: 3, self.hosts[1]: 3})
+        self.assertGreater(result.rows_per_second, 0)
+
+    def test_batches_by_partition(self):
+        rows = [(0, 1), (0, 2), (0, 3), (1, 4), (2, 5), (2, 6)]
+        result = bulk_load(self.session, self.prepared, rows, batch_size=2)
+
+        self.assertEqual(result.rows, 6)
+        executed = self.session.executed
+        self.assertTrue(all(isinstance(s, BatchStatement) for s in executed))
+        self.assertEqual(sorted(len(s._statements_and_parameters) for s in executed), [1, 1, 2, 2])
+
+    def test_errors(self):
+        rows = [('bad', 1), (0, 2), (1, 3)]
+        # fail the request for the second row
+        self.session.fail = _FailRoutingKey(self.prepared.bind(rows[1]).routing_key)
+
+        result = bulk_load(self.session, self.prepared, rows, raise_on_first_error=False)
+        self.assertEqual(result.rows, 1)
+        self.assertEqual(result.failed_rows, 2)
+        self.assertEqual(result.failed_requests, 1)
+        self.assertEqual([r for r, _ in result.errors], [[('bad', 1)], [(0, 2)]])
+
+        self.assertRaises(TypeError, bulk_load, self.session, self.prepared, rows)
+
+
+class _FailRoutingKey(object):
+
+    def __init__(self, routing_key):
+        self.routing_key = routing_key
+
+    def __contains__(self, statement):
+        return statement.routing_key == self.routing_key
+
+
+class ScanStatement(object):
+
+    fetch_size = None
+    is_idempotent = False
+    routing_token = None
+
+    def __init__(self, query, values=None, prepared=None):
+        self.query = query
+        self.values = values
+        self.prepared = prepared
+
+    def bind(self, values):
+        return ScanStatement(self.query, values, self)
+
+
+class ScanFuture(object):
+    """
+    Pages through `rows`, delivering each page as soon as it is requested.
+    """
+
+    def __init__(self, session, host, rows, fetch_size):
+        self.session = session
+        self.host = host
+        self.pages = [rows[i:i + fetch_size] for i in range(0, len(rows), fetch_size)] or [[]]
+
+    @property
+    def has_more_pages(self):
+        return bool(self.pages)
+
+    def add_callbacks(self, callback, errback, callback_args=(), errback_args=()):
+        self.callback = callback
+        self.callback_args = callback_args
+        self._deliver()
+
+    def start_fetching_next_page(self):
+        self._deliver()
+
+    def _deliver(self):
+        page = self.pages.pop(0)
+        if not self.pages:
+            self.session.in_flight[self.host] -= 1
+        self.callback(page, *self.callback_args)
+
+
+class ScanSession(object):
+    """
+    Serves a table whose rows are their own Murmur3 token values, from a
+    ring owned by `hosts` in turn.
+    """
+
+    def __init__(self, rows, ring_values, hosts):
+        self.rows = rows
+        ring = [Murmur3Token(v) for v in ring_values]
+        owners = dict((token, hosts[i % len(hosts)]) for i, token in enumerate(ring))
+
+        self.cluster = Mock()
+        partition_key = Mock()
+        partition_key.name = 'pk'
+        metadata = self.cluster.metadata
+        metadata.keyspaces = {'ks': Mock(tables={'t': Mock(partition_key=[partition_key])})}
+        metadata.token_map.ring = ring
+        metadata.token_map.token_class = Murmur3Token
+        metadata.token_map.token_to_host_owner = owners
+        metadata.token_map.get_replicas.side_effect = lambda keyspace, token: [owners[token]]
+        self.cluster._default_load_balancing_policy.distance.return_value = HostDistance.LOCAL
+        self.owners = owners
+
+        self.queries = []
+        self.executed = []
+        self.in_flight = defaultdict(int)
+        self.max_in_flight = defaultdict(int)
+
+    def prepare(self, query):
+        self.queries.append(query)
+        return ScanStatement(query)
+
+    def execute_async(self, statement, timeout=None):
+        self.executed.append(statement)
+        start = statement.values[0]
+        end = statement.values[1] if len(statement.values) > 1 else MAX_LONG
+        rows = [r for r in self.rows if start < r <= end]
+
+        host = self.owners[statement.routing_token]
+        self.in_flight[host] += 1
+        self.max_in_flight[host] = max(self.max_in_flight[host], self.in_flight[host])
+        return ScanFuture(self, host, rows, statement.prepared.fetch_size)
+
+
+class ScanTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.hosts = [Host("127.0.0.%d" % i, SimpleConvictionPolicy) for i in range(1, 3)]
+        for host in self.hosts:
+            host.set_up()
+        ring_values = [-6 * 10 ** 18, -10 ** 18, 2 * 10 ** 18, 7 * 10 ** 18]
+        rand = random.Random(0)
+        # include the ring tokens and the extremes of the token range
+        self.rows = ring_values + [MIN_LONG + 1, MAX_LONG] + [rand.randint(MIN_LONG + 1, MAX_LONG) for _ in range(200)]
+        self.session = ScanSession(self.rows, ring_values, self.hosts)
+
+    def test_scan_table(self):
+        rows = list(scan_table(self.session, 'ks', 't', ['pk', 'v'], splits_per_host=4,
+                               max_in_flight_per_host=2, fetch_size=5))
+
+        self.assertEqual(sorted(rows), sorted(self.rows))
+        self.assertIn("SELECT pk, v FROM ks.t WHERE token(pk) > ? AND token(pk) <= ?", self.session.queries)
+        # two sub-ranges for each of the three ranges, and for each side of
+        # the range wrapping around the ring
+        self.assertEqual(len(self.session.executed), 10)
+        self.assertTrue(all(s.prepared.is_idempotent for s in self.session.executed))
+        for statement in self.session.executed:
+            self.assertIsNotNone(statement.routing_token)
+        self.assertEqual(dict(self.session.max_in_flight), {self.hosts[0]: 2, self.hosts[1]: 2})
+
+    def test_unknown_table(self):
+        self.assertRaises(ValueError, scan_table, self.session, 'ks', 'other')
+        self.assertRaises(ValueError, scan_table, self.session, 'ks', 't', splits_per_host=0)
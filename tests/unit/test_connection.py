@@ -16,8 +16,11 @@ try:
 except ImportError:
     import unittest  # noqa
 
+from collections import deque
+from functools import partial
 from mock import Mock, ANY, call, patch
 import six
+from six.moves.queue import Queue, Empty
 from six import BytesIO
 import time
 from threading import Lock
@@ -26,7 +29,7 @@ from cassandra import OperationTimedOut
 from cassandra.cluster import Cluster
 from cassandra.connection import (Connection, HEADER_DIRECTION_TO_CLIENT, ProtocolError,
                                   locally_supported_compressions, ConnectionHeartbeat, _Frame, Timer, TimerManager,
-                                  ConnectionException)
+                                  ConnectionException, PipelinedResponseWaiter, pop_coalesced, drain_coalesced)
 from cassandra.marshal import uint8_pack, uint32_pack, int32_pack
 from cassandra.protocol import (write_stringmultimap, write_int, write_string,
                                 SupportedMessage, ProtocolHandler)
@@ -109,6 +112,32 @@ class ConnectionTest(unittest.TestCase):
         args, kwargs = c.defunct.call_args
         self.assertIsInstance(args[0], ProtocolError)
 
+    def test_multiple_frames_in_buffer(self, *args):
+        c = self.make_connection()
+        c.process_msg = Mock()
+
+        header = self.make_header_prefix(SupportedMessage)
+        options = self.make_options_body()
+        message = self.make_msg(header, options)
+        bodies = []
+        c.process_msg.side_effect = lambda frame, body: bodies.append(bytes(body))
+
+        # two complete frames followed by a partial one
+        c._iobuf = BytesIO()
+        c._iobuf.write(message * 2 + message[:5])
+        c.process_io_buffer()
+
+        self.assertEqual(bodies, [options, options])
+        self.assertEqual(c._iobuf.getvalue(), message[:5])
+        self.assertIsNone(c._current_frame)
+
+        # complete the partial frame
+        c._iobuf.write(message[5:])
+        c.process_io_buffer()
+
+        self.assertEqual(bodies, [options] * 3)
+        self.assertEqual(c._iobuf.getvalue(), six.binary_type())
+
     def test_unsupported_cql_version(self, *args):
         c = self.make_connection()
         c._requests = {0: (c._handle_options_response, ProtocolHandler.decode_message, [])}
@@ -249,6 +278,50 @@ class ConnectionTest(unittest.TestCase):
         c.set_keyspace_blocking('ks')
         self.assertEqual(c.keyspace, 'ks')
 
+    def test_wait_for_pipelined_responses(self):
+        c = self.make_connection()
+        pending = []
+        in_flight = []
+
+        def send_msg(msg, request_id, cb):
+            in_flight.append(c.in_flight)
+            # answer every third message right away, the others while waiting
+            if msg % 3 == 0:
+                cb(msg * 10)
+            else:
+                pending.append((msg, cb))
+
+        def answer_pending(timeout):
+            while pending:
+                msg, cb = pending.pop(0)
+                cb(Exception('error %d' % msg) if msg == 4 else msg * 10)
+
+        def make_waiter(*args):
+            waiter = PipelinedResponseWaiter(*args)
+            waiter.condition.wait = Mock(side_effect=answer_pending)
+            return waiter
+
+        c.send_msg = Mock(side_effect=send_msg)
+        with patch('cassandra.connection.PipelinedResponseWaiter', side_effect=make_waiter):
+            responses = c.wait_for_pipelined_responses(range(10), 4, timeout=1)
+
+        self.assertEqual(len(responses), 10)
+        for i, (success, response) in enumerate(responses):
+            if i == 4:
+                self.assertFalse(success)
+                self.assertEqual(str(response), 'error 4')
+            else:
+                self.assertTrue(success)
+                self.assertEqual(response, i * 10)
+        self.assertLessEqual(max(in_flight), 4)
+        self.assertEqual(c.in_flight, 0)
+
+    def test_wait_for_pipelined_responses_timeout(self):
+        c = self.make_connection()
+        c.send_msg = Mock()
+        self.assertRaises(OperationTimedOut, c.wait_for_pipelined_responses, range(3), 2, timeout=0.01)
+        self.assertEqual(c.send_msg.call_count, 2)
+
     def test_set_connection_class(self):
         cluster = Cluster(connection_class='test')
         self.assertEqual('test', cluster.connection_class)
@@ -425,3 +498,53 @@ class TimerTest(unittest.TestCase):
         tm.add_timer(t2)
         # Prior to #466: "TypeError: unorderable types: Timer() < Timer()"
         tm.service_timeouts()
+
+    def test_timer_wheel(self):
+        fired = []
+        with patch('cassandra.connection.time.time', return_value=1000.0) as now:
+            tm = TimerManager()
+            timers = [Timer(delay, partial(fired.append, delay)) for delay in (0.5, 0.1, 30.0, 0.3)]
+            for timer in timers:
+                tm.add_timer(timer)
+            self.assertAlmostEqual(tm.service_timeouts(), 1000.1)
+
+            timers[3].cancel()
+            self.assertNotIn(timers[3], timers[3]._slot)
+
+            now.return_value = 1000.35
+            self.assertAlmostEqual(tm.service_timeouts(), 1000.5)
+            self.assertEqual(fired, [0.1])
+
+            # 30s is more than a turn of the wheel
+            now.return_value = 1017.0
+            tm.service_timeouts()
+            self.assertEqual(fired, [0.1, 0.5])
+
+            now.return_value = 1030.0
+            tm.service_timeouts()
+            self.assertEqual(fired, [0.1, 0.5, 30.0])
+            self.assertIsNone(tm.next_timeout)
+            self.assertFalse(any(tm._slots))
+
+
+class WriteCoalescingTest(unittest.TestCase):
+
+    def test_pop_coalesced(self):
+        chunks = deque([b'a' * 3, b'b' * 3, b'c' * 3, b'd' * 3])
+        self.assertEqual(pop_coalesced(chunks, 7), b'aaabbb')
+        self.assertEqual(pop_coalesced(chunks, 7), b'cccddd')
+        self.assertRaises(IndexError, pop_coalesced, chunks, 7)
+
+    def test_pop_coalesced_large_chunk(self):
+        chunks = deque([b'a' * 10, b'b'])
+        self.assertEqual(pop_coalesced(chunks, 4), b'a' * 10)
+        self.assertEqual(list(chunks), [b'b'])
+
+    def test_drain_coalesced(self):
+        queue = Queue()
+        for chunk in (b'b' * 3, b'c' * 3, b'd' * 3):
+            queue.put(chunk)
+
+        self.assertEqual(drain_coalesced(b'aaa', queue.get_nowait, Empty, 7), b'aaabbbccc')
+        self.assertEqual(drain_coalesced(b'eee', queue.get_nowait, Empty, 7), b'eeeddd')
+        self.assertEqual(queue.qsize(), 0)
@@ -21,8 +21,8 @@ from mock import Mock, NonCallableMagicMock
 from threading import Thread, Event, Lock
 
 from cassandra.cluster import Session
-from cassandra.connection import Connection
-from cassandra.pool import Host, HostConnectionPool, NoConnectionsAvailable
+from cassandra.connection import Connection, ConnectionException
+from cassandra.pool import Host, HostConnection, HostConnectionPool, NoConnectionsAvailable
 from cassandra.policies import HostDistance, SimpleConvictionPolicy
 
 
@@ -241,3 +241,159 @@ class HostConnectionPoolTests(unittest.TestCase):
         self.assertEqual(a, b, 'Two Host instances should be equal when sharing.')
         self.assertNotEqual(a, c, 'Two Host instances should NOT be equal when using two different addresses.')
         self.assertNotEqual(b, c, 'Two Host instances should NOT be equal when using two different addresses.')
+
+
+class HostConnectionTests(unittest.TestCase):
+
+    def make_session(self):
+        session = NonCallableMagicMock(spec=Session, keyspace='foobarkeyspace')
+        session.cluster.get_core_connections_per_host.return_value = 1
+        session.cluster.get_max_connections_per_host.return_value = 1
+        session.cluster.get_max_requests_per_connection.return_value = 2
+        session.cluster.get_min_requests_per_connection.return_value = 0
+        return session
+
+    def make_connection(self):
+        return NonCallableMagicMock(spec=Connection, in_flight=0, is_defunct=False, is_closed=False,
+                                    max_request_id=100, signaled_error=False, lock=Lock())
+
+    def test_borrow_and_return(self):
+        host = Mock(spec=Host, address='ip1')
+        session = self.make_session()
+        conn = self.make_connection()
+        session.cluster.connection_factory.return_value = conn
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        session.cluster.connection_factory.assert_called_once_with(host.address)
+
+        c, request_id = pool.borrow_connection(timeout=0.01)
+        self.assertIs(c, conn)
+        self.assertEqual(1, conn.in_flight)
+        conn.set_keyspace_blocking.assert_called_once_with('foobarkeyspace')
+
+        pool.return_connection(conn)
+        self.assertEqual(0, conn.in_flight)
+        self.assertEqual([conn], pool.get_connections())
+
+    def test_core_connections_closed_on_error(self):
+        host = Mock(spec=Host, address='ip1')
+        session = self.make_session()
+        session.cluster.get_core_connections_per_host.return_value = 3
+        first, second = self.make_connection(), self.make_connection()
+        session.cluster.connection_factory.side_effect = [first, second, ConnectionException('failed')]
+
+        self.assertRaises(ConnectionException, HostConnection, host, HostDistance.LOCAL, session)
+        first.close.assert_called_once_with()
+        second.close.assert_called_once_with()
+
+        first, second = self.make_connection(), self.make_connection()
+        second.set_keyspace_blocking.side_effect = ConnectionException('failed')
+        session.cluster.connection_factory.side_effect = [first, second]
+        session.cluster.get_core_connections_per_host.return_value = 2
+
+        self.assertRaises(ConnectionException, HostConnection, host, HostDistance.LOCAL, session)
+        first.close.assert_called_once_with()
+        second.close.assert_called_once_with()
+
+    def test_least_busy_connection_selected(self):
+        host = Mock(spec=Host, address='ip1')
+        session = self.make_session()
+        session.cluster.get_core_connections_per_host.return_value = 2
+        session.cluster.get_max_connections_per_host.return_value = 2
+        busy, idle = self.make_connection(), self.make_connection()
+        busy.in_flight = 10
+        session.cluster.connection_factory.side_effect = [busy, idle]
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        c, _ = pool.borrow_connection(timeout=0.01)
+        self.assertIs(c, idle)
+        self.assertEqual(1, idle.in_flight)
+        self.assertFalse(session.submit.called)
+
+    def test_spawn_when_loaded(self):
+        host = Mock(spec=Host, address='ip1')
+        session = self.make_session()
+        session.cluster.get_max_connections_per_host.return_value = 2
+        conn, new_conn = self.make_connection(), self.make_connection()
+        session.cluster.connection_factory.side_effect = [conn, new_conn]
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        pool.borrow_connection(timeout=0.01)
+        self.assertFalse(session.submit.called)
+
+        # reaching max_requests_per_connection schedules another connection
+        pool.borrow_connection(timeout=0.01)
+        session.submit.assert_called_once_with(pool._create_new_connection)
+
+        # only one creation is in progress at a time
+        pool.borrow_connection(timeout=0.01)
+        session.submit.assert_called_once_with(pool._create_new_connection)
+
+        pool._create_new_connection()
+        self.assertEqual([conn, new_conn], pool.get_connections())
+        self.assertEqual(0, pool._scheduled_for_creation)
+        new_conn.set_keyspace_blocking.assert_called_once_with('foobarkeyspace')
+
+        c, _ = pool.borrow_connection(timeout=0.01)
+        self.assertIs(c, new_conn)
+
+    def test_trash_above_core(self):
+        host = Mock(spec=Host, address='ip1')
+        session = self.make_session()
+        session.cluster.get_core_connections_per_host.return_value = 2
+        session.cluster.get_max_connections_per_host.return_value = 2
+        first, second = self.make_connection(), self.make_connection()
+        session.cluster.connection_factory.side_effect = [first, second]
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        session.cluster.get_core_connections_per_host.return_value = 1
+
+        c, _ = pool.borrow_connection(timeout=0.01)
+        pool.return_connection(c)
+
+        self.assertEqual(1, len(pool.get_connections()))
+        c.close.assert_called_once_with()
+
+        # the remaining connection is never trashed below core
+        remaining = pool.get_connections()[0]
+        c, _ = pool.borrow_connection(timeout=0.01)
+        pool.return_connection(c)
+        self.assertEqual([remaining], pool.get_connections())
+        self.assertFalse(remaining.close.called)
+
+    def test_return_defunct_connection(self):
+        host = Mock(spec=Host, address='ip1')
+        session = self.make_session()
+        conn, replacement = self.make_connection(), self.make_connection()
+        session.cluster.connection_factory.side_effect = [conn, replacement]
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        pool.borrow_connection(timeout=0.01)
+        conn.is_defunct = True
+        session.cluster.signal_connection_failure.return_value = False
+        pool.return_connection(conn)
+
+        session.submit.assert_called_once_with(pool._replace, conn)
+        self.assertEqual([], pool.get_connections())
+        self.assertRaises(NoConnectionsAvailable, pool.borrow_connection, 0.01)
+
+        pool._replace(conn)
+        self.assertEqual([replacement], pool.get_connections())
+        self.assertFalse(pool.is_shutdown)
+
+    def test_shutdown_closes_all_connections(self):
+        host = Mock(spec=Host, address='ip1')
+        session = self.make_session()
+        session.cluster.get_core_connections_per_host.return_value = 2
+        session.cluster.get_max_connections_per_host.return_value = 2
+        conns = [self.make_connection(), self.make_connection()]
+        session.cluster.connection_factory.side_effect = conns
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        self.assertEqual(2, pool.open_count)
+        pool.shutdown()
+
+        self.assertTrue(pool.is_shutdown)
+        self.assertEqual(0, pool.open_count)
+        for c in conns:
+            c.close.assert_called_once_with()
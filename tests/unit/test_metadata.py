@@ -19,7 +19,7 @@ except ImportError:
 
 from binascii import unhexlify
 import logging
-from mock import Mock
+from mock import Mock, patch
 import os
 import six
 import timeit
@@ -201,6 +201,28 @@ class StrategiesTest(unittest.TestCase):
         token_replicas = replica_map[MD5Token(0)]
         self.assertItemsEqual(token_replicas, (dc1_1, dc1_2, dc1_3, dc2_1, dc2_3))
 
+    def test_nts_make_token_replica_map_wraps_around(self):
+        token_to_host_owner = {}
+        hosts = []
+        for i, dc in enumerate(('dc1', 'dc1', 'dc1', 'dc2', 'dc2')):
+            host = Host('%s.%d' % (dc, i), SimpleConvictionPolicy)
+            host.set_location_info(dc, 'rack1')
+            hosts.append(host)
+        dc1_1, dc1_2, dc1_3, dc2_1, dc2_2 = hosts
+
+        # dc2 has no token after 300, dc1 none after 400
+        for token, host in ((0, dc1_1), (100, dc2_1), (200, dc1_2), (300, dc2_2), (400, dc1_3), (500, dc1_1)):
+            token_to_host_owner[MD5Token(token)] = host
+        ring = sorted(token_to_host_owner)
+
+        nts = NetworkTopologyStrategy({'dc1': 2, 'dc2': 1})
+        replica_map = nts.make_token_replica_map(token_to_host_owner, ring)
+
+        self.assertEqual(replica_map[MD5Token(0)], [dc1_1, dc1_2, dc2_1])
+        self.assertEqual(replica_map[MD5Token(300)], [dc1_3, dc1_1, dc2_2])
+        self.assertEqual(replica_map[MD5Token(400)], [dc1_3, dc1_1, dc2_1])
+        self.assertEqual(replica_map[MD5Token(500)], [dc1_1, dc1_2, dc2_1])
+
     def test_nts_make_token_replica_map_empty_dc(self):
         host = Host('1', SimpleConvictionPolicy)
         host.set_location_info('dc1', 'rack1')
@@ -340,6 +362,92 @@ class GetReplicasTest(unittest.TestCase):
     def test_bytes_tokens(self):
         self._get_replicas(BytesToken)
 
+    def test_murmur3_ring_array(self):
+        tokens = [Murmur3Token(i) for i in (cassandra.metadata.MIN_LONG, -100, 0, 100, cassandra.metadata.MAX_LONG)]
+        hosts = [Host("ip%d" % i, SimpleConvictionPolicy) for i in range(len(tokens))]
+        keyspace = KeyspaceMetadata("ks", True, "SimpleStrategy", {"replication_factor": "1"})
+        metadata = Mock(spec=Metadata, keyspaces={'ks': keyspace})
+        token_map = TokenMap(Murmur3Token, dict(zip(tokens, hosts)), tokens, metadata)
+
+        self.assertEqual(token_map._ring_values.typecode, 'q')
+        self.assertEqual(token_map.get_replicas("ks", Murmur3Token(-101)), [hosts[1]])
+        self.assertEqual(token_map.get_replicas("ks", Murmur3Token(1)), [hosts[3]])
+        self.assertEqual(token_map.get_replicas("ks", Murmur3Token(cassandra.metadata.MAX_LONG)), [hosts[4]])
+
+        metadata.token_map = token_map
+        with patch.object(Murmur3Token, 'hash_fn', return_value=50):
+            self.assertEqual(Metadata.get_replicas(metadata, "ks", b'key'), [hosts[3]])
+
+    def test_replica_cache(self):
+        tokens = [MD5Token(i) for i in range(0, 2 ** 127, 2 ** 124)]
+        hosts = [Host("ip%d" % i, SimpleConvictionPolicy) for i in range(len(tokens))]
+        keyspaces = {'ks': KeyspaceMetadata("ks", True, "SimpleStrategy", {"replication_factor": "1"}),
+                     'nomap': KeyspaceMetadata("nomap", True, None, {})}
+        metadata = Mock(spec=Metadata, keyspaces=keyspaces)
+        token_map = TokenMap(MD5Token, dict(zip(tokens, hosts)), tokens, metadata)
+        token_map.replica_cache_size = 2
+        token_map.rebuild_keyspace('nomap', build_if_absent=True)
+
+        token = MD5Token.from_key(b'a')
+        expected = token_map.get_replicas('ks', token)
+        with patch.object(MD5Token, 'hash_fn', wraps=MD5Token.hash_fn) as hash_fn:
+            self.assertEqual(token_map.get_replicas_for_key('ks', b'a'), expected)
+            self.assertEqual(token_map.get_replicas_for_key('ks', b'a'), expected)
+            self.assertEqual(hash_fn.call_count, 1)
+
+            # least recently used keys are evicted
+            token_map.get_replicas_for_key('ks', b'b')
+            token_map.get_replicas_for_key('ks', b'a')
+            token_map.get_replicas_for_key('ks', b'c')
+            self.assertEqual(list(token_map._replica_cache), [('ks', b'a'), ('ks', b'c')])
+            self.assertEqual(hash_fn.call_count, 3)
+
+            # lookups for keyspaces without a replica map keep the cache
+            for _ in range(2):
+                self.assertEqual(token_map.get_replicas('missing', token), [])
+                self.assertEqual(token_map.get_replicas('nomap', token), [])
+            self.assertEqual(list(token_map._replica_cache), [('ks', b'a'), ('ks', b'c')])
+
+            # changed replicas invalidate the cache
+            keyspaces['ks'] = KeyspaceMetadata("ks", True, "SimpleStrategy", {"replication_factor": "2"})
+            token_map.rebuild_keyspace('ks')
+            self.assertEqual(len(token_map.get_replicas_for_key('ks', b'a')), 2)
+            self.assertEqual(hash_fn.call_count, 4)
+
+    def test_replica_maps_shared_by_strategy(self):
+        tokens = [Murmur3Token(i) for i in range(0, 1000, 100)]
+        hosts = [Host("ip%d" % i, SimpleConvictionPolicy) for i in range(len(tokens))]
+        keyspaces = {
+            'ks1': KeyspaceMetadata("ks1", True, "SimpleStrategy", {"replication_factor": "2"}),
+            'ks2': KeyspaceMetadata("ks2", True, "SimpleStrategy", {"replication_factor": "2"}),
+            'ks3': KeyspaceMetadata("ks3", True, "SimpleStrategy", {"replication_factor": "1"})
+        }
+        metadata = Mock(spec=Metadata, keyspaces=keyspaces)
+        token_map = TokenMap(Murmur3Token, dict(zip(tokens, hosts)), tokens, metadata)
+
+        with patch.object(SimpleStrategy, 'make_token_replica_map', autospec=True,
+                          side_effect=SimpleStrategy.make_token_replica_map) as make_map:
+            self.assertEqual(token_map.get_replicas('ks1', tokens[0]), hosts[:2])
+            self.assertEqual(token_map.get_replicas('ks2', tokens[0]), hosts[:2])
+            self.assertEqual(token_map.get_replicas('ks3', tokens[0]), hosts[:1])
+            self.assertEqual(make_map.call_count, 2)
+            self.assertIs(token_map.tokens_to_hosts_by_ks['ks1'], token_map.tokens_to_hosts_by_ks['ks2'])
+
+            # an unchanged strategy keeps its map
+            token_map.rebuild_keyspace('ks1')
+            self.assertEqual(make_map.call_count, 2)
+
+            # the map is kept while any keyspace still uses it
+            token_map.remove_keyspace('ks1')
+            token_map.rebuild_keyspace('ks2')
+            self.assertEqual(make_map.call_count, 2)
+
+            keyspaces['ks2'] = KeyspaceMetadata("ks2", True, "SimpleStrategy", {"replication_factor": "1"})
+            token_map.rebuild_keyspace('ks2')
+            self.assertEqual(make_map.call_count, 2)
+            self.assertIs(token_map.tokens_to_hosts_by_ks['ks2'], token_map.tokens_to_hosts_by_ks['ks3'])
+            self.assertEqual(len(token_map._shared_replica_maps), 1)
+
 
 class Murmur3TokensTest(unittest.TestCase):
 
@@ -452,6 +560,84 @@ CREATE TYPE test.b (
 );""", keyspace.export_as_string())
 
 
+class LazyKeyspaceMetadataTest(unittest.TestCase):
+
+    def _keyspace(self, name, table=None):
+        keyspace = KeyspaceMetadata(name, True, 'SimpleStrategy', dict(replication_factor=3))
+        if table:
+            keyspace.tables[table] = TableMetadata(name, table)
+        return keyspace
+
+    def _metadata(self, eager_keyspaces=()):
+        metadata = Metadata()
+        metadata._lazy_schema = True
+        metadata._eager_keyspaces = frozenset(eager_keyspaces)
+        metadata._keyspace_loader = Mock(side_effect=lambda name: self._keyspace(name, 'loaded'))
+        return metadata
+
+    def test_rebuild_all(self):
+        metadata = self._metadata(eager_keyspaces=['eager'])
+        parser = Mock()
+        parser.get_keyspaces_only.return_value = [self._keyspace('eager'), self._keyspace('lazy')]
+        parser.get_full_keyspace.side_effect = lambda name: self._keyspace(name, 'full')
+
+        metadata._rebuild_all(parser)
+        parser.get_full_keyspace.assert_called_once_with('eager')
+        parser.get_all_keyspaces.assert_not_called()
+        self.assertEqual(list(metadata.keyspaces['eager'].tables), ['full'])
+        metadata._keyspace_loader.assert_not_called()
+
+        lazy = metadata.keyspaces['lazy']
+        self.assertEqual(list(lazy.tables), ['loaded'])
+        self.assertEqual(lazy.views, {})
+        metadata._keyspace_loader.assert_called_once_with('lazy')
+
+        # keyspaces loaded since the last refresh are loaded with the next one
+        parser.get_keyspaces_only.return_value = [self._keyspace('eager'), self._keyspace('lazy')]
+        metadata._rebuild_all(parser)
+        self.assertEqual(parser.get_full_keyspace.call_count, 3)
+        self.assertEqual(list(metadata.keyspaces['lazy'].tables), ['full'])
+
+    def test_rebuild_all_eager(self):
+        metadata = self._metadata()
+        metadata._lazy_schema = False
+        parser = Mock()
+        parser.get_all_keyspaces.return_value = [self._keyspace('ks', 'full')]
+
+        metadata._rebuild_all(parser)
+        parser.get_keyspaces_only.assert_not_called()
+        self.assertEqual(list(metadata.keyspaces['ks'].tables), ['full'])
+
+    @patch('cassandra.metadata.get_schema_parser')
+    def test_refresh_skips_unloaded_keyspaces(self, get_schema_parser):
+        metadata = self._metadata()
+        metadata.get_host = Mock()
+        parser = get_schema_parser.return_value
+        parser.get_keyspaces_only.return_value = [self._keyspace('ks')]
+        metadata.refresh(Mock(), 1)
+
+        metadata.refresh(Mock(), 1, target_type='TABLE', keyspace='ks', table='t')
+        parser.get_table.assert_not_called()
+
+        # keyspace level changes keep the contents unloaded
+        parser.get_keyspace.return_value = self._keyspace('ks')
+        metadata.refresh(Mock(protocol_version=4), 1, target_type='KEYSPACE', keyspace='ks')
+        self.assertIsNotNone(metadata.keyspaces['ks']._loader)
+
+        self.assertEqual(list(metadata.keyspaces['ks'].tables), ['loaded'])
+        parser.get_table.return_value = TableMetadata('ks', 't')
+        metadata.refresh(Mock(), 1, target_type='TABLE', keyspace='ks', table='t')
+        self.assertEqual(sorted(metadata.keyspaces['ks'].tables), ['loaded', 't'])
+
+    def test_load_failure(self):
+        keyspace = self._keyspace('ks')
+        keyspace._loader = Mock(side_effect=[cassandra.DriverException(), self._keyspace('ks', 'loaded')])
+        with self.assertRaises(cassandra.DriverException):
+            keyspace.tables
+        self.assertEqual(list(keyspace.tables), ['loaded'])
+        self.assertIsNone(keyspace._loader)
+
+
 class UserTypesTest(unittest.TestCase):
 
     def test_as_cql_query(self):
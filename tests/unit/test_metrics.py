@@ -0,0 +1,239 @@
+# Copyright DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest # noqa
+
+from mock import Mock, patch
+import socket
+from threading import Thread
+
+from cassandra import OperationTimedOut, Unavailable, InvalidRequest, ConsistencyLevel
+
+from cassandra.metrics import (Metrics, LatencyHistogram, MetricsRegistry, PrometheusExporter,
+                               StatsdExporter)
+
+
+class LatencyHistogramTest(unittest.TestCase):
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        # 1ms to 1s
+        for i in range(1, 1001):
+            histogram.record(i / 1000.0)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot.count, 1000)
+        self.assertEqual(snapshot.min, 0.001)
+        self.assertEqual(snapshot.max, 1.0)
+        self.assertAlmostEqual(snapshot.mean, 0.5005)
+        for percentile, expected in ((50, 0.5), (99, 0.99), (99.9, 0.999)):
+            value = snapshot.percentile(percentile)
+            self.assertGreaterEqual(value, expected)
+            self.assertLessEqual(value, expected * 1.04)
+        self.assertEqual(snapshot.percentile(100), 1.0)
+        self.assertEqual(set(snapshot.as_dict()), set(['count', 'min', 'max', 'mean', 'median', '75percentile',
+                                                       '95percentile', '98percentile', '99percentile',
+                                                       '999percentile']))
+
+    def test_merge_and_reset(self):
+        fast, slow = LatencyHistogram(), LatencyHistogram()
+        for _ in range(90):
+            fast.record(0.001)
+        for _ in range(10):
+            slow.record(1.0)
+
+        merged = fast.snapshot().merge(slow.snapshot(reset=True))
+        self.assertEqual(merged.count, 100)
+        self.assertEqual(merged.min, 0.001)
+        self.assertEqual(merged.max, 1.0)
+        self.assertLess(merged.percentile(90), 0.0011)
+        self.assertEqual(merged.percentile(91), 1.0)
+
+        self.assertEqual(slow.snapshot().count, 0)
+        self.assertEqual(slow.snapshot().percentile(99), 0.0)
+        fast.reset()
+        self.assertEqual(fast.snapshot().count, 0)
+
+    def test_concurrent_records(self):
+        histogram = LatencyHistogram()
+
+        def record():
+            for _ in range(1000):
+                histogram.record(0.002)
+
+        threads = [Thread(target=record) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(histogram.snapshot().count, 8000)
+
+    def test_threads_use_different_shards(self):
+        histogram = LatencyHistogram()
+
+        def record():
+            histogram.record(0.002)
+
+        threads = [Thread(target=record) for _ in range(histogram.num_shards)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertGreater(len([shard for shard in histogram._shards if shard.count]), 1)
+
+    def test_sparse_buckets(self):
+        histogram = LatencyHistogram()
+        self.assertFalse(any(shard.counts for shard in histogram._shards))
+        histogram.record(0.001)
+        histogram.record(0.0011)
+        histogram.record(0.001)
+        self.assertEqual(sum(len(shard.counts) for shard in histogram._shards), 2)
+        self.assertEqual(histogram.snapshot(reset=True).count, 3)
+        self.assertFalse(any(shard.counts for shard in histogram._shards))
+
+
+class MetricsTest(unittest.TestCase):
+
+    def test_request_latencies(self):
+        metrics = Metrics(Mock())
+        host1, host2 = Mock(), Mock()
+        prepared = Mock(query_id=b'id')
+
+        metrics.on_request_complete(0.001, host1, prepared, None)
+        metrics.on_request_complete(0.002, host1, None, InvalidRequest())
+        metrics.on_request_complete(0.5, host2, prepared, OperationTimedOut())
+        metrics.on_request_complete(0.003, None, None, Unavailable('', ConsistencyLevel.ONE, 1, 0))
+
+        snapshots = metrics.get_latency_snapshots(reset=True)
+        self.assertEqual(dict((h, s.count) for h, s in snapshots['hosts'].items()), {host1: 2, host2: 1})
+        self.assertEqual(snapshots['statements'][b'id'].count, 2)
+        self.assertEqual(snapshots['statements'][b'id'].max, 0.5)
+        self.assertEqual(dict((o, s.count) for o, s in snapshots['outcomes'].items()),
+                         {'success': 1, 'error': 1, 'timeout': 1, 'unavailable': 1})
+        self.assertEqual(metrics.registry.as_dict()['request_latency']['count'], 4)
+
+        snapshots = metrics.get_latency_snapshots()
+        self.assertEqual(snapshots['hosts'][host1].count, 0)
+
+    def test_keyed_histograms(self):
+        metrics = Metrics(Mock())
+        host = Mock()
+        metrics.on_request_complete(0.001, host, Mock(query_id=b'id'), None)
+        metrics.on_host_reprepared(host, 0.1)
+        self.assertEqual(len(metrics.statement_latencies._histograms[b'id']._shards), 1)
+
+        metrics.on_host_removed(host)
+        snapshots = metrics.get_latency_snapshots()
+        self.assertEqual(snapshots['hosts'], {})
+        self.assertEqual(metrics.host_reprepare_latencies.snapshot(), {})
+        self.assertEqual(snapshots['statements'][b'id'].count, 1)
+
+    @patch('cassandra.metrics.scales', None)
+    def test_without_scales(self):
+        metrics = Metrics(Mock())
+        self.assertIsNone(metrics.stats)
+        self.assertIsNone(metrics.request_timer)
+
+        metrics.on_retry()
+        metrics.on_request_complete(0.001, None, None, None)
+        stats = metrics.get_stats()
+        self.assertEqual(stats['retries'], 1)
+        self.assertEqual(stats['request_latency']['count'], 1)
+        self.assertIsNone(stats['known_hosts'])
+
+
+class MetricsRegistryTest(unittest.TestCase):
+
+    def test_register(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('requests')
+        counter.inc()
+        counter.inc(2)
+        self.assertIs(registry.counter('requests'), counter)
+        self.assertRaises(ValueError, registry.histogram, 'requests')
+        registry.gauge('pending', lambda: 5)
+
+        self.assertEqual([(name, kind) for name, kind, _, _, _ in registry.collect()],
+                         [('requests', 'counter'), ('pending', 'gauge')])
+        self.assertEqual(registry.as_dict(), {'requests': 3, 'pending': 5})
+
+    def test_disabled(self):
+        registry = MetricsRegistry(enabled=False)
+        registry.counter('requests').inc()
+        registry.histogram('latency').record(0.1)
+        registry.histograms('host_latency', 'host').record('host1', 0.1)
+
+        self.assertEqual(registry.collect(), [])
+        self.assertEqual(registry.histogram('latency').snapshot().count, 0)
+
+
+class ExporterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.registry.counter('retries', 'Retried requests').inc(3)
+        self.registry.gauge('open_connections', lambda: 2)
+        self.registry.histogram('request_latency').record(0.002)
+        statements = self.registry.histograms('statement_latency', 'query_id')
+        statements.record(b'\x01\xff', 0.1)
+        statements.record(b'\x01\xff', 0.3)
+
+    def test_prometheus(self):
+        text = PrometheusExporter(self.registry).render()
+        lines = text.splitlines()
+
+        self.assertIn('# HELP cassandra_retries_total Retried requests', lines)
+        self.assertIn('# TYPE cassandra_retries_total counter', lines)
+        self.assertIn('cassandra_retries_total 3', lines)
+        self.assertIn('# TYPE cassandra_open_connections gauge', lines)
+        self.assertIn('cassandra_open_connections 2.0', lines)
+        self.assertIn('# TYPE cassandra_request_latency summary', lines)
+        self.assertIn('cassandra_request_latency_count 1', lines)
+        self.assertIn('cassandra_statement_latency{query_id="01ff",quantile="0.75"} 0.3', lines)
+        self.assertIn('cassandra_statement_latency_count{query_id="01ff"} 2', lines)
+        self.assertTrue(text.endswith('\n'))
+
+    def test_statsd(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.addCleanup(server.close)
+        server.bind(('127.0.0.1', 0))
+        server.settimeout(5)
+
+        exporter = StatsdExporter(self.registry, port=server.getsockname()[1])
+        self.addCleanup(exporter.stop)
+        exporter.flush()
+        lines = server.recv(65536).decode('utf-8').split('\n')
+        self.assertIn('cassandra.retries:3|c', lines)
+        self.assertIn('cassandra.open_connections:2|g', lines)
+        self.assertIn('cassandra.request_latency.count:1|c', lines)
+        self.assertIn('cassandra.statement_latency.01ff.count:2|c', lines)
+        self.assertIn('cassandra.statement_latency.01ff.max:300.000|g', lines)
+
+        # only changes are sent from then on
+        self.registry.counter('retries').inc()
+        self.assertEqual(exporter.lines(), ['cassandra.retries:1|c', 'cassandra.open_connections:2|g'])
+
+    def test_statsd_packets(self):
+        exporter = StatsdExporter(self.registry)
+        exporter.max_packet_size = 64
+        exporter._send = Mock()
+        exporter.flush()
+
+        packets = [args[0] for args, _ in exporter._send.call_args_list]
+        self.assertGreater(len(packets), 1)
+        self.assertTrue(all(len(p) <= 64 for p in packets))
+        self.assertEqual(b'\n'.join(packets).split(b'\n'), [l.encode('utf-8') for l in StatsdExporter(self.registry).lines()])
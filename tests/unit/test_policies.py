@@ -26,18 +26,20 @@ import sys
 import struct
 from threading import Thread
 
-from cassandra import ConsistencyLevel
+from cassandra import ConsistencyLevel, RequestThrottled, OperationTimedOut, Unavailable
 from cassandra.cluster import Cluster
-from cassandra.metadata import Metadata
+from cassandra.metadata import Metadata, Murmur3Token
 from cassandra.policies import (RoundRobinPolicy, WhiteListRoundRobinPolicy, DCAwareRoundRobinPolicy,
                                 TokenAwarePolicy, SimpleConvictionPolicy,
                                 HostDistance, ExponentialReconnectionPolicy,
                                 RetryPolicy, WriteType,
                                 DowngradingConsistencyRetryPolicy, ConstantReconnectionPolicy,
                                 LoadBalancingPolicy, ConvictionPolicy, ReconnectionPolicy, FallthroughRetryPolicy,
-                                IdentityTranslator, EC2MultiRegionTranslator, HostFilterPolicy)
+                                IdentityTranslator, EC2MultiRegionTranslator, HostFilterPolicy,
+                                ConcurrencyLimitingRequestThrottler, RateLimitingRequestThrottler,
+                                LatencyAwarePolicy, PercentileSpeculativeExecutionPolicy)
 from cassandra.pool import Host
-from cassandra.query import Statement
+from cassandra.query import Statement, SimpleStatement
 
 from six.moves import xrange
 
@@ -733,6 +735,35 @@ class TokenAwarePolicyTest(unittest.TestCase):
         self.assertEqual(replicas + hosts[:2], qplan)
         cluster.metadata.get_replicas.assert_called_with(statement_keyspace, routing_key)
 
+    def test_statement_routing_token(self):
+        hosts = [Host(str(i), SimpleConvictionPolicy) for i in range(4)]
+        for host in hosts:
+            host.set_up()
+
+        cluster = Mock(spec=Cluster)
+        cluster.metadata = Mock(spec=Metadata)
+        replicas = hosts[2:]
+        cluster.metadata.get_replicas_for_token.return_value = replicas
+
+        child_policy = Mock()
+        child_policy.make_query_plan.return_value = hosts
+        child_policy.distance.return_value = HostDistance.LOCAL
+
+        policy = TokenAwarePolicy(child_policy)
+        policy.populate(cluster, hosts)
+
+        query = Statement(routing_key='routing_key', keyspace='keyspace')
+        token = Murmur3Token(42)
+        query.routing_token = token
+        qplan = list(policy.make_query_plan(None, query))
+        self.assertEqual(replicas + hosts[:2], qplan)
+        cluster.metadata.get_replicas_for_token.assert_called_once_with('keyspace', token)
+        self.assertEqual(cluster.metadata.get_replicas.call_count, 0)
+
+        # a new routing key invalidates the token
+        query.routing_key = 'other_key'
+        self.assertIsNone(query.routing_token)
+
     def test_shuffles_if_given_keyspace_and_routing_key(self):
         """
         Test to validate the hosts are shuffled when `shuffle_replicas` is truthy
@@ -800,6 +831,199 @@ class TokenAwarePolicyTest(unittest.TestCase):
             child_policy.make_query_plan.assert_called_once_with(keyspace, query)
             self.assertEqual(patched_shuffle.call_count, 1)
 
+    @patch('cassandra.policies.shuffle')
+    def test_balance_replicas(self, patched_shuffle):
+        hosts = [Host(str(i), SimpleConvictionPolicy) for i in range(5)]
+        for host in hosts:
+            host.set_up()
+        hosts[4].set_down()
+        in_flight = {hosts[1]: 5, hosts[2]: 1, hosts[3]: 0}
+
+        cluster = Mock(spec=Cluster)
+        cluster.metadata = Mock(spec=Metadata)
+        cluster.metadata.get_replicas.return_value = hosts[1:]
+        cluster.get_in_flight_requests.side_effect = in_flight.get
+
+        child_policy = Mock()
+        child_policy.make_query_plan.return_value = hosts[:4]
+        child_policy.distance.return_value = HostDistance.LOCAL
+
+        policy = TokenAwarePolicy(child_policy, balance_replicas=True)
+        policy.populate(cluster, hosts)
+        query = Statement(routing_key='routing_key')
+
+        # the less busy of the first two comes first, down replicas are skipped
+        qplan = list(policy.make_query_plan('keyspace', query))
+        self.assertEqual(qplan, [hosts[2], hosts[1], hosts[3], hosts[0]])
+        self.assertEqual(patched_shuffle.call_count, 1)
+        # the replica list from the metadata is left alone
+        self.assertEqual(cluster.metadata.get_replicas.return_value, hosts[1:])
+
+        in_flight[hosts[2]] = 5
+        qplan = list(policy.make_query_plan('keyspace', query))
+        self.assertEqual(qplan, [hosts[1], hosts[2], hosts[3], hosts[0]])
+
+
+class LatencyAwarePolicyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.hosts = [Host(addr, SimpleConvictionPolicy) for addr in ('127.0.0.1', '127.0.0.2', '127.0.0.3')]
+        child_policy = Mock()
+        child_policy.make_query_plan.side_effect = lambda *args: iter(self.hosts)
+        self.policy = LatencyAwarePolicy(child_policy, min_measure=1, update_rate=0, retry_period=10)
+        self.cluster = Mock()
+        self.policy.populate(self.cluster, self.hosts)
+        self.tracker = self.policy._tracker
+
+    def record(self, host, latency, exc=None):
+        self.tracker.update(host, None, latency, exc)
+
+    def test_populate(self):
+        self.cluster.register_latency_tracker.assert_called_once_with(self.tracker)
+        self.policy._child_policy.populate.assert_called_once_with(self.cluster, self.hosts)
+
+    @patch('cassandra.policies.time')
+    def test_penalizes_slow_hosts(self, mock_time):
+        mock_time.time.return_value = 100.0
+        self.assertEqual(list(self.policy.make_query_plan()), self.hosts)
+
+        self.record(self.hosts[0], 0.3)
+        self.record(self.hosts[1], 0.01)
+        self.record(self.hosts[2], 0.015)
+        self.assertEqual(list(self.policy.make_query_plan()),
+                         [self.hosts[1], self.hosts[2], self.hosts[0]])
+
+        # not measured for the retry period, so tried again
+        mock_time.time.return_value = 111.0
+        self.assertEqual(list(self.policy.make_query_plan()), self.hosts)
+
+    @patch('cassandra.policies.time')
+    def test_recent_latencies_weigh_more(self, mock_time):
+        mock_time.time.return_value = 100.0
+        self.record(self.hosts[0], 0.01)
+        self.record(self.hosts[1], 0.01)
+        self.record(self.hosts[2], 0.01)
+
+        mock_time.time.return_value = 100.001
+        self.record(self.hosts[0], 0.1)
+        self.assertEqual(list(self.policy.make_query_plan()), self.hosts)
+
+        mock_time.time.return_value = 105.0
+        self.record(self.hosts[0], 0.1)
+        self.assertEqual(list(self.policy.make_query_plan()),
+                         [self.hosts[1], self.hosts[2], self.hosts[0]])
+
+    @patch('cassandra.policies.time')
+    def test_min_measure(self, mock_time):
+        mock_time.time.return_value = 100.0
+        self.policy = LatencyAwarePolicy(self.policy._child_policy, min_measure=2, update_rate=0)
+        self.tracker = self.policy._tracker
+        self.record(self.hosts[0], 1.0)
+        self.record(self.hosts[1], 0.01)
+        self.record(self.hosts[1], 0.01)
+        self.assertEqual(list(self.policy.make_query_plan()), self.hosts)
+
+    @patch('cassandra.policies.time')
+    def test_failures(self, mock_time):
+        mock_time.time.return_value = 100.0
+        self.record(self.hosts[1], 0.01)
+        self.record(self.hosts[0], 1.0, Unavailable('unavailable'))
+        self.assertIsNone(self.tracker.get(self.hosts[0]))
+
+        self.record(self.hosts[0], 1.0, OperationTimedOut())
+        self.assertEqual(list(self.policy.make_query_plan()),
+                         [self.hosts[1], self.hosts[2], self.hosts[0]])
+
+        # a host that comes back up starts over
+        self.policy.on_down(self.hosts[0])
+        self.assertIsNone(self.tracker.get(self.hosts[0]))
+        self.policy._child_policy.on_down.assert_called_once_with(self.hosts[0])
+        self.assertEqual(list(self.policy.make_query_plan()), self.hosts)
+
+
+class PercentileSpeculativeExecutionPolicyTest(unittest.TestCase):
+
+    def record(self, policy, statement, count):
+        for i in range(count):
+            policy.update(None, statement, (i + 1) / 1000.0, None)
+
+    @patch('cassandra.policies.time')
+    def test_delay(self, mock_time):
+        mock_time.time.return_value = 100.0
+        policy = PercentileSpeculativeExecutionPolicy(percentile=90, min_samples=100, interval=10)
+        statement = SimpleStatement('SELECT', keyspace='ks')
+        self.assertEqual(policy.new_plan('ks', statement).next_execution(None), -1)
+
+        # not enough latencies in the first interval
+        self.record(policy, statement, 50)
+        mock_time.time.return_value = 110.0
+        self.assertEqual(policy.new_plan('ks', statement).next_execution(None), -1)
+
+        self.record(policy, statement, 50)
+        policy.update(None, statement, 10.0, OperationTimedOut())
+        mock_time.time.return_value = 120.0
+        plan = policy.new_plan('ks', statement)
+        self.assertAlmostEqual(plan.next_execution(None), 0.05, places=2)
+        self.assertEqual(plan.next_execution(None), -1)
+
+        # other keyspaces have their own latencies
+        other = SimpleStatement('SELECT', keyspace='other')
+        self.assertEqual(policy.new_plan('other', other).next_execution(None), -1)
+
+    @patch('cassandra.policies.time')
+    def test_per_statement(self, mock_time):
+        mock_time.time.return_value = 100.0
+        policy = PercentileSpeculativeExecutionPolicy(per_statement=True, min_samples=10, interval=10)
+        statement = Mock(keyspace='ks', prepared_statement=Mock(query_id=b'a'))
+        self.record(policy, statement, 10)
+        mock_time.time.return_value = 110.0
+        self.assertGreater(policy.new_plan('ks', statement).next_execution(None), 0)
+        other = Mock(keyspace='ks', prepared_statement=Mock(query_id=b'b'))
+        self.assertEqual(policy.new_plan('ks', other).next_execution(None), -1)
+
+        # other statements share the latencies of their keyspace
+        for i in range(100):
+            policy.update(None, SimpleStatement('SELECT %d' % i, keyspace='ks'), 0.001, None)
+        self.assertEqual(sorted(policy._latencies, key=str), [b'a', 'ks'])
+
+    @patch('cassandra.policies.time')
+    def test_max_ratio(self, mock_time):
+        mock_time.time.return_value = 100.0
+        policy = PercentileSpeculativeExecutionPolicy(max_attempts=2, max_ratio=0.1, min_samples=10, interval=10)
+        statement = SimpleStatement('SELECT', keyspace='ks')
+        self.record(policy, statement, 10)
+        mock_time.time.return_value = 110.0
+
+        plans = [policy.new_plan('ks', statement) for _ in range(20)]
+        # both speculative executions of the first plan are sent
+        self.assertGreater(plans[0].next_execution(None), 0)
+        self.assertGreater(plans[0].next_execution(None), 0)
+        self.assertEqual(plans[0].next_execution(None), -1)
+        # which uses up the budget of 20 requests
+        self.assertEqual(plans[1].next_execution(None), -1)
+
+    @patch('cassandra.policies.time')
+    def test_max_ratio_reserved_when_scheduled(self, mock_time):
+        mock_time.time.return_value = 100.0
+        policy = PercentileSpeculativeExecutionPolicy(max_ratio=0.1, min_samples=10, interval=10)
+        statement = SimpleStatement('SELECT', keyspace='ks')
+        self.record(policy, statement, 10)
+        mock_time.time.return_value = 110.0
+
+        # all requests slow down at once, none of their speculative executions was sent yet
+        plans = [policy.new_plan('ks', statement) for _ in range(100)]
+        delays = [plan.next_execution(None) for plan in plans]
+        self.assertEqual(len([d for d in delays if d > 0]), 10)
+
+        # requests completing before their speculative execution give the budget back
+        plans[0].cancel()
+        plans[0].cancel()
+        self.assertGreater(plans[10].next_execution(None), 0)
+        self.assertEqual(plans[11].next_execution(None), -1)
+        # and may speculate again, on the next page
+        plans[1].cancel()
+        self.assertGreater(plans[0].next_execution(None), 0)
+
 
 class ConvictionPolicyTest(unittest.TestCase):
     def test_not_implemented(self):
@@ -1443,7 +1667,7 @@ class HostFilterPolicyQueryPlanTest(unittest.TestCase):
         hfp._child_policy._child_policy._position = 0
 
 
-        mocked_query = Mock()
+        mocked_query = Mock(routing_token=None)
         query_plan = hfp.make_query_plan("keyspace", mocked_query)
         # First the not filtered replica, and then the rest of the allowed hosts ordered
         query_plan = list(query_plan)
@@ -1474,3 +1698,108 @@ class HostFilterPolicyQueryPlanTest(unittest.TestCase):
         self.assertEqual(set(query_plan), {Host("127.0.0.1", SimpleConvictionPolicy),
                                            Host("127.0.0.4", SimpleConvictionPolicy)})
 
+
+
+def _throttled_future():
+    future = Mock(name='response_future')
+    future.session.cluster.metrics = None
+    # queued requests are sent through the session's executor
+    future.session.submit.side_effect = lambda fn, *args: fn(*args)
+    return future
+
+
+class ConcurrencyLimitingRequestThrottlerTest(unittest.TestCase):
+
+    def test_limits_in_flight_requests(self):
+        throttler = ConcurrencyLimitingRequestThrottler(max_concurrent_requests=2, max_queue_size=1)
+        futures = [_throttled_future() for _ in range(4)]
+
+        throttler.submit(futures[0])
+        throttler.submit(futures[1])
+        throttler.submit(futures[2])
+        self.assertRaises(RequestThrottled, throttler.submit, futures[3])
+
+        self.assertEqual(throttler.in_flight, 2)
+        self.assertEqual(throttler.queue_size, 1)
+        futures[0].send_request.assert_called_once_with()
+        futures[1].send_request.assert_called_once_with()
+        futures[2].send_request.assert_not_called()
+
+        throttler.on_request_done(futures[0])
+        futures[2].send_request.assert_called_once_with()
+        self.assertEqual(throttler.in_flight, 2)
+        self.assertEqual(throttler.queue_size, 0)
+
+        throttler.on_request_done(futures[1])
+        throttler.on_request_done(futures[2])
+        self.assertEqual(throttler.in_flight, 0)
+
+    def test_request_done_while_queued(self):
+        throttler = ConcurrencyLimitingRequestThrottler(max_concurrent_requests=1, max_queue_size=2)
+        futures = [_throttled_future() for _ in range(3)]
+        for future in futures:
+            throttler.submit(future)
+
+        # e.g. timed out while waiting; must not free a slot or be sent
+        throttler.on_request_done(futures[1])
+        self.assertEqual(throttler.in_flight, 1)
+        self.assertEqual(throttler.queue_size, 1)
+
+        throttler.on_request_done(futures[0])
+        futures[1].send_request.assert_not_called()
+        futures[2].send_request.assert_called_once_with()
+
+    def test_queue_time_metric(self):
+        throttler = ConcurrencyLimitingRequestThrottler(max_concurrent_requests=1)
+        first, second = _throttled_future(), _throttled_future()
+        metrics = Mock()
+        second.session.cluster.metrics = metrics
+
+        throttler.submit(first)
+        throttler.submit(second)
+        throttler.on_request_done(first)
+        self.assertEqual(metrics.on_throttle_queued.call_count, 1)
+
+
+class RateLimitingRequestThrottlerTest(unittest.TestCase):
+
+    def test_limits_rate(self):
+        throttler = RateLimitingRequestThrottler(max_requests_per_second=2, max_queue_size=1)
+        futures = [_throttled_future() for _ in range(4)]
+        timers = []
+        futures[2].session.cluster.connection_class.create_timer.side_effect = lambda delay, fn: timers.append((delay, fn))
+
+        throttler.submit(futures[0])
+        throttler.submit(futures[1])
+        throttler.submit(futures[2])
+        self.assertRaises(RequestThrottled, throttler.submit, futures[3])
+
+        futures[0].send_request.assert_called_once_with()
+        futures[1].send_request.assert_called_once_with()
+        futures[2].send_request.assert_not_called()
+        self.assertEqual(len(timers), 1)
+        delay, drain = timers[0]
+        self.assertGreater(delay, 0)
+        self.assertLessEqual(delay, 0.5)
+
+        with patch('cassandra.policies.time.time', return_value=throttler._last_refill + 0.5):
+            drain()
+        futures[2].send_request.assert_called_once_with()
+        self.assertEqual(throttler.queue_size, 0)
+        self.assertEqual(len(timers), 1)
+
+    def test_request_done_while_queued(self):
+        throttler = RateLimitingRequestThrottler(max_requests_per_second=1)
+        first, second = _throttled_future(), _throttled_future()
+        timers = []
+        second.session.cluster.connection_class.create_timer.side_effect = lambda delay, fn: timers.append(fn)
+
+        throttler.submit(first)
+        throttler.submit(second)
+        throttler.on_request_done(second)
+        self.assertEqual(throttler.queue_size, 0)
+
+        with patch('cassandra.policies.time.time', return_value=throttler._last_refill + 1):
+            timers[0]()
+        second.send_request.assert_not_called()
+        self.assertEqual(len(timers), 1)
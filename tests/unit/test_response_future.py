@@ -17,7 +17,10 @@ try:
 except ImportError:
     import unittest # noqa
 
-from mock import Mock, MagicMock, ANY
+from collections import deque
+from threading import Lock
+
+from mock import Mock, MagicMock, ANY, call
 
 from cassandra import ConsistencyLevel, Unavailable, SchemaTargetType, SchemaChangeType
 from cassandra.cluster import Session, ResponseFuture, NoHostAvailable, ProtocolVersion
@@ -80,6 +83,68 @@ class ResponseFutureTests(unittest.TestCase):
         result = rf.result()
         self.assertEqual(result, [{'col': 'val'}])
 
+    def test_latency_trackers(self):
+        session = self.make_session()
+        rf = self.make_response_future(session)
+        tracker = Mock()
+        rf._latency_trackers = (tracker,)
+        rf.send_request()
+
+        rf._set_result('ip1', None, None, self.make_mock_response([{'col': 'val'}]))
+        tracker.update.assert_called_once_with('ip1', rf.query, ANY, None)
+
+    def test_speculative_executions_released(self):
+        session = self.make_session()
+        pool = session._pools.get.return_value
+        connections = []
+        for request_id in (1, 2):
+            connection = Mock(_requests={}, request_ids=deque(), lock=Lock())
+            connection.send_msg.side_effect = \
+                lambda msg, request_id, cb, c=connection, **kwargs: c._requests.__setitem__(request_id, (cb, None, None))
+            connections.append((connection, request_id))
+        pool.borrow_connection.side_effect = connections
+
+        rf = self.make_response_future(session)
+        rf.send_request()
+        rf._on_speculative_execute()
+        self.assertEqual(rf.attempted_hosts, ['ip1', 'ip2'])
+
+        # the speculative execution answers first
+        (first, _), (second, _) = connections
+        cb, _, _ = second._requests.pop(2)
+        cb(self.make_mock_response([{'col': 'val'}]))
+
+        self.assertEqual(rf.result(), [{'col': 'val'}])
+        self.assertEqual(first._requests, {})
+        self.assertEqual(list(first.request_ids), [1])
+        self.assertEqual(pool.return_connection.call_args_list, [call(second), call(first)])
+
+    def test_unsent_speculative_execution_canceled(self):
+        session = self.make_session()
+        query = SimpleStatement("SELECT * FROM foo")
+        message = QueryMessage(query=query, consistency_level=ConsistencyLevel.ONE)
+
+        plan = Mock()
+        plan.next_execution.return_value = 0.5
+        rf = ResponseFuture(session, message, query, 10, speculative_execution_plan=plan)
+        rf.send_request()
+        rf._set_result('ip1', None, None, self.make_mock_response([{'col': 'val'}]))
+        plan.cancel.assert_called_once_with()
+
+        # the speculative execution was sent, the next one is canceled
+        plan.reset_mock()
+        rf = ResponseFuture(session, message, query, 10, speculative_execution_plan=plan)
+        rf.send_request()
+        rf._on_speculative_execute()
+        self.assertFalse(plan.cancel.called)
+        rf._set_result('ip2', None, None, self.make_mock_response([{'col': 'val'}]))
+        plan.cancel.assert_called_once_with()
+
+        # the request times out before the speculative execution
+        plan.reset_mock()
+        ResponseFuture(session, message, query, 0.1, speculative_execution_plan=plan)
+        plan.cancel.assert_called_once_with()
+
     def test_unknown_result_class(self):
         session = self.make_session()
         pool = session._pools.get.return_value
@@ -539,3 +604,20 @@ class ResponseFutureTests(unittest.TestCase):
         rf._query = Mock(return_value=True)
         rf._execute_after_prepare('host', None, None, response)
         rf._query.assert_called_once_with('host')
+
+    def test_throttler_released_once(self):
+        session = self.make_session()
+        rf = self.make_response_future(session)
+        throttler = Mock()
+        rf._throttler = throttler
+        rf.send_request()
+
+        # later pages complete the same future again
+        rf._set_final_result([{'col': 'val'}])
+        rf._set_final_result([{'col': 'val'}])
+        throttler.on_request_done.assert_called_once_with(rf)
+
+        rf = self.make_response_future(session)
+        rf._throttler = throttler
+        rf._set_final_exception(Exception())
+        self.assertEqual(throttler.on_request_done.call_count, 2)
@@ -23,6 +23,47 @@ from mock import Mock, PropertyMock, patch
 from cassandra.cluster import ResultSet
 
 
+class PagingResponseFuture(object):
+    """
+    Serves `pages` when :meth:`complete` is called, the way the IO thread
+    completes a ResponseFuture. The paging state is the number of pages left.
+    """
+
+    _col_names = None
+    _col_types = None
+
+    def __init__(self, pages, error=None):
+        self._pages = list(pages)
+        self._error = error
+        self._callbacks = []
+        self._errbacks = []
+        self.fetches = 0
+
+    @property
+    def _paging_state(self):
+        return len(self._pages) or None
+
+    @property
+    def has_more_pages(self):
+        return bool(self._pages)
+
+    def add_callbacks(self, callback, errback):
+        self._callbacks.append(callback)
+        self._errbacks.append(errback)
+
+    def start_fetching_next_page(self):
+        self.fetches += 1
+
+    def complete(self):
+        if self._error:
+            for errback in self._errbacks:
+                errback(self._error)
+        else:
+            rows = self._pages.pop(0)
+            for callback in self._callbacks:
+                callback(rows)
+
+
 class ResultSetTests(unittest.TestCase):
 
     def test_iter_non_paged(self):
@@ -207,3 +248,39 @@ class ResultSetTests(unittest.TestCase):
         self.assertIn('indexing support will be removed in 4.0',
                       str(index_warning_args[0]))
         self.assertIs(index_warning_args[1], DeprecationWarning)
+
+    def test_fetch_ahead(self):
+        response_future = PagingResponseFuture([[3, 4], [5, 6], [7]])
+        rs = ResultSet(response_future, [1, 2], fetch_ahead=2)
+        self.assertEqual(response_future.fetches, 0)
+
+        itr = iter(rs)
+        # the second page is requested as soon as the first one is handed out
+        self.assertEqual(response_future.fetches, 1)
+        response_future.complete()
+        self.assertEqual(response_future.fetches, 2)
+        response_future.complete()
+        # two pages are held, so the last one is not requested yet
+        self.assertEqual(response_future.fetches, 2)
+        self.assertTrue(rs.has_more_pages)
+
+        self.assertEqual([next(itr) for _ in range(3)], [1, 2, 3])
+        self.assertEqual(rs.current_rows, [3, 4])
+        self.assertEqual(rs.paging_state, 2)
+        self.assertEqual(response_future.fetches, 3)
+
+        response_future.complete()
+        self.assertEqual([next(itr) for _ in range(4)], [4, 5, 6, 7])
+        self.assertRaises(StopIteration, next, itr)
+        self.assertFalse(rs.has_more_pages)
+        self.assertIsNone(rs.paging_state)
+        self.assertEqual(response_future.fetches, 3)
+
+    def test_fetch_ahead_error(self):
+        response_future = PagingResponseFuture([[2]], error=ValueError("failed"))
+        rs = ResultSet(response_future, [1], fetch_ahead=1)
+        itr = iter(rs)
+        response_future.complete()
+
+        self.assertEqual(next(itr), 1)
+        self.assertRaises(ValueError, next, itr)
@@ -13,11 +13,14 @@
 # limitations under the License.
 
 
+from cassandra import query
 from cassandra.query import named_tuple_factory
+from cassandra.util import OrderedDict
 
 import logging
 import warnings
 
+from mock import patch
 import sys
 
 try:
@@ -88,3 +91,21 @@ class TestNamedTupleFactory(TestCase):
         # check that this is a real namedtuple
         self.assertTrue(hasattr(rows[0], '_fields'))
         self.assertIsInstance(rows[0], tuple)
+
+    def test_row_class_cached(self):
+        """
+        Tests that the Row class is created once for the same column names,
+        and that the cache is bounded
+        """
+        rows = named_tuple_factory(['a', 'b'], [(1, 2)])
+        other_rows = named_tuple_factory(('a', 'b'), [(3, 4)])
+        self.assertIs(type(rows[0]), type(other_rows[0]))
+        self.assertEqual(other_rows[0].b, 4)
+        self.assertIsNot(type(named_tuple_factory(['a', 'c'], [(1, 2)])[0]), type(rows[0]))
+
+        with patch('cassandra.query._row_class_cache_size', 2), \
+                patch('cassandra.query._row_class_cache', OrderedDict([(('a', 'b'), type(rows[0]))])):
+            for i in range(3):
+                named_tuple_factory(['a', 'col{}'.format(i)], [])
+            self.assertEqual(len(query._row_class_cache), 2)
+            self.assertNotIn(('a', 'b'), query._row_class_cache)
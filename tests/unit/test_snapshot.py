@@ -0,0 +1,180 @@
+# Copyright DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest  # noqa
+
+import os
+import shutil
+import struct
+import sys
+import tempfile
+
+from mock import Mock, patch
+from six.moves import cPickle as pickle
+
+import cassandra
+from cassandra.cluster import Cluster
+from cassandra.cqltypes import lookup_casstype
+from cassandra.metadata import (Metadata, KeyspaceMetadata, TableMetadata,
+                                ColumnMetadata, Murmur3Token, SchemaParserV3)
+from cassandra.policies import SimpleConvictionPolicy
+from cassandra.pool import Host
+from cassandra.snapshot import read_snapshot, write_snapshot, SNAPSHOT_FORMAT_VERSION
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'snapshot')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _metadata(self):
+        metadata = Metadata()
+        metadata.cluster_name = 'test cluster'
+
+        keyspace = KeyspaceMetadata('ks', True, 'NetworkTopologyStrategy', {'dc1': '2'})
+        table = TableMetadata('ks', 'tbl')
+        table.columns['k'] = ColumnMetadata(table, 'k', 'int')
+        table.partition_key.append(table.columns['k'])
+        keyspace._add_table_metadata(table)
+        lazy_keyspace = KeyspaceMetadata('lazy', True, 'SimpleStrategy', {'replication_factor': '1'})
+        lazy_keyspace._loader = Mock()
+        metadata.keyspaces = {'ks': keyspace, 'lazy': lazy_keyspace}
+
+        token_map = {}
+        for i in range(3):
+            host, _ = metadata.add_or_return_host(Host('127.0.0.%d' % (i + 1), SimpleConvictionPolicy, 'dc1', 'r1'))
+            host.release_version = '3.11.4'
+            token_map[host] = [str(i * 100), str(i * 100 + 50)]
+        metadata.rebuild_token_map('org.apache.cassandra.dht.Murmur3Partitioner', token_map)
+        return metadata
+
+    def test_round_trip(self):
+        write_snapshot(self._metadata(), self.path)
+        snapshot = read_snapshot(self.path)
+
+        self.assertEqual(snapshot['cluster_name'], 'test cluster')
+        self.assertEqual(snapshot['partitioner'], 'org.apache.cassandra.dht.Murmur3Partitioner')
+        hosts = dict((h['address'], h) for h in snapshot['hosts'])
+        self.assertEqual(sorted(hosts), ['127.0.0.1', '127.0.0.2', '127.0.0.3'])
+        self.assertEqual(sorted(hosts['127.0.0.2']['tokens']), ['100', '150'])
+        self.assertEqual(hosts['127.0.0.2']['datacenter'], 'dc1')
+        self.assertEqual(hosts['127.0.0.2']['attributes']['release_version'], '3.11.4')
+
+        keyspace = snapshot['keyspaces']['ks']
+        self.assertEqual(keyspace.replication_strategy.dc_replication_factors, {'dc1': 2})
+        self.assertEqual(keyspace.tables['tbl'].partition_key[0].name, 'k')
+        self.assertEqual(snapshot['lazy_keyspaces'], ['lazy'])
+        self.assertIsNone(snapshot['keyspaces']['lazy']._loader)
+
+    def test_failed_table(self):
+        metadata = self._metadata()
+        table = metadata.keyspaces['ks'].tables['tbl']
+        try:
+            raise ValueError('cannot parse')
+        except ValueError:
+            table._exc_info = sys.exc_info()
+
+        write_snapshot(metadata, self.path)
+        snapshot = read_snapshot(self.path)
+        self.assertIsNone(snapshot['keyspaces']['ks'].tables['tbl']._exc_info)
+        self.assertIsNotNone(table._exc_info)
+
+    def test_decoded_option_maps(self):
+        def decoded_map(cass_type, value):
+            map_type = lookup_casstype(cass_type)
+            return map_type.from_binary(map_type.to_binary(value, 4), 4)
+
+        text_map = 'MapType(UTF8Type, UTF8Type)'
+        row = {'keyspace_name': 'ks', 'table_name': 'options', 'flags': set(['compound']),
+               'compaction': decoded_map(text_map, {'class': 'SizeTieredCompactionStrategy'}),
+               'caching': decoded_map(text_map, {'keys': 'ALL'}),
+               'compression': decoded_map(text_map, {'chunk_length_in_kb': '64'}),
+               'extensions': decoded_map('MapType(UTF8Type, BytesType)', {'ext': b'\x01'})}
+        col_rows = [{'keyspace_name': 'ks', 'table_name': 'options', 'column_name': 'k', 'kind': 'partition_key',
+                     'position': 0, 'type': 'int', 'clustering_order': 'none'}]
+        trigger_rows = [{'trigger_name': 't', 'options': decoded_map(text_map, {'class': 'Trigger'})}]
+        index_rows = [{'index_name': 'i', 'kind': 'COMPOSITES', 'options': decoded_map(text_map, {'target': 'k'})}]
+        table = SchemaParserV3(None, None)._build_table_metadata(row, col_rows, trigger_rows, index_rows)
+        self.assertIsNone(table._exc_info)
+
+        metadata = self._metadata()
+        metadata.keyspaces['ks']._add_table_metadata(table)
+        write_snapshot(metadata, self.path)
+        table = read_snapshot(self.path)['keyspaces']['ks'].tables['options']
+        self.assertEqual(table.options['compaction'], {'class': 'SizeTieredCompactionStrategy'})
+        self.assertEqual(table.extensions, {'ext': b'\x01'})
+        self.assertEqual(table.triggers['t'].options, {'class': 'Trigger'})
+        self.assertEqual(table.indexes['i'].index_options, {'target': 'k'})
+        self.assertIn("'keys': 'ALL'", table.export_as_string())
+
+    def test_invalid_snapshots(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a snapshot')
+        self.assertRaises(ValueError, read_snapshot, self.path)
+
+        write_snapshot(self._metadata(), self.path)
+        with open(self.path, 'r+b') as f:
+            f.seek(8)
+            f.write(struct.pack('>H', SNAPSHOT_FORMAT_VERSION + 1))
+        self.assertRaises(ValueError, read_snapshot, self.path)
+
+        with patch('cassandra.__version__', '0.0.0'):
+            write_snapshot(self._metadata(), self.path)
+        with patch('cassandra.snapshot._loads') as loads:
+            self.assertRaises(ValueError, read_snapshot, self.path)
+        self.assertFalse(loads.called)
+
+    def test_disallowed_globals(self):
+        class Reduced(object):
+            def __reduce__(self):
+                return os.getcwd, ()
+
+        write_snapshot(self._metadata(), self.path)
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        with open(self.path, 'wb') as f:
+            f.write(data[:struct.calcsize('>8sHB') + len(cassandra.__version__)] + pickle.dumps({'cwd': Reduced()}, 2))
+        self.assertRaises(ValueError, read_snapshot, self.path)
+
+    def test_cluster_load(self):
+        write_snapshot(self._metadata(), self.path)
+        cluster = Cluster(metadata_snapshot_path=self.path)
+        self.assertTrue(cluster._load_metadata_snapshot())
+
+        metadata = cluster.metadata
+        self.assertEqual(metadata.cluster_name, 'test cluster')
+        self.assertEqual(len(metadata.all_hosts()), 3)
+        self.assertEqual(metadata.get_host('127.0.0.3').release_version, '3.11.4')
+        replicas = metadata.token_map.get_replicas('ks', Murmur3Token(120))
+        self.assertEqual([h.address for h in replicas], ['127.0.0.2', '127.0.0.3'])
+        self.assertEqual(list(metadata.keyspaces['ks'].tables), ['tbl'])
+        self.assertIsNotNone(metadata.keyspaces['lazy']._loader)
+        self.assertTrue(cluster.control_connection._metadata_from_snapshot)
+
+    def test_cluster_load_missing_or_invalid(self):
+        cluster = Cluster(metadata_snapshot_path=self.path)
+        self.assertFalse(cluster._load_metadata_snapshot())
+
+        with open(self.path, 'wb') as f:
+            f.write(b'not a snapshot')
+        self.assertFalse(cluster._load_metadata_snapshot())
+        self.assertFalse(cluster.metadata.all_hosts())
+        self.assertFalse(cluster.control_connection._metadata_from_snapshot)